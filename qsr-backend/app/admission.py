@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """The request was shed instead of admitted"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    """
+    Bounds concurrent request handling. Up to `max_in_flight` requests run at
+    once; a further `max_queued` may wait up to `max_queue_wait` seconds (or
+    their own deadline, if sooner) for a slot. Anything beyond that is
+    rejected immediately, so bursts turn into fast 503s instead of a queue
+    that later times out all at once.
+
+    Runs on the event loop only, so plain counters need no locking.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int, max_queue_wait: float):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.max_queue_wait = max_queue_wait
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.rejected: Dict[str, int] = {"queue_full": 0, "queue_timeout": 0}
+        self.max_wait_ms = 0.0
+        self._wait_total = 0.0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_in_flight > 0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Bound to the running loop; rebuilt if the app is served from a new one
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+            self._loop = loop
+            self.in_flight = self.queued = 0
+        return self._semaphore
+
+    async def acquire(self, deadline_remaining: Optional[float] = None):
+        """Take an in-flight slot or raise AdmissionRejected"""
+        if not self.enabled:
+            return
+        semaphore = self._get_semaphore()
+        if semaphore.locked():
+            if self.queued >= self.max_queued:
+                self.rejected["queue_full"] += 1
+                raise AdmissionRejected("queue_full")
+
+            wait = self.max_queue_wait
+            if deadline_remaining is not None:
+                wait = min(wait, max(0.0, deadline_remaining))
+            started = time.monotonic()
+            self.queued += 1
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=wait)
+            except asyncio.TimeoutError:
+                self.rejected["queue_timeout"] += 1
+                raise AdmissionRejected("queue_timeout")
+            finally:
+                self.queued -= 1
+            waited = time.monotonic() - started
+            self._wait_total += waited
+            self.max_wait_ms = max(self.max_wait_ms, waited * 1000)
+        else:
+            await semaphore.acquire()
+        self.in_flight += 1
+        self.admitted += 1
+
+    def release(self):
+        if not self.enabled:
+            return
+        self.in_flight -= 1
+        self._get_semaphore().release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "maxInFlight": self.max_in_flight,
+            "maxQueued": self.max_queued,
+            "maxQueueWaitMs": round(self.max_queue_wait * 1000, 1),
+            "inFlight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avgQueueWaitMs": round(self._wait_total * 1000 / self.admitted, 3) if self.admitted else 0.0,
+            "maxObservedQueueWaitMs": round(self.max_wait_ms, 3),
+        }
+
+
+# Global admission controller for the API routes
+admission_controller = AdmissionController(
+    max_in_flight=int(os.getenv("ADMISSION_MAX_IN_FLIGHT", 64)),
+    max_queued=int(os.getenv("ADMISSION_MAX_QUEUED", 128)),
+    max_queue_wait=float(os.getenv("ADMISSION_MAX_QUEUE_WAIT_MS", 500)) / 1000
+)
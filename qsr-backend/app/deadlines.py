@@ -0,0 +1,86 @@
+import contextvars
+import os
+import time
+from typing import Dict, Optional
+
+# Absolute time.monotonic() deadline of the request being handled (None outside requests)
+_deadline_var: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+DEADLINE_HEADER = "X-Request-Timeout"
+
+DEFAULT_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT_DEFAULT", 30))
+
+# Per-route budgets in seconds, matched by path prefix (longest first)
+ROUTE_TIMEOUTS: Dict[str, float] = {
+    "/api/v1/qsr/fetch-data": float(os.getenv("REQUEST_TIMEOUT_FETCH", 20)),
+    "/api/v1/qsr/prefetch": float(os.getenv("REQUEST_TIMEOUT_PREFETCH", 120)),
+    "/api/v1/qsr/cache/warmer/run": float(os.getenv("REQUEST_TIMEOUT_PREFETCH", 120)),
+    "/api/v1/qsr/export": float(os.getenv("REQUEST_TIMEOUT_EXPORT", 600)),
+    "/api/v1/qsr/links/check": float(os.getenv("REQUEST_TIMEOUT_LINKS", 60)),
+}
+
+
+class DeadlineExceeded(Exception):
+    """The current request ran out of time before `stage` could complete"""
+
+    def __init__(self, stage: str):
+        super().__init__(f"Request deadline exceeded before {stage}")
+        self.stage = stage
+
+
+def route_timeout(path: str) -> float:
+    for prefix in sorted(ROUTE_TIMEOUTS, key=len, reverse=True):
+        if path.startswith(prefix):
+            return ROUTE_TIMEOUTS[prefix]
+    return DEFAULT_TIMEOUT
+
+
+def request_timeout(path: str, header_value: Optional[str]) -> float:
+    """
+    Budget for a request: the caller's header (seconds) may shorten the
+    route default but never extend it
+    """
+    timeout = route_timeout(path)
+    if header_value:
+        try:
+            requested = float(header_value)
+        except ValueError:
+            return timeout
+        if requested > 0:
+            timeout = min(timeout, requested)
+    return timeout
+
+
+def start_deadline(timeout: Optional[float]) -> Optional[float]:
+    """Set the current context's deadline `timeout` seconds from now"""
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    _deadline_var.set(deadline)
+    return deadline
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None without one"""
+    deadline = _deadline_var.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check(stage: str):
+    """Raise DeadlineExceeded if there is no time left to start `stage`"""
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(stage)
+
+
+def bounded(default: Optional[float], stage: str) -> Optional[float]:
+    """
+    Clamp a timeout (e.g. an upstream call's) to the time left on the
+    current deadline; raises DeadlineExceeded if none is left
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded(stage)
+    return left if default is None else min(default, left)
@@ -0,0 +1,46 @@
+"""
+Construction helpers for internal models.
+
+Models are always built through validation. Pydantic's validator is
+compiled, while `Model.model_construct` runs in Python and measures slower
+per object on these models (see benchmark_models.py). Lists of records are
+validated in a single pass through cached TypeAdapters, which beats
+constructing them one by one.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Type, TypeVar
+from pydantic import BaseModel, TypeAdapter
+from app.models import FeatureCycle, TestBuild
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[ModelT]) -> TypeAdapter:
+    """TypeAdapter for List[model], built once per model"""
+    return TypeAdapter(List[model])
+
+
+def validate_records(model: Type[ModelT], records: Iterable[Dict[str, Any]]) -> List[ModelT]:
+    """Validate a batch of untrusted records in a single pass"""
+    return list_adapter(model).validate_python(list(records))
+
+
+def test_builds_from_cycles(cycles: Iterable[FeatureCycle]) -> List[TestBuild]:
+    """Convert feature cycles from the test execution store to TestBuild objects"""
+    return validate_records(TestBuild, (
+        {
+            "buildNumber": cycle.cycle,
+            "startDate": cycle.startDate[:10],  # Extract date part
+            "endDate": cycle.endDate[:10],
+            "totalDesigned": cycle.totalTests,
+            "totalExecuted": cycle.totalTests,
+            "totalPassed": cycle.passed,
+            "totalFailed": cycle.failed,
+            "passPercentage": round(cycle.passRate, 2),
+            "failPercentage": round(100 - cycle.passRate, 2),
+            "defectsFound": cycle.bugsFound
+        }
+        for cycle in cycles
+    ))
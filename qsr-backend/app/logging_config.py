@@ -0,0 +1,127 @@
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+# Correlation ID of the request currently being handled (None outside requests)
+correlation_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("correlation_id", default=None)
+
+# Whether INFO/DEBUG lines of the current request are kept by sampling
+_sampled_var: contextvars.ContextVar[bool] = contextvars.ContextVar("log_sampled", default=True)
+
+CORRELATION_ID_HEADER = "X-Request-ID"
+
+# LogRecord attributes that are not user supplied extras
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "correlation_id"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as single-line JSON objects, including any `extra` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        correlation_id = getattr(record, "correlation_id", None)
+        if correlation_id:
+            entry["correlation_id"] = correlation_id
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Stamp records with the request correlation ID and drop unsampled
+    per-request INFO/DEBUG lines. Warnings and errors are always kept, as is
+    anything logged outside a request.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        correlation_id = correlation_id_var.get()
+        record.correlation_id = correlation_id
+        if record.levelno >= logging.WARNING or correlation_id is None:
+            return True
+        return _sampled_var.get()
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues the record untouched. The stock handler formats
+    the message on the calling thread; here all formatting and I/O happen on
+    the listener thread.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def start_request_context(correlation_id: Optional[str] = None) -> str:
+    """
+    Bind a correlation ID (generated if not supplied) and a sampling decision
+    to the current context. Returns the correlation ID.
+    """
+    correlation_id = correlation_id or uuid.uuid4().hex
+    correlation_id_var.set(correlation_id)
+    sample_rate = float(os.getenv("LOG_SAMPLE_RATE", 1.0))
+    _sampled_var.set(sample_rate >= 1.0 or random.random() < sample_rate)
+    return correlation_id
+
+
+def configure_logging():
+    """
+    Route all logging through a queue drained by a background thread.
+
+    Environment:
+        LOG_LEVEL        root level (default INFO)
+        LOG_FORMAT       'json' (default) or 'text'
+        LOG_SAMPLE_RATE  fraction of requests whose INFO lines are kept (default 1.0)
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if os.getenv("LOG_FORMAT", "json").lower() == "text":
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(correlation_id)s] %(message)s"
+        ))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    queue_handler = _DeferredQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    _listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,8 +1,9 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import os
 import logging
+import threading
 from dotenv import load_dotenv
 
 # Load environment variables FIRST before importing other modules
@@ -13,13 +14,28 @@ env_path = backend_root / '.env'
 load_dotenv(dotenv_path=env_path)
 
 # Now import the routers after environment variables are loaded
-from app.routers import qsr, test_execution
+from starlette.routing import Match
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.routers import qsr, test_execution, archive, trends, profiling, defects, artifacts, memory, export, links, webhooks
+from app.logging_config import configure_logging, start_request_context, stop_logging, CORRELATION_ID_HEADER
+from app.services.cache_warmer import cache_warmer
+from app.services.webhook_service import webhook_processor
+from app.admission import admission_controller, AdmissionRejected
+from app.services.kissflow_service import kissflow_tenants, TENANT_HEADER, TENANT_QUERY_PARAM
+from app.deadlines import DEADLINE_HEADER, request_timeout, start_deadline
+from app import deadlines
+from app.logging_config import correlation_id_var
+from app.profiling import profiler, PROFILE_HEADER, PROFILE_QUERY_PARAM, PROFILE_ID_HEADER
+from app.memory import memory_monitor, MEMORY_DEGRADED_HEADER
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Configure logging (queue-based, written from a background thread)
+configure_logging()
+
+# Optionally load a synthetic dataset (see generate_data.py) for load testing
+if os.getenv("QSR_SYNTHETIC_DATASET"):
+    from app.synthetic_data import load_dataset, load_into_services
+    load_into_services(load_dataset(os.getenv("QSR_SYNTHETIC_DATASET")))
 
 logger = logging.getLogger(__name__)
 
@@ -48,14 +64,175 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Opt-in per-request profiling. Innermost middleware, so the profile covers
+# the route handler, validation and serialization; the session ends once
+# the response body has been sent or the request is cancelled.
+class ProfilingMiddleware:
+    """
+    Pure ASGI so the sampler thread is stopped on every path, including a
+    client that disconnects before the response body is iterated
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope.get("path", "").startswith("/api/v1/qsr"):
+            return await self.app(scope, receive, send)
+        request = Request(scope)
+        token = request.headers.get(PROFILE_HEADER) or request.query_params.get(PROFILE_QUERY_PARAM)
+        if not token:
+            return await self.app(scope, receive, send)
+        if not profiler.authorized(token):
+            logger.warning("Rejected profiling request with an invalid token")
+            return await self.app(scope, receive, send)
+
+        session = profiler.start_request(correlation_id_var.get() or "request", request.url.path)
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = session.profile_id
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            profiler.finish(session)
+
+app.add_middleware(ProfilingMiddleware)
+
+# Peak traced memory per request, recorded by route template, for every API
+# route except the admin endpoints. Runs inside admission control, so shed
+# requests are not counted.
+def _route_template(request: Request) -> str:
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", request.url.path)
+    return request.url.path
+
+class MemoryMiddleware:
+    """
+    Pure ASGI so the accounting ends on every path, including a client that
+    disconnects before the response body is iterated
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/") or path.startswith("/api/v1/admin/"):
+            return await self.app(scope, receive, send)
+        accounting = memory_monitor.begin_request(path)
+        if accounting is None:
+            return await self.app(scope, receive, send)
+
+        route = _route_template(Request(scope))
+
+        async def send_with_header(message):
+            if message["type"] == "http.response.start" and accounting.degraded:
+                MutableHeaders(scope=message)[MEMORY_DEGRADED_HEADER] = ",".join(accounting.degraded)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_header)
+        finally:
+            memory_monitor.end_request(accounting, route)
+
+app.add_middleware(MemoryMiddleware)
+
+# Deadline and admission control for API routes. Registered before the
+# correlation middleware so it runs inside it and shed responses still
+# carry a request ID. A request first takes a slot from its tenant's share,
+# then one of the server's, so a noisy tenant queues behind its own share.
+def _shed(request: Request, reason: str, message: str) -> JSONResponse:
+    logger.warning("Shedding %s %s: %s", request.method, request.url.path, reason)
+    return JSONResponse(
+        status_code=503,
+        content={
+            "error": "Service Unavailable",
+            "message": message,
+            "status_code": 503
+        },
+        headers={"Retry-After": "1"}
+    )
+
+class AdmissionMiddleware:
+    """
+    Pure ASGI rather than @app.middleware: the slots are released when the
+    app returns, which is after the last body chunk of a streamed response
+    (SSE, exports) or when the request is cancelled because the client went
+    away. A wrapped body iterator is never started, and so never cleaned up,
+    when the client disconnects first.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        path = scope.get("path", "")
+        if scope["type"] != "http" or not path.startswith("/api/") or path.endswith("/health"):
+            return await self.app(scope, receive, send)
+
+        request = Request(scope)
+        start_deadline(request_timeout(path, request.headers.get(DEADLINE_HEADER)))
+        # Unknown tenants are admitted here and rejected by the route
+        tenant = kissflow_tenants.find(request.headers.get(TENANT_HEADER) or request.query_params.get(TENANT_QUERY_PARAM))
+        tenant_admission = tenant.admission if tenant is not None else None
+        if tenant_admission is not None:
+            try:
+                await tenant_admission.acquire(deadlines.remaining())
+            except AdmissionRejected as e:
+                response = _shed(request, f"tenant {tenant.tenant_id} {e.reason}",
+                                 "Tenant is over its share of the server, retry shortly")
+                return await response(scope, receive, send)
+        try:
+            await admission_controller.acquire(deadlines.remaining())
+        except AdmissionRejected as e:
+            if tenant_admission is not None:
+                tenant_admission.release()
+            return await _shed(request, e.reason, "Server is overloaded, retry shortly")(scope, receive, send)
+        except BaseException:
+            # Cancelled while queued (client gone)
+            if tenant_admission is not None:
+                tenant_admission.release()
+            raise
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            admission_controller.release()
+            if tenant_admission is not None:
+                tenant_admission.release()
+
+app.add_middleware(AdmissionMiddleware)
+
+# Correlation ID per request, echoed back to the caller
+@app.middleware("http")
+async def correlation_id_middleware(request: Request, call_next):
+    correlation_id = start_request_context(request.headers.get(CORRELATION_ID_HEADER))
+    response = await call_next(request)
+    response.headers[CORRELATION_ID_HEADER] = correlation_id
+    return response
+
 # Include routers
 app.include_router(qsr.router)
 app.include_router(test_execution.router)
+app.include_router(archive.router)
+app.include_router(trends.router)
+app.include_router(defects.router)
+app.include_router(artifacts.router)
+app.include_router(export.router)
+app.include_router(links.router)
+app.include_router(webhooks.router)
+app.include_router(profiling.router)
+app.include_router(memory.router)
 
 # Global exception handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
-    logger.error(f"Global exception handler caught: {str(exc)}")
+    logger.error("Global exception handler caught: %s", exc)
     return JSONResponse(
         status_code=500,
         content={
@@ -65,6 +242,47 @@ async def global_exception_handler(request, exc):
         }
     )
 
+@app.on_event("startup")
+async def start_cache_warmer():
+    cache_warmer.start()
+
+@app.on_event("startup")
+async def start_memory_tracing():
+    if memory_monitor.trace_on_start:
+        memory_monitor.start()
+
+@app.on_event("startup")
+async def load_trends():
+    # Replay archived reports into the trend aggregates off the event loop,
+    # without holding up startup; trend requests wait for it in the threadpool
+    from app.services.trends_service import trends_service
+    threading.Thread(target=trends_service.load, name="trends-load", daemon=True).start()
+
+@app.on_event("startup")
+async def start_webhook_processor():
+    webhook_processor.start()
+
+@app.on_event("shutdown")
+async def stop_cache_warmer():
+    cache_warmer.stop()
+
+@app.on_event("shutdown")
+async def stop_webhook_processor():
+    webhook_processor.stop()
+
+@app.on_event("shutdown")
+async def flush_trends():
+    from app.services.trends_service import trends_service
+    trends_service.flush()
+
+@app.on_event("shutdown")
+async def stop_profiling():
+    profiler.stop_continuous()
+
+@app.on_event("shutdown")
+async def flush_logs():
+    stop_logging()
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -89,7 +307,7 @@ if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     debug = os.getenv("DEBUG", "True").lower() == "true"
     
-    logger.info(f"Starting QSR Backend API on {host}:{port}")
+    logger.info("Starting QSR Backend API on %s:%s", host, port)
     
     uvicorn.run(
         "app.main:app",
@@ -0,0 +1,329 @@
+"""
+Memory instrumentation built on tracemalloc.
+
+While tracing is on, the monitor can take, list and diff allocation
+snapshots, reports the top allocation sites, and records the peak traced
+memory of every API request per route. A request that ran alone gets its
+exact peak (tracemalloc's peak is reset when it starts); overlapping
+requests fall back to the highest reading at their checkpoints, since
+tracemalloc cannot attribute allocations to a request.
+
+Service code calls `checkpoint(stage, expected)` before memory-heavy
+stages, with an estimate of what the stage will allocate. When the memory
+traced since the request started plus that estimate exceeds the route's
+budget, the checkpoint either raises MemoryBudgetExceeded ('reject') or
+returns True so the caller can skip or slim the stage ('degrade').
+"""
+
+import contextvars
+import hmac
+import logging
+import os
+import sys
+import threading
+import tracemalloc
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Tuple
+
+from app.models import AllocationSite, MemorySnapshotInfo, RouteMemoryStats
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+MEMORY_DEGRADED_HEADER = "X-Memory-Degraded"
+
+BUDGET_ACTIONS = ("reject", "degrade")
+GROUP_BY = ("lineno", "filename", "traceback")
+
+DEFAULT_BUDGET = float(os.getenv("MEMORY_REQUEST_BUDGET_MB", 0))
+
+# Per-route budgets in MB, matched by path prefix (longest first); 0 disables
+ROUTE_MEMORY_BUDGETS: Dict[str, float] = {
+    "/api/v1/qsr/fetch-data": float(os.getenv("MEMORY_BUDGET_FETCH_MB", DEFAULT_BUDGET)),
+}
+
+# Allocations made by the import system and tracemalloc itself are noise here
+_SNAPSHOT_FILTERS = [
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+    tracemalloc.Filter(False, tracemalloc.__file__),
+]
+
+_PATH_PREFIXES = sorted({os.getcwd() + os.sep, *(path + os.sep for path in sys.path if path)}, key=len, reverse=True)
+
+
+class MemoryBudgetExceeded(Exception):
+    """The current request exceeded its memory budget before `stage`"""
+
+    def __init__(self, stage: str, used: int, budget: int):
+        super().__init__(
+            f"Request memory budget exceeded before {stage} ({used / MB:.1f} MB used, budget {budget / MB:.1f} MB)"
+        )
+        self.stage = stage
+        self.used = used
+        self.budget = budget
+
+
+class RequestMemory:
+    """Memory accounting of one request"""
+
+    __slots__ = ("route", "budget", "baseline", "peak", "sequence", "degraded", "rejected")
+
+    def __init__(self, route: str, budget: int, baseline: int, sequence: int):
+        self.route = route
+        self.budget = budget
+        self.baseline = baseline
+        self.peak = baseline
+        self.sequence = sequence
+        self.degraded: List[str] = []
+        self.rejected = False
+
+
+# Accounting of the request being handled (None when not traced)
+_request_var: contextvars.ContextVar[Optional[RequestMemory]] = contextvars.ContextVar("request_memory", default=None)
+
+
+def route_budget(path: str) -> int:
+    for prefix in sorted(ROUTE_MEMORY_BUDGETS, key=len, reverse=True):
+        if path.startswith(prefix):
+            return int(ROUTE_MEMORY_BUDGETS[prefix] * MB)
+    return int(DEFAULT_BUDGET * MB)
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+class _RouteStats:
+    def __init__(self):
+        self.requests = 0
+        self.exclusive = 0
+        self.total_peak = 0
+        self.max_peak = 0
+        self.recent: Deque[int] = deque(maxlen=256)
+        self.degraded = 0
+        self.rejected = 0
+
+
+class MemoryMonitor:
+    """Tracemalloc control, snapshot store and per-route peak memory"""
+
+    def __init__(self):
+        self.trace_frames = int(os.getenv("MEMORY_TRACE_FRAMES", 10))
+        self.budget_action = os.getenv("MEMORY_BUDGET_ACTION", "degrade").lower()
+        self.max_snapshots = int(os.getenv("MEMORY_MAX_SNAPSHOTS", 10))
+        # Admin endpoints token; defaults to the profiling token
+        self.admin_token = os.getenv("MEMORY_ADMIN_TOKEN") or os.getenv("PROFILING_TOKEN", "")
+        self.trace_on_start = (
+            os.getenv("MEMORY_TRACING", "false").lower() == "true"
+            or any(budget > 0 for budget in [DEFAULT_BUDGET, *ROUTE_MEMORY_BUDGETS.values()])
+        )
+        if self.budget_action not in BUDGET_ACTIONS:
+            logger.warning("Unknown MEMORY_BUDGET_ACTION %r, using 'degrade'", self.budget_action)
+            self.budget_action = "degrade"
+        self._lock = threading.Lock()
+        self._snapshots: "OrderedDict[int, Tuple[tracemalloc.Snapshot, MemorySnapshotInfo]]" = OrderedDict()
+        self._next_snapshot_id = 1
+        self._routes: Dict[str, _RouteStats] = {}
+        self._in_flight = 0
+        self._sequence = 0
+
+    @property
+    def admin_enabled(self) -> bool:
+        return bool(self.admin_token)
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return self.admin_enabled and bool(token) and hmac.compare_digest(token, self.admin_token)
+
+    # Tracing
+
+    @property
+    def tracing(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: Optional[int] = None):
+        if frames:
+            self.trace_frames = frames
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.trace_frames)
+            logger.info("Memory tracing started (%d frames per allocation)", self.trace_frames)
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("Memory tracing stopped")
+        with self._lock:
+            # Snapshots stay valid, but request baselines taken while tracing do not
+            self._in_flight = 0
+
+    def traced_memory(self) -> Tuple[int, int]:
+        """(current, peak) traced bytes, zeros while not tracing"""
+        return tracemalloc.get_traced_memory()
+
+    # Per-request accounting
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def begin_request(self, path: str) -> Optional[RequestMemory]:
+        if not tracemalloc.is_tracing():
+            return None
+        with self._lock:
+            self._in_flight += 1
+            self._sequence += 1
+            if self._in_flight == 1:
+                tracemalloc.reset_peak()
+            request = RequestMemory(path, route_budget(path), tracemalloc.get_traced_memory()[0], self._sequence)
+        _request_var.set(request)
+        return request
+
+    def end_request(self, request: RequestMemory, route: str):
+        current, peak = tracemalloc.get_traced_memory()
+        with self._lock:
+            # Nothing else started meanwhile and nothing is still running
+            exclusive = self._sequence == request.sequence and self._in_flight == 1
+            self._in_flight = max(0, self._in_flight - 1)
+            used = max(0, (peak if exclusive else max(request.peak, current)) - request.baseline)
+
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = _RouteStats()
+            stats.requests += 1
+            stats.exclusive += exclusive
+            stats.total_peak += used
+            stats.max_peak = max(stats.max_peak, used)
+            stats.recent.append(used)
+            stats.degraded += bool(request.degraded)
+            stats.rejected += request.rejected
+
+    def checkpoint(self, stage: str, expected: int = 0) -> bool:
+        """
+        Record the current reading for the request and enforce its budget,
+        counting `expected` bytes for the stage about to run. Returns True
+        when the caller should degrade `stage`; raises MemoryBudgetExceeded
+        when over budget and the action is 'reject'.
+        """
+        request = _request_var.get()
+        if request is None or not tracemalloc.is_tracing():
+            return False
+        current = tracemalloc.get_traced_memory()[0]
+        request.peak = max(request.peak, current)
+        used = current - request.baseline + expected
+        if not request.budget or used <= request.budget:
+            return False
+        if self.budget_action == "reject":
+            request.rejected = True
+            raise MemoryBudgetExceeded(stage, used, request.budget)
+        logger.warning("Degrading %s: %.1f MB used, budget %.1f MB", stage, used / MB, request.budget / MB)
+        request.degraded.append(stage)
+        return True
+
+    @staticmethod
+    def current_request() -> Optional[RequestMemory]:
+        return _request_var.get()
+
+    def route_stats(self) -> List[RouteMemoryStats]:
+        with self._lock:
+            routes = list(self._routes.items())
+        result = []
+        for route, stats in routes:
+            recent = sorted(stats.recent)
+            result.append(RouteMemoryStats(
+                route=route,
+                requests=stats.requests,
+                exclusiveRequests=stats.exclusive,
+                avgPeakBytes=stats.total_peak // stats.requests if stats.requests else 0,
+                p95PeakBytes=recent[min(len(recent) - 1, int(len(recent) * 0.95))] if recent else 0,
+                maxPeakBytes=stats.max_peak,
+                budgetBytes=route_budget(route),
+                degraded=stats.degraded,
+                rejected=stats.rejected
+            ))
+        result.sort(key=lambda entry: entry.maxPeakBytes, reverse=True)
+        return result
+
+    # Snapshots
+
+    def _take(self) -> tracemalloc.Snapshot:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Memory tracing is not running")
+        return tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+
+    def take_snapshot(self, label: Optional[str] = None) -> MemorySnapshotInfo:
+        snapshot = self._take()
+        with self._lock:
+            snapshot_id = self._next_snapshot_id
+            self._next_snapshot_id += 1
+            info = MemorySnapshotInfo(
+                snapshotId=snapshot_id,
+                label=label,
+                takenAt=datetime.now(timezone.utc).isoformat(),
+                tracedBytes=sum(trace.size for trace in snapshot.traces),
+                traces=len(snapshot.traces)
+            )
+            self._snapshots[snapshot_id] = (snapshot, info)
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        logger.info("Memory snapshot %d taken (%d bytes traced)", snapshot_id, info.tracedBytes)
+        return info
+
+    def list_snapshots(self) -> List[MemorySnapshotInfo]:
+        with self._lock:
+            return [info for _, info in self._snapshots.values()]
+
+    def delete_snapshot(self, snapshot_id: int):
+        with self._lock:
+            if self._snapshots.pop(snapshot_id, None) is None:
+                raise KeyError(f"Memory snapshot not found: {snapshot_id}")
+
+    def _get_snapshot(self, snapshot_id: Optional[int]) -> tracemalloc.Snapshot:
+        """A stored snapshot, or a fresh one for None"""
+        if snapshot_id is None:
+            return self._take()
+        with self._lock:
+            entry = self._snapshots.get(snapshot_id)
+        if entry is None:
+            raise KeyError(f"Memory snapshot not found: {snapshot_id}")
+        return entry[0]
+
+    @staticmethod
+    def _site(statistic, group_by: str, diff: bool = False) -> AllocationSite:
+        frame = statistic.traceback[0]
+        location = _short_path(frame.filename) if group_by == "filename" else f"{_short_path(frame.filename)}:{frame.lineno}"
+        return AllocationSite(
+            location=location,
+            sizeBytes=statistic.size,
+            count=statistic.count,
+            sizeDiffBytes=statistic.size_diff if diff else None,
+            countDiff=statistic.count_diff if diff else None,
+            traceback=[f"{_short_path(f.filename)}:{f.lineno}" for f in statistic.traceback]
+            if group_by == "traceback" else None
+        )
+
+    def top_sites(self, snapshot_id: Optional[int] = None, group_by: str = "lineno",
+                  limit: int = 20) -> Tuple[int, List[AllocationSite]]:
+        """Largest allocation sites of a snapshot (live if None) and its total traced bytes"""
+        snapshot = self._get_snapshot(snapshot_id)
+        statistics = snapshot.statistics(group_by)
+        total = sum(statistic.size for statistic in statistics)
+        return total, [self._site(statistic, group_by) for statistic in statistics[:limit]]
+
+    def diff(self, from_id: int, to_id: Optional[int] = None, group_by: str = "lineno",
+             limit: int = 20) -> Tuple[int, List[AllocationSite]]:
+        """Sites that grew or shrank most between two snapshots (`to_id` None: now)"""
+        older = self._get_snapshot(from_id)
+        newer = self._get_snapshot(to_id)
+        statistics = newer.compare_to(older, group_by)
+        total = sum(statistic.size_diff for statistic in statistics)
+        return total, [self._site(statistic, group_by, diff=True) for statistic in statistics[:limit]]
+
+
+# Global memory monitor
+memory_monitor = MemoryMonitor()
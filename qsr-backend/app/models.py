@@ -64,6 +64,8 @@ class KissflowResponse(BaseModel):
     success: bool
     data: QsrData
     missingFields: List[str]
+    source: Optional[str] = None  # 'kissflow' | 'cache' | 'mock'
+    degraded: Optional[List[str]] = None
 
 
 class ItemRequest(BaseModel):
@@ -186,4 +188,381 @@ class FeatureCyclesResponse(BaseModel):
 class FeaturesResponse(BaseModel):
     features: List[Feature]
     total: int
-    metadata: Dict[str, Any]
\ No newline at end of file
+    metadata: Dict[str, Any]
+
+# Bulk ingestion of test case execution results
+class IngestionReport(BaseModel):
+    featureId: str
+    cycle: int
+    runId: str
+    format: str
+    rowsReceived: int
+    rowsIngested: int
+    rowsRejected: int
+    batches: int
+    elapsedSeconds: float
+    rowsPerSecond: float
+    errors: List[str]
+    statistics: Optional[TestStatistics] = None
+
+
+# Archive of finalized QSR snapshots
+class SnapshotInfo(BaseModel):
+    snapshotId: int
+    itemId: str
+    quarter: Optional[str] = None
+    archivedAt: str
+    sizeBytes: int
+
+
+class ArchiveRequest(BaseModel):
+    item_id: str
+    data: QsrData
+
+
+class SnapshotListResponse(BaseModel):
+    snapshots: List[SnapshotInfo]
+    total: int
+
+
+class SnapshotResponse(BaseModel):
+    snapshot: SnapshotInfo
+    data: QsrData
+
+
+# Quarter-over-quarter quality trends
+class TrendPoint(BaseModel):
+    teamName: str
+    quarter: str
+    features: int
+    builds: int
+    finalPassRate: Optional[float] = None
+    defectsBySeverity: Dict[str, int]
+    openDefects: int
+    avgTimeToResolveHours: Optional[float] = None
+
+
+class TrendsResponse(BaseModel):
+    trends: List[TrendPoint]
+    total: int
+
+
+# Progress events of a streamed fetch-data request
+class FetchProgressEvent(BaseModel):
+    stage: str
+    source: str  # 'kissflow' | 'cache' | 'mock'
+    done: bool = False
+    data: Optional[QsrData] = None
+    missingFields: Optional[List[str]] = None
+    degraded: Optional[List[str]] = None  # stages slimmed or skipped to stay within the memory budget
+
+
+# Bulk prefetch of Kissflow items by team/quarter
+class PrefetchRequest(BaseModel):
+    team: Optional[str] = None
+    quarter: Optional[str] = None
+    page_size: int = 100
+
+
+class PrefetchReport(BaseModel):
+    team: Optional[str] = None
+    quarter: Optional[str] = None
+    source: str
+    items: int
+    pages: int
+    failedPages: int
+    elapsedSeconds: float
+    itemIds: List[str] = []
+
+
+# Scheduled cache warming
+class CacheWarmerConfig(BaseModel):
+    items: List[str] = []
+    quarter: Optional[str] = None  # 'current' tracks the current quarter
+    intervalSeconds: Optional[float] = None
+
+
+class CacheWarmerStatus(BaseModel):
+    enabled: bool
+    running: bool
+    items: List[str]
+    quarter: Optional[str] = None
+    intervalSeconds: float
+    warmItems: int
+    runs: int
+    lastRunAt: Optional[str] = None
+    lastRunSeconds: Optional[float] = None
+    refreshed: int
+    failed: int
+    warmHits: int
+    warmMisses: int
+    warmHitRatio: float
+    cache: Dict[str, Any]
+
+
+# Sampling profiler artifacts
+class ProfileInfo(BaseModel):
+    profileId: str
+    kind: str  # 'request' | 'continuous'
+    path: Optional[str] = None
+    startedAt: str
+    durationSeconds: float
+    intervalMs: float
+    samples: int
+    sizeBytes: int
+
+
+class ProfileListResponse(BaseModel):
+    profiles: List[ProfileInfo]
+    total: int
+
+
+class ContinuousProfilingRequest(BaseModel):
+    durationSeconds: float = 300
+    intervalMs: float = 50
+
+
+class ContinuousProfilingStatus(BaseModel):
+    active: bool
+    profile: Optional[ProfileInfo] = None
+
+
+# Defect full-text search
+class DefectSearchHit(BaseModel):
+    featureId: str
+    score: float
+    defect: Defect
+
+
+class DefectSearchResponse(BaseModel):
+    query: str
+    total: int
+    hits: List[DefectSearchHit]
+    tookMs: float
+
+
+class DefectsAddedResponse(BaseModel):
+    featureId: str
+    received: int
+    total: int
+
+
+# Near-duplicate defect detection
+class DuplicateMember(BaseModel):
+    featureId: str
+    defectId: str
+    title: Optional[str] = None
+    cycle: Optional[int] = None
+    status: str
+    similarity: float  # Jaccard similarity to the cluster's original report
+
+
+class DuplicateCluster(BaseModel):
+    clusterId: str
+    size: int
+    members: List[DuplicateMember]
+
+
+class DuplicateClustersResponse(BaseModel):
+    featureId: Optional[str] = None
+    clusters: List[DuplicateCluster]
+    total: int
+    totalDefects: Optional[int] = None
+    uniqueDefects: Optional[int] = None
+
+
+class DuplicateScanReport(BaseModel):
+    defects: int
+    candidatePairs: int
+    clusters: int
+    duplicateDefects: int  # cluster members beyond each original report
+    elapsedSeconds: float
+
+
+# Content-addressed cache of rendered report artifacts
+class ArtifactKeyRequest(BaseModel):
+    data: QsrData
+    summaryDate: Optional[str] = None  # YYYY-MM-DD printed on the report; defaults to today
+    clientTemplateVersion: Optional[str] = None  # version of the frontend's PDF/DOCX template
+
+
+class ArtifactKeyResponse(BaseModel):
+    key: str
+    templateVersion: str
+    clientTemplateVersion: Optional[str] = None
+    summaryDate: str
+    cached: List[str]  # formats already rendered for this key
+
+
+class ArtifactInfo(BaseModel):
+    key: str
+    format: str
+    sizeBytes: int
+
+
+class ArtifactCacheStats(BaseModel):
+    entries: int
+    sizeBytes: int
+    maxBytes: int
+    hits: int
+    misses: int
+    hitRatio: float
+    bytesSaved: int  # bytes served from the cache instead of re-rendered
+    stores: int
+    evictions: int
+    hitsByFormat: Dict[str, int]
+
+
+# Memory instrumentation (tracemalloc)
+class MemorySnapshotInfo(BaseModel):
+    snapshotId: int
+    label: Optional[str] = None
+    takenAt: str
+    tracedBytes: int
+    traces: int
+
+
+class AllocationSite(BaseModel):
+    location: str  # file:line, or file when grouped by filename
+    sizeBytes: int
+    count: int
+    sizeDiffBytes: Optional[int] = None
+    countDiff: Optional[int] = None
+    traceback: Optional[List[str]] = None  # most recent frame first, when grouped by traceback
+
+
+class MemoryTopResponse(BaseModel):
+    snapshotId: Optional[int] = None  # None: live snapshot
+    groupBy: str
+    totalBytes: int
+    sites: List[AllocationSite]
+
+
+class MemoryDiffResponse(BaseModel):
+    fromSnapshotId: int
+    toSnapshotId: Optional[int] = None  # None: compared against a live snapshot
+    groupBy: str
+    totalDiffBytes: int
+    sites: List[AllocationSite]
+
+
+class RouteMemoryStats(BaseModel):
+    route: str
+    requests: int
+    exclusiveRequests: int  # requests that ran alone, with exact peaks
+    avgPeakBytes: int
+    p95PeakBytes: int
+    maxPeakBytes: int
+    budgetBytes: int
+    degraded: int
+    rejected: int
+
+
+class MemoryStatus(BaseModel):
+    tracing: bool
+    traceFrames: int
+    tracedBytes: int
+    peakBytes: int
+    budgetAction: str
+    snapshots: List[MemorySnapshotInfo]
+    routes: List[RouteMemoryStats]
+
+
+class MemoryTracingRequest(BaseModel):
+    enabled: bool
+    frames: Optional[int] = None
+
+
+class MemorySnapshotRequest(BaseModel):
+    label: Optional[str] = None
+
+
+# Kissflow tenants (accounts) and their isolated resources
+class TenantStatus(BaseModel):
+    tenantId: str
+    configured: bool
+    baseUrl: Optional[str] = None
+    poolSize: int
+    fetches: Dict[str, int]
+    upstreamErrors: int
+    rateLimit: Dict[str, Any]
+    cache: Dict[str, Any]
+    admission: Dict[str, Any]
+
+
+class TenantListResponse(BaseModel):
+    tenants: List[TenantStatus]
+    total: int
+
+
+# Artifact link health checks
+class LinkCheckResult(BaseModel):
+    url: str
+    field: Optional[str] = None
+    status: str  # 'ok' | 'restricted' | 'broken' | 'error' | 'timeout' | 'unreachable' | 'invalid' | 'blocked'
+    httpStatus: Optional[int] = None
+    finalUrl: Optional[str] = None
+    message: Optional[str] = None
+    warnings: Optional[List[str]] = None
+    elapsedMs: float = 0.0
+    checkedAt: str
+    cached: bool = False
+
+
+class ReportLinkCheck(BaseModel):
+    itemId: Optional[str] = None
+    links: List[LinkCheckResult]
+    healthy: int
+    unhealthy: int
+    warnings: int
+
+
+class LinkCheckReport(BaseModel):
+    itemId: Optional[str] = None
+    data: QsrData
+
+
+class LinkCheckRequest(BaseModel):
+    reports: List[LinkCheckReport] = []
+    quarter: Optional[str] = None  # also check every archived report of this quarter
+    refresh: bool = False
+
+
+class LinkCheckResponse(BaseModel):
+    reports: List[ReportLinkCheck]
+    total: int
+    healthy: int
+    unhealthy: int
+    warnings: int
+    uniqueUrls: int
+    cachedUrls: int
+    elapsedSeconds: float
+
+
+# Kissflow webhook receiver
+class WebhookAccepted(BaseModel):
+    accepted: bool
+    itemId: str
+    event: str
+    tenantId: str
+    coalesced: bool  # joined changes of the item already waiting
+    pending: int
+
+
+class WebhookStatus(BaseModel):
+    running: bool
+    debounceSeconds: float
+    maxDelaySeconds: float
+    received: int
+    rejected: int
+    coalesced: int
+    pending: int
+    processed: int
+    applied: int  # mapped from the event payload, no upstream call
+    refreshed: int
+    invalidated: int
+    failed: int
+    superseded: int  # refreshes dropped because a newer event arrived meanwhile
+    trendsMoved: int
+    trendsRemoved: int
+    lastProcessedAt: Optional[str] = None
@@ -0,0 +1,307 @@
+"""
+Opt-in sampling profiler.
+
+A profile session runs a background thread that periodically captures the
+Python stacks of the threads it watches (sys._current_frames) and counts
+identical stacks. Sessions are written as folded stacks - one
+`frame;frame;frame count` line per distinct stack - which flamegraph.pl,
+inferno and speedscope render directly.
+
+Per-request sessions watch the event loop thread while the request is
+active plus any worker thread that runs the request's code through
+`tracked` / `tracked_iter`. The event loop also runs every other request
+in flight, so its samples are not exclusive to the profiled request: they
+sit under an `event-loop (shared)` root frame, and worker thread samples
+are the request's own. Continuous sessions watch every thread at a low rate
+for a fixed window.
+"""
+
+import contextvars
+import functools
+import hmac
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Iterator, List, Optional, TypeVar
+
+from app.models import ProfileInfo
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_QUERY_PARAM = "profile_token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+T = TypeVar("T")
+
+# Session profiling the request being handled (None when not profiled)
+_session_var: contextvars.ContextVar[Optional["ProfileSession"]] = contextvars.ContextVar("profile_session", default=None)
+
+# Root frame of samples taken from a thread other requests also run on
+SHARED_ROOT = "event-loop (shared)"
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{frame.f_globals.get('__name__', '?')}:{name}".replace(";", ":")
+
+
+def fold_stack(frame, root: Optional[str] = None) -> str:
+    """Folded representation of a stack, outermost frame first"""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    if root:
+        labels.append(root)
+    return ";".join(reversed(labels))
+
+
+class ProfileSession:
+    """Samples a set of threads (or all threads) until stopped"""
+
+    def __init__(self, profile_id: str, kind: str, interval: float,
+                 path: Optional[str] = None, all_threads: bool = False):
+        self.profile_id = profile_id
+        self.kind = kind
+        self.interval = interval
+        self.path = path
+        self.all_threads = all_threads
+        self.counts: Counter = Counter()
+        self.samples = 0
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._threads: Counter = Counter()
+        self._shared: set = set()
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sampler = threading.Thread(target=self._run, name=f"profiler-{profile_id}", daemon=True)
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._sampler.is_alive() and self._sampler is not threading.current_thread():
+            self._sampler.join(timeout=1)
+        self.finished_at = self.finished_at or time.time()
+
+    @property
+    def active(self) -> bool:
+        return not self._stopped.is_set()
+
+    def enlist(self, thread_id: int, shared: bool = False):
+        """Sample `thread_id`; `shared` marks a thread that also runs other work"""
+        with self._lock:
+            self._threads[thread_id] += 1
+            if shared:
+                self._shared.add(thread_id)
+
+    def delist(self, thread_id: int):
+        with self._lock:
+            self._threads[thread_id] -= 1
+            if self._threads[thread_id] <= 0:
+                del self._threads[thread_id]
+                self._shared.discard(thread_id)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            if self.all_threads:
+                names = {thread.ident: thread.name for thread in threading.enumerate()}
+                targets = [(thread_id, names.get(thread_id, str(thread_id))) for thread_id in frames if thread_id != own_id]
+            else:
+                with self._lock:
+                    targets = [(thread_id, SHARED_ROOT if thread_id in self._shared else None)
+                               for thread_id in self._threads]
+            for thread_id, root in targets:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.counts[fold_stack(frame, root)] += 1
+                    self.samples += 1
+            del frames
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+    def info(self, size_bytes: int = 0) -> ProfileInfo:
+        finished_at = self.finished_at or time.time()
+        return ProfileInfo(
+            profileId=self.profile_id,
+            kind=self.kind,
+            path=self.path,
+            startedAt=datetime.fromtimestamp(self.started_at, tz=timezone.utc).isoformat(),
+            durationSeconds=round(finished_at - self.started_at, 3),
+            intervalMs=round(self.interval * 1000, 3),
+            samples=self.samples,
+            sizeBytes=size_bytes
+        )
+
+
+class Profiler:
+    """
+    Authenticates opt-in requests, runs sessions and stores their folded
+    stacks under `directory`, keeping at most `max_artifacts` profiles.
+    """
+
+    def __init__(self):
+        self.token = os.getenv("PROFILING_TOKEN", "")
+        self.directory = os.getenv("PROFILE_DIR", "data/profiles")
+        self.request_interval = float(os.getenv("PROFILE_INTERVAL_MS", 5)) / 1000
+        self.max_artifacts = int(os.getenv("PROFILE_MAX_ARTIFACTS", 200))
+        self._lock = threading.Lock()
+        self._continuous: Optional[ProfileSession] = None
+        self._continuous_timer: Optional[threading.Timer] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return self.enabled and bool(token) and hmac.compare_digest(token, self.token)
+
+    @staticmethod
+    def safe_id(profile_id: str) -> str:
+        return _SAFE_ID.sub("_", profile_id)[:128]
+
+    # Per-request profiling
+
+    def start_request(self, request_id: str, path: str) -> ProfileSession:
+        session = ProfileSession(self.safe_id(request_id), "request", self.request_interval, path=path)
+        session.enlist(threading.get_ident(), shared=True)
+        _session_var.set(session)
+        session.start()
+        return session
+
+    def finish(self, session: ProfileSession) -> ProfileInfo:
+        session.stop()
+        return self._save(session)
+
+    # Continuous low-rate profiling
+
+    def start_continuous(self, duration: float, interval: float) -> ProfileInfo:
+        with self._lock:
+            if self._continuous is not None and self._continuous.active:
+                raise RuntimeError("Continuous profiling is already running")
+            profile_id = f"continuous-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')}"
+            session = ProfileSession(profile_id, "continuous", interval, all_threads=True)
+            self._continuous = session
+            self._continuous_timer = threading.Timer(duration, self.stop_continuous)
+            self._continuous_timer.daemon = True
+            session.start()
+            self._continuous_timer.start()
+        logger.info("Continuous profiling started for %.0fs at %.0fms intervals", duration, interval * 1000)
+        return session.info()
+
+    def stop_continuous(self) -> Optional[ProfileInfo]:
+        with self._lock:
+            session, self._continuous = self._continuous, None
+            if self._continuous_timer is not None:
+                self._continuous_timer.cancel()
+                self._continuous_timer = None
+        if session is None or not session.active:
+            return None
+        info = self.finish(session)
+        logger.info("Continuous profiling stopped after %d samples", session.samples)
+        return info
+
+    def continuous_status(self) -> Optional[ProfileInfo]:
+        session = self._continuous
+        return session.info() if session is not None and session.active else None
+
+    # Artifacts
+
+    def _artifact_path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{self.safe_id(profile_id)}.{extension}")
+
+    def _save(self, session: ProfileSession) -> ProfileInfo:
+        os.makedirs(self.directory, exist_ok=True)
+        payload = session.folded().encode("utf-8")
+        with open(self._artifact_path(session.profile_id, "folded"), "wb") as f:
+            f.write(payload)
+        info = session.info(size_bytes=len(payload))
+        with open(self._artifact_path(session.profile_id, "json"), "w") as f:
+            f.write(info.model_dump_json())
+        self._prune()
+        logger.info("Saved profile %s (%d samples)", session.profile_id, session.samples)
+        return info
+
+    def _prune(self):
+        metadata = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in metadata[:max(0, len(metadata) - self.max_artifacts)]:
+            profile_id = entry.name[:-len(".json")]
+            for extension in ("json", "folded"):
+                try:
+                    os.remove(self._artifact_path(profile_id, extension))
+                except FileNotFoundError:
+                    pass
+
+    def list_profiles(self) -> List[ProfileInfo]:
+        if not os.path.isdir(self.directory):
+            return []
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                with open(entry.path) as f:
+                    profiles.append(ProfileInfo(**json.load(f)))
+        profiles.sort(key=lambda info: info.startedAt, reverse=True)
+        return profiles
+
+    def read_profile(self, profile_id: str) -> str:
+        """Folded stacks of a stored profile; raises KeyError if it does not exist"""
+        try:
+            with open(self._artifact_path(profile_id, "folded")) as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(f"Profile not found: {profile_id}")
+
+
+def tracked(func: Callable[..., T]) -> Callable[..., T]:
+    """Wrap threadpool work so the current request's profile samples its thread"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        session = _session_var.get()
+        if session is None:
+            return func(*args, **kwargs)
+        thread_id = threading.get_ident()
+        session.enlist(thread_id)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            session.delist(thread_id)
+    return wrapper
+
+
+def tracked_iter(iterator: Iterator[T]) -> Iterator[T]:
+    """Like `tracked`, for sync generators iterated from the threadpool"""
+    iterator = iter(iterator)
+    while True:
+        session = _session_var.get()
+        thread_id = threading.get_ident()
+        if session is not None:
+            session.enlist(thread_id)
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            if session is not None:
+                session.delist(thread_id)
+        yield item
+
+
+# Global profiler
+profiler = Profiler()
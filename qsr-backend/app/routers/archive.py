@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from app.models import ArchiveRequest, SnapshotInfo, SnapshotListResponse, SnapshotResponse
+from app.services.archive_service import archive_service
+from app.services.trends_service import trends_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/qsr/archive", tags=["Archive"])
+
+
+@router.post("", response_model=SnapshotInfo, status_code=status.HTTP_201_CREATED)
+async def archive_snapshot(request: ArchiveRequest):
+    """
+    Archive the finalized QsrData of an exported report
+    """
+    if not request.item_id.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Item ID is required"
+        )
+
+    def store() -> SnapshotInfo:
+        snapshot = archive_service.append(request.item_id, request.data)
+        trends_service.record_report(request.item_id, request.data, snapshot_id=snapshot.snapshotId)
+        return snapshot
+
+    try:
+        # Appending fsyncs and remaps the file; keep it off the event loop
+        return await run_in_threadpool(store)
+    except Exception as e:
+        logger.error("Error archiving snapshot for item %s: %s", request.item_id, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to archive snapshot: {str(e)}"
+        )
+
+
+@router.get("", response_model=SnapshotListResponse)
+async def list_snapshots(item_id: Optional[str] = None, quarter: Optional[str] = None):
+    """
+    List archived snapshots, optionally filtered by item ID and quarter
+    """
+    snapshots = await run_in_threadpool(archive_service.list_snapshots, item_id=item_id, quarter=quarter)
+    return SnapshotListResponse(snapshots=snapshots, total=len(snapshots))
+
+
+@router.get("/{snapshot_id}", response_model=SnapshotResponse)
+async def get_snapshot(snapshot_id: int):
+    """
+    Retrieve a single archived snapshot
+    """
+    def load() -> SnapshotResponse:
+        return SnapshotResponse(
+            snapshot=archive_service.get_snapshot_info(snapshot_id),
+            data=archive_service.get_snapshot(snapshot_id)
+        )
+
+    try:
+        return await run_in_threadpool(load)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
@@ -0,0 +1,147 @@
+from datetime import date
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
+from app.models import ArtifactCacheStats, ArtifactInfo, ArtifactKeyRequest, ArtifactKeyResponse
+from typing import Optional
+from app.services.artifact_cache import (
+    ARTIFACT_FORMATS, ARTIFACT_TOKEN_HEADER, TEMPLATE_VERSION, UPLOAD_FORMATS, UPLOAD_SIGNATURES, artifact_cache, content_key, valid_key
+)
+from app.services.report_renderer import render_html, render_pass_rate_svg
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/qsr/artifacts", tags=["Artifacts"])
+
+# Formats the backend renders itself; DOCX and PDF are rendered by the client and uploaded
+RENDERERS = {
+    "html": lambda request: render_html(request.data, request.summaryDate),
+    "svg": lambda request: render_pass_rate_svg(request.data),
+}
+
+ARTIFACT_KEY_HEADER = "X-Artifact-Key"
+ARTIFACT_CACHE_HEADER = "X-Artifact-Cache"
+
+
+def _summary_date(request: ArtifactKeyRequest) -> str:
+    if not request.summaryDate:
+        return date.today().isoformat()
+    try:
+        return date.fromisoformat(request.summaryDate).isoformat()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="summaryDate must be YYYY-MM-DD"
+        )
+
+
+def _check_artifact(key: str, fmt: str):
+    if not valid_key(key):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid artifact key")
+    if fmt not in ARTIFACT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format: {fmt}. Supported: {', '.join(ARTIFACT_FORMATS)}"
+        )
+
+
+def _key(request: ArtifactKeyRequest) -> str:
+    return content_key(request.data, request.summaryDate, client_template_version=request.clientTemplateVersion)
+
+
+def require_upload_token(token: Optional[str] = Header(None, alias=ARTIFACT_TOKEN_HEADER)):
+    if not artifact_cache.uploads_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Artifact uploads are disabled (ARTIFACT_UPLOAD_TOKEN is not set)"
+        )
+    if not artifact_cache.authorized(token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Missing or invalid {ARTIFACT_TOKEN_HEADER} header"
+        )
+
+
+def _artifact_response(content: bytes, key: str, fmt: str, hit: bool) -> Response:
+    return Response(
+        content=content,
+        media_type=ARTIFACT_FORMATS[fmt],
+        headers={ARTIFACT_KEY_HEADER: key, ARTIFACT_CACHE_HEADER: "hit" if hit else "miss"}
+    )
+
+
+@router.post("/key", response_model=ArtifactKeyResponse)
+async def get_artifact_key(request: ArtifactKeyRequest):
+    """
+    Content key of a report (normalized QsrData, summary date and the
+    backend and client template versions) and the formats already cached for it
+    """
+    request.summaryDate = _summary_date(request)
+    key = _key(request)
+    return ArtifactKeyResponse(
+        key=key,
+        templateVersion=TEMPLATE_VERSION,
+        clientTemplateVersion=request.clientTemplateVersion,
+        summaryDate=request.summaryDate,
+        cached=artifact_cache.formats(key)
+    )
+
+
+@router.post("/render/{fmt}")
+async def render_artifact(fmt: str, request: ArtifactKeyRequest):
+    """
+    Render the report as HTML or its pass-rate chart as SVG, served from the
+    cache when the same content was rendered before
+    """
+    if fmt not in RENDERERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Server-side rendering supports: {', '.join(RENDERERS)}"
+        )
+    request.summaryDate = _summary_date(request)
+    key = _key(request)
+    content, hit = await run_in_threadpool(
+        artifact_cache.get_or_render, key, fmt, lambda: RENDERERS[fmt](request).encode("utf-8")
+    )
+    return _artifact_response(content, key, fmt, hit)
+
+
+@router.get("/stats", response_model=ArtifactCacheStats)
+async def get_artifact_cache_stats():
+    """Artifact cache size, hit ratio and bytes served without re-rendering"""
+    return artifact_cache.stats()
+
+
+@router.get("/{key}/{fmt}")
+async def get_artifact(key: str, fmt: str):
+    """Download a cached artifact; 404 means it has to be rendered"""
+    _check_artifact(key, fmt)
+    content = await run_in_threadpool(artifact_cache.get, key, fmt)
+    if content is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Artifact not cached: {key}.{fmt}")
+    return _artifact_response(content, key, fmt, True)
+
+
+@router.put("/{key}/{fmt}", response_model=ArtifactInfo, status_code=status.HTTP_201_CREATED,
+            dependencies=[Depends(require_upload_token)])
+async def store_artifact(key: str, fmt: str, request: Request):
+    """Store a PDF or DOCX rendered by the client (raw body) under its content key"""
+    _check_artifact(key, fmt)
+    if fmt not in UPLOAD_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Only client-rendered formats can be uploaded: {', '.join(UPLOAD_FORMATS)}"
+        )
+    content = await request.body()
+    if not content:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Artifact body is empty")
+    if not content.startswith(UPLOAD_SIGNATURES[fmt]):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Artifact body is not a {fmt.upper()} file")
+    stored = await run_in_threadpool(artifact_cache.put, key, fmt, content)
+    if not stored:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail="Artifact exceeds the cache size cap"
+        )
+    return ArtifactInfo(key=key, format=fmt, sizeBytes=len(content))
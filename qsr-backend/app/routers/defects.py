@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+from app.models import (
+    Defect, DefectSearchResponse, DefectsAddedResponse, DuplicateClustersResponse, DuplicateScanReport
+)
+from app.services.defect_service import defect_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/defects", tags=["Defects"])
+
+
+@router.get("/search", response_model=DefectSearchResponse)
+async def search_defects(
+    q: str = "",
+    feature_id: Optional[str] = None,
+    defect_status: Optional[str] = Query(None, alias="status"),
+    severity: Optional[str] = None,
+    cycle: Optional[int] = None,
+    environment: Optional[str] = None,
+    limit: int = 20,
+    offset: int = 0
+):
+    """
+    Ranked full-text search over defect title, description, reproduction
+    steps and expected/actual results, optionally filtered by feature,
+    status, severity, cycle and environment
+    """
+    if not 1 <= limit <= 200 or offset < 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="limit must be between 1 and 200 and offset non-negative"
+        )
+
+    # The first search builds the index, which may take a moment on large data sets
+    return await run_in_threadpool(
+        defect_service.search_defects, q, feature_id=feature_id, status=defect_status,
+        severity=severity, cycle=cycle, environment=environment, limit=limit, offset=offset
+    )
+
+
+@router.get("/duplicates", response_model=DuplicateClustersResponse)
+async def get_duplicate_clusters(feature_id: Optional[str] = None):
+    """
+    Near-duplicate clusters (re-filed bugs) involving a feature's defects, or
+    all clusters. Each cluster lists the original report first.
+    """
+    return await run_in_threadpool(defect_service.get_duplicate_clusters, feature_id)
+
+
+@router.post("/duplicates/scan", response_model=DuplicateScanReport)
+async def scan_duplicates():
+    """Rebuild duplicate clusters over all defects (batch job)"""
+    return await run_in_threadpool(defect_service.scan_duplicates)
+
+
+@router.post("/features/{feature_id}", response_model=DefectsAddedResponse, status_code=status.HTTP_201_CREATED)
+async def add_defects(feature_id: str, defects: List[Defect]):
+    """Add or update defects of a feature; search index and duplicate clusters are updated in place"""
+    total = await run_in_threadpool(defect_service.add_defects, feature_id, defects)
+    logger.info("Added %d defects to feature %s", len(defects), feature_id)
+    return DefectsAddedResponse(featureId=feature_id, received=len(defects), total=total)
@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import Iterator, Optional
+from app.routers.qsr import get_tenant_service
+from app.services.export_service import (
+    EXPORT_FORMATS, EXPORT_SOURCES, export_filename, iter_csv, iter_rows, iter_xlsx, uses_archive
+)
+from app.services.kissflow_service import KissflowService
+from app.profiling import tracked_iter
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/qsr/export", tags=["Export"])
+
+
+@router.get("")
+async def export_quarter(quarter: str, format: str = "csv", team: Optional[str] = None, source: str = "all",
+                         kissflow_service: KissflowService = Depends(get_tenant_service)):
+    """
+    Stream one spreadsheet covering every feature of a quarter: QsrData
+    scalar fields, per-build metrics and defect counts by severity, one row
+    per build. `source` picks archived reports (default tenant only), live
+    Kissflow items of the selected tenant, or both (archived reports win).
+    """
+    if not quarter.strip():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="quarter is required")
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format: {format}. Supported: {', '.join(EXPORT_FORMATS)}"
+        )
+    if source not in EXPORT_SOURCES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"source must be one of: {', '.join(EXPORT_SOURCES)}"
+        )
+    if source == "archive" and not uses_archive(kissflow_service):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The archive holds default-tenant reports only; use source=kissflow"
+        )
+
+    logger.info("Exporting quarter %s as %s (team=%s, source=%s)", quarter, format, team, source)
+    rows = iter_rows(quarter, team, source, kissflow_service)
+    body = iter_csv(rows) if format == "csv" else iter_xlsx(rows)
+
+    def logged(chunks: Iterator[bytes]) -> Iterator[bytes]:
+        # Headers are sent by now, so a failure can only cut the download short
+        try:
+            yield from chunks
+        except Exception as e:
+            logger.error("Export of quarter %s failed mid-stream: %s", quarter, e)
+            raise
+
+    # The sync generator is iterated in the threadpool, off the event loop
+    return StreamingResponse(
+        tracked_iter(logged(body)),
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{export_filename(quarter, format, team)}"',
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
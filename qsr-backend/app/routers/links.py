@@ -0,0 +1,80 @@
+import time
+from fastapi import APIRouter, HTTPException, status
+from app.models import LinkCheckRequest, LinkCheckResponse
+from app.routers.qsr import _deadline_exceeded, _run_with_deadline
+from app.deadlines import DeadlineExceeded
+from app.services.link_checker import HEALTHY_STATUSES, link_checker, normalize_url
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/qsr/links", tags=["Links"])
+
+MAX_REPORTS = 2000
+
+
+def _collect_reports(request: LinkCheckRequest):
+    reports = [(report.itemId, report.data) for report in request.reports]
+    if request.quarter:
+        from app.services.archive_service import archive_service
+        for snapshot_id, item_id in archive_service.iter_latest(request.quarter):
+            reports.append((item_id, archive_service.get_snapshot(snapshot_id)))
+            if len(reports) > MAX_REPORTS:
+                break
+    return reports
+
+
+def _check(request: LinkCheckRequest) -> LinkCheckResponse:
+    started = time.perf_counter()
+    reports = _collect_reports(request)
+    if len(reports) > MAX_REPORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_REPORTS} reports per request"
+        )
+
+    checked = link_checker.check_reports(reports, request.refresh)
+    links = [link for report in checked for link in report.links]
+    unique = {normalize_url(link.url): link.cached for link in links}
+    return LinkCheckResponse(
+        reports=checked,
+        total=len(links),
+        healthy=sum(link.status in HEALTHY_STATUSES for link in links),
+        unhealthy=sum(link.status not in HEALTHY_STATUSES for link in links),
+        warnings=sum(bool(link.warnings) for link in links),
+        uniqueUrls=len(unique),
+        cachedUrls=sum(unique.values()),
+        elapsedSeconds=round(time.perf_counter() - started, 3)
+    )
+
+
+@router.post("/check", response_model=LinkCheckResponse)
+async def check_links(request: LinkCheckRequest):
+    """
+    Check every artifact link of the given reports, and of the archived
+    reports of `quarter` if set. Links are checked concurrently and cached;
+    `refresh` re-checks cached ones. Each link reports its status
+    (ok, restricted, broken, error, timeout, unreachable or invalid) and
+    warnings for links that seem to point to the wrong thing.
+    """
+    if not request.reports and not request.quarter:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Provide reports and/or a quarter"
+        )
+    try:
+        result = await _run_with_deadline(_check, request)
+    except DeadlineExceeded as e:
+        # Checks still running finish in the background and land in the cache
+        raise _deadline_exceeded(e)
+    logger.info(
+        "Checked %d links (%d unique, %d cached) of %d reports in %.3fs: %d unhealthy",
+        result.total, result.uniqueUrls, result.cachedUrls, len(result.reports), result.elapsedSeconds, result.unhealthy
+    )
+    return result
+
+
+@router.get("/stats")
+async def get_link_check_stats():
+    """Checks made, checks joined while in flight, pool limits and cache statistics"""
+    return link_checker.stats()
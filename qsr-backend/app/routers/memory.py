@@ -0,0 +1,144 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+from app.models import (
+    MemoryDiffResponse, MemorySnapshotInfo, MemorySnapshotRequest, MemoryStatus, MemoryTopResponse,
+    MemoryTracingRequest, RouteMemoryStats
+)
+from app.memory import memory_monitor, GROUP_BY
+from app.profiling import PROFILE_HEADER
+
+
+def require_memory_token(token: Optional[str] = Header(None, alias=PROFILE_HEADER)):
+    if not memory_monitor.admin_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Memory diagnostics are disabled (MEMORY_ADMIN_TOKEN and PROFILING_TOKEN are not set)"
+        )
+    if not memory_monitor.authorized(token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Missing or invalid {PROFILE_HEADER} header"
+        )
+
+
+router = APIRouter(
+    prefix="/api/v1/admin/memory",
+    tags=["Admin"],
+    dependencies=[Depends(require_memory_token)]
+)
+
+
+def _check_group_by(group_by: str):
+    if group_by not in GROUP_BY:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"group_by must be one of: {', '.join(GROUP_BY)}"
+        )
+
+
+def _check_limit(limit: int):
+    if not 1 <= limit <= 500:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="limit must be between 1 and 500")
+
+
+def _require_tracing():
+    if not memory_monitor.tracing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Memory tracing is not running (enable it with POST /api/v1/admin/memory/tracing)"
+        )
+
+
+@router.get("", response_model=MemoryStatus)
+async def get_memory_status():
+    """Tracing state, traced/peak bytes, stored snapshots and per-route peaks"""
+    current, peak = memory_monitor.traced_memory()
+    return MemoryStatus(
+        tracing=memory_monitor.tracing,
+        traceFrames=memory_monitor.trace_frames,
+        tracedBytes=current,
+        peakBytes=peak,
+        budgetAction=memory_monitor.budget_action,
+        snapshots=memory_monitor.list_snapshots(),
+        routes=memory_monitor.route_stats()
+    )
+
+
+@router.post("/tracing", response_model=MemoryStatus)
+async def set_memory_tracing(request: MemoryTracingRequest):
+    """Start or stop tracemalloc; tracing slows allocation-heavy code noticeably"""
+    if request.frames is not None and not 1 <= request.frames <= 100:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="frames must be between 1 and 100")
+    if request.enabled:
+        memory_monitor.start(request.frames)
+    else:
+        memory_monitor.stop()
+    return await get_memory_status()
+
+
+@router.get("/routes", response_model=List[RouteMemoryStats])
+async def get_route_memory():
+    """Peak traced memory per request, by route, largest first"""
+    return memory_monitor.route_stats()
+
+
+@router.post("/snapshots", response_model=MemorySnapshotInfo, status_code=status.HTTP_201_CREATED)
+async def take_memory_snapshot(request: MemorySnapshotRequest):
+    """Take and keep an allocation snapshot (oldest are dropped past MEMORY_MAX_SNAPSHOTS)"""
+    _require_tracing()
+    return await run_in_threadpool(memory_monitor.take_snapshot, request.label)
+
+
+@router.get("/snapshots", response_model=List[MemorySnapshotInfo])
+async def list_memory_snapshots():
+    return memory_monitor.list_snapshots()
+
+
+@router.delete("/snapshots/{snapshot_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_memory_snapshot(snapshot_id: int):
+    try:
+        memory_monitor.delete_snapshot(snapshot_id)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+
+
+@router.get("/top", response_model=MemoryTopResponse)
+async def get_top_allocations(snapshot_id: Optional[int] = None, group_by: str = "lineno", limit: int = 20):
+    """
+    Largest allocation sites of a stored snapshot, or of a live one without
+    `snapshot_id`. group_by: lineno, filename or traceback.
+    """
+    _check_group_by(group_by)
+    _check_limit(limit)
+    if snapshot_id is None:
+        _require_tracing()
+    try:
+        total, sites = await run_in_threadpool(memory_monitor.top_sites, snapshot_id, group_by, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+    return MemoryTopResponse(snapshotId=snapshot_id, groupBy=group_by, totalBytes=total, sites=sites)
+
+
+@router.get("/diff", response_model=MemoryDiffResponse)
+async def diff_memory_snapshots(from_id: int, to_id: Optional[int] = None,
+                                group_by: str = "lineno", limit: int = 20):
+    """
+    Allocation sites that changed most between two snapshots, or between a
+    snapshot and now without `to_id`
+    """
+    _check_group_by(group_by)
+    _check_limit(limit)
+    if to_id is None:
+        _require_tracing()
+    try:
+        total, sites = await run_in_threadpool(memory_monitor.diff, from_id, to_id, group_by, limit)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+    return MemoryDiffResponse(
+        fromSnapshotId=from_id,
+        toSnapshotId=to_id,
+        groupBy=group_by,
+        totalDiffBytes=total,
+        sites=sites
+    )
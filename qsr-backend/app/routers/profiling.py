@@ -0,0 +1,76 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from typing import Optional
+from app.models import ContinuousProfilingRequest, ContinuousProfilingStatus, ProfileListResponse
+from app.profiling import profiler, PROFILE_HEADER
+
+router = APIRouter(prefix="/api/v1/admin/profiling", tags=["Admin"])
+
+
+def require_profiling_token(token: Optional[str] = Header(None, alias=PROFILE_HEADER)):
+    if not profiler.enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiling is disabled (PROFILING_TOKEN is not set)"
+        )
+    if not profiler.authorized(token):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"Missing or invalid {PROFILE_HEADER} header"
+        )
+
+
+@router.get("/profiles", response_model=ProfileListResponse, dependencies=[Depends(require_profiling_token)])
+async def list_profiles():
+    """Stored profiles, newest first"""
+    profiles = profiler.list_profiles()
+    return ProfileListResponse(profiles=profiles, total=len(profiles))
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse,
+            dependencies=[Depends(require_profiling_token)])
+async def get_profile(profile_id: str):
+    """
+    Folded stacks of a profile (profile IDs of per-request profiles are the
+    request IDs). Feed to flamegraph.pl, inferno or speedscope.
+    """
+    try:
+        return PlainTextResponse(profiler.read_profile(profile_id))
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/continuous", response_model=ContinuousProfilingStatus, dependencies=[Depends(require_profiling_token)])
+async def get_continuous_profiling():
+    profile = profiler.continuous_status()
+    return ContinuousProfilingStatus(active=profile is not None, profile=profile)
+
+
+@router.post("/continuous", response_model=ContinuousProfilingStatus, dependencies=[Depends(require_profiling_token)])
+async def start_continuous_profiling(request: ContinuousProfilingRequest):
+    """Sample all threads at a low rate for a time window; saved when the window closes"""
+    if not 0 < request.durationSeconds <= 3600:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="durationSeconds must be between 0 and 3600"
+        )
+    if request.intervalMs < 10:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="intervalMs must be at least 10 for continuous sampling"
+        )
+
+    try:
+        profile = profiler.start_continuous(request.durationSeconds, request.intervalMs / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return ContinuousProfilingStatus(active=True, profile=profile)
+
+
+@router.delete("/continuous", response_model=ContinuousProfilingStatus, dependencies=[Depends(require_profiling_token)])
+async def stop_continuous_profiling():
+    """End the current window early and save its profile"""
+    profile = profiler.stop_continuous()
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Continuous profiling is not running")
+    return ContinuousProfilingStatus(active=False, profile=profile)
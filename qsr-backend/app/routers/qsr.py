@@ -1,58 +1,238 @@
-from fastapi import APIRouter, HTTPException, status
-from app.models import KissflowResponse, ItemRequest, ErrorResponse
-from app.services.kissflow_service import kissflow_service
+import asyncio
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
+from app.models import (
+    KissflowResponse, ItemRequest, ErrorResponse, PrefetchRequest, PrefetchReport,
+    CacheWarmerConfig, CacheWarmerStatus, TenantListResponse
+)
+from typing import Optional
+from app.services.kissflow_service import (
+    KissflowService, UnknownTenant, UpstreamStageError, kissflow_tenants, TENANT_HEADER, TENANT_QUERY_PARAM
+)
+from app.services.cache_warmer import cache_warmer
+from app.admission import admission_controller
+from app import deadlines
+from app.deadlines import DeadlineExceeded
+from app.memory import MemoryBudgetExceeded
+from app.profiling import tracked, tracked_iter
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/v1/qsr", tags=["QSR"])
 
+# Where fetch-data got the item: kissflow, cache or mock (fallback)
+DATA_SOURCE_HEADER = "X-Data-Source"
+
+
+def _validate_item_id(item_id: str):
+    if not item_id.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Item ID is required"
+        )
+
+    if not item_id.startswith("KFF-"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid Item ID format. Must start with 'KFF-'"
+        )
+
+
+def get_tenant_service(
+    header_tenant: Optional[str] = Header(None, alias=TENANT_HEADER),
+    query_tenant: Optional[str] = Query(None, alias=TENANT_QUERY_PARAM)
+) -> KissflowService:
+    """Kissflow service of the tenant named by the request (header first)"""
+    try:
+        return kissflow_tenants.get(header_tenant or query_tenant)
+    except UnknownTenant as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+
+
+def _discard_result(task: asyncio.Task):
+    # Retrieve the outcome of work the request stopped waiting for, so its
+    # exception is not reported as never retrieved
+    if not task.cancelled() and task.exception() is not None:
+        logger.info("Abandoned %s failed: %s", task.get_name(), task.exception())
+
+
+async def _run_with_deadline(func, *args, **kwargs):
+    """
+    Run blocking service code in the threadpool, giving up when the request
+    deadline passes. A worker thread cannot be interrupted, so it is left to
+    finish in the background and stops at its next deadline check; the
+    caller gets the 504 right away.
+    """
+    task = asyncio.ensure_future(run_in_threadpool(tracked(func), *args, **kwargs))
+    task.set_name(func.__name__)
+    done, _ = await asyncio.wait({task}, timeout=deadlines.remaining())
+    if not done:
+        task.add_done_callback(_discard_result)
+        raise DeadlineExceeded(func.__name__)
+    return task.result()
+
+
+def _deadline_exceeded(e: DeadlineExceeded) -> HTTPException:
+    logger.warning("%s", e)
+    return HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+
+
+def _memory_budget_exceeded(e: MemoryBudgetExceeded) -> HTTPException:
+    logger.warning("%s", e)
+    return HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
 
 @router.post("/fetch-data", response_model=KissflowResponse)
-async def fetch_qsr_data(request: ItemRequest):
+async def fetch_qsr_data(request: ItemRequest, response: Response,
+                         kissflow_service: KissflowService = Depends(get_tenant_service)):
     """
     Fetch QSR data from Kissflow for a given item ID.
     Returns mock data if Kissflow credentials are not configured.
     """
     try:
-        logger.info(f"Received request to fetch data for item: {request.item_id}")
+        logger.info("Received request to fetch data for item: %s", request.item_id)
         
         # Validate item ID format
-        if not request.item_id.strip():
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Item ID is required"
-            )
-        
-        if not request.item_id.startswith("KFF-"):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid Item ID format. Must start with 'KFF-'"
-            )
+        _validate_item_id(request.item_id)
         
         # Check if using mock data
         if not kissflow_service.has_credentials:
             logger.info("Using mock data - Kissflow credentials not configured")
         
-        # Fetch data from Kissflow (or mock data)
-        result = kissflow_service.fetch_qsr_data(request.item_id)
+        # Fetch data from Kissflow (or mock data). Runs in the threadpool so
+        # time spent queued for an upstream slot does not block the event loop.
+        result = await _run_with_deadline(kissflow_service.fetch_qsr_data, request.item_id)
         
-        logger.info(f"Successfully processed request for item: {request.item_id}")
+        logger.info("Successfully processed request for item: %s", request.item_id)
+        headers = {DATA_SOURCE_HEADER: result.source} if result.source else {}
+        if result.degraded:
+            # Over the memory budget: serialize directly, without null fields,
+            # instead of the response model round trip (dict, copy, encoder)
+            return Response(content=result.model_dump_json(exclude_none=True), media_type="application/json",
+                            headers=headers)
+        response.headers.update(headers)
         return result
         
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except DeadlineExceeded as e:
+        raise _deadline_exceeded(e)
+    except MemoryBudgetExceeded as e:
+        raise _memory_budget_exceeded(e)
     except Exception as e:
-        logger.error(f"Error processing request for item {request.item_id}: {str(e)}")
+        logger.error("Error processing request for item %s: %s", request.item_id, e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to fetch data: {str(e)}"
         )
 
 
+@router.get("/fetch-data/stream")
+async def stream_qsr_data(item_id: str, kissflow_service: KissflowService = Depends(get_tenant_service)):
+    """
+    Server-Sent Events variant of fetch-data. Emits one event per stage
+    (upstream_fetched, mapped, test_execution_enriched, defects_enriched,
+    missing_fields_computed), each carrying the partial QsrData available so
+    far, so clients can render core fields before enrichment finishes.
+    """
+    logger.info("Received streaming request to fetch data for item: %s", item_id)
+    _validate_item_id(item_id)
+
+    def event_stream():
+        try:
+            for event in kissflow_service.iter_fetch_stages(item_id):
+                yield f"event: {event.stage}\ndata: {event.model_dump_json(exclude_none=True)}\n\n"
+            logger.info("Successfully streamed request for item: %s", item_id)
+        except DeadlineExceeded as e:
+            logger.warning("%s", e)
+            error = ErrorResponse(error="Gateway Timeout", message=str(e), status_code=504)
+            yield f"event: error\ndata: {error.model_dump_json()}\n\n"
+        except MemoryBudgetExceeded as e:
+            logger.warning("%s", e)
+            error = ErrorResponse(error="Service Unavailable", message=str(e), status_code=503)
+            yield f"event: error\ndata: {error.model_dump_json()}\n\n"
+        except UpstreamStageError as e:
+            # Real stages already went out, so the stream ends instead of switching to mock data
+            error = ErrorResponse(error="Bad Gateway", message=str(e), status_code=502)
+            yield f"event: error\ndata: {error.model_dump_json()}\n\n"
+        except Exception as e:
+            logger.error("Error streaming request for item %s: %s", item_id, e)
+            error = ErrorResponse(error="Internal Server Error", message=f"Failed to fetch data: {str(e)}", status_code=500)
+            yield f"event: error\ndata: {error.model_dump_json()}\n\n"
+
+    # The sync generator is iterated in the threadpool, off the event loop
+    return StreamingResponse(
+        tracked_iter(event_stream()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/prefetch", response_model=PrefetchReport)
+async def prefetch_items(request: PrefetchRequest,
+                         kissflow_service: KissflowService = Depends(get_tenant_service)):
+    """
+    Bulk-load all Kissflow items for a team and/or quarter into the item cache
+    using paginated list queries
+    """
+    if not 1 <= request.page_size <= 1000:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="page_size must be between 1 and 1000"
+        )
+
+    try:
+        return await _run_with_deadline(
+            kissflow_service.prefetch, request.team, request.quarter, request.page_size
+        )
+    except DeadlineExceeded as e:
+        raise _deadline_exceeded(e)
+    except Exception as e:
+        logger.error("Error prefetching items (team=%s, quarter=%s): %s", request.team, request.quarter, e)
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY,
+            detail=f"Failed to prefetch from Kissflow: {str(e)}"
+        )
+
+
+@router.get("/cache/warmer", response_model=CacheWarmerStatus)
+async def get_cache_warmer():
+    """Warm set, refresh history, warm-hit ratio and item cache statistics"""
+    return cache_warmer.status()
+
+
+@router.put("/cache/warmer", response_model=CacheWarmerStatus)
+async def configure_cache_warmer(config: CacheWarmerConfig):
+    """
+    Set the items kept warm: an explicit list and/or every item launching in
+    `quarter` ('current' for the current quarter)
+    """
+    for item_id in config.items:
+        _validate_item_id(item_id)
+    if config.intervalSeconds is not None and config.intervalSeconds <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="intervalSeconds must be positive"
+        )
+
+    cache_warmer.configure(config.items, config.quarter, config.intervalSeconds)
+    return cache_warmer.status()
+
+
+@router.post("/cache/warmer/run", response_model=CacheWarmerStatus)
+async def run_cache_warmer():
+    """Refresh the warm set now instead of waiting for the next scheduled run"""
+    try:
+        return await _run_with_deadline(cache_warmer.run_once)
+    except DeadlineExceeded as e:
+        raise _deadline_exceeded(e)
+
+
 @router.get("/status")
-async def get_status():
+async def get_status(kissflow_service: KissflowService = Depends(get_tenant_service)):
     """
     Get backend status including credential configuration
     """
@@ -60,10 +240,33 @@ async def get_status():
         "status": "healthy",
         "service": "QSR Backend API",
         "version": "1.0.0",
+        "tenant": kissflow_service.tenant_id,
         "kissflow_configured": kissflow_service.has_credentials,
         "data_source": "kissflow" if kissflow_service.has_credentials else "mock"
     }
 
+@router.get("/rate-limit")
+async def get_rate_limit_metrics(kissflow_service: KissflowService = Depends(get_tenant_service)):
+    """
+    Get Kissflow upstream rate limiter queue depth and wait-time metrics
+    """
+    return kissflow_service.rate_limiter.metrics()
+
+@router.get("/tenants", response_model=TenantListResponse)
+async def get_tenants():
+    """
+    Configured Kissflow tenants with their fetch counts, upstream errors and
+    the state of their own rate limiter, item cache and admission share
+    """
+    tenants = [service.stats() for service in kissflow_tenants.all()]
+    return TenantListResponse(tenants=tenants, total=len(tenants))
+
+@router.get("/admission")
+async def get_admission_metrics():
+    """Admission control state: in-flight and queued requests, admitted and shed counts"""
+    return admission_controller.metrics()
+
+
 @router.get("/health")
 async def health_check():
     """
@@ -0,0 +1,64 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from typing import Optional
+from app.models import FeaturesResponse, FeatureCyclesResponse, TestRunResponse, IngestionReport
+from app.services.test_execution_service import test_execution_service
+from app.services.ingestion_service import ingestion_service, detect_format
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/test-execution", tags=["Test Execution"])
+
+
+@router.get("/features", response_model=FeaturesResponse)
+async def get_features():
+    """
+    List features with their cycle and test case totals
+    """
+    return test_execution_service.get_features()
+
+
+@router.get("/features/{feature_id}/cycles", response_model=FeatureCyclesResponse)
+async def get_feature_cycles(feature_id: str):
+    """
+    Get per-cycle test execution aggregates for a feature
+    """
+    try:
+        return test_execution_service.get_feature_cycles(feature_id)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+
+
+@router.get("/runs/{run_id}", response_model=TestRunResponse)
+async def get_test_run(run_id: str):
+    """
+    Get a single test run with statistics, bugs and test cases
+    """
+    try:
+        return test_execution_service.get_test_run(run_id)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+
+
+@router.post("/features/{feature_id}/cycles/{cycle}/results", response_model=IngestionReport)
+async def ingest_test_results(feature_id: str, cycle: int, request: Request, format: Optional[str] = None):
+    """
+    Stream CSV or JSONL test case results (TestCase shape) into a feature cycle.
+    The body is parsed incrementally and written in batches, so payloads of any
+    size are ingested in constant memory.
+    """
+    try:
+        format_name = detect_format(format, request.headers.get("content-type"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    try:
+        return await ingestion_service.ingest_stream(feature_id, cycle, request.stream(), format_name)
+    except KeyError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e.args[0]))
+    except Exception as e:
+        logger.error("Error ingesting test results for %s cycle %s: %s", feature_id, cycle, e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to ingest test results: {str(e)}"
+        )
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from app.models import TrendsResponse
+from app.services.trends_service import trends_service
+
+router = APIRouter(prefix="/api/v1/qsr/trends", tags=["Trends"])
+
+
+@router.get("", response_model=TrendsResponse)
+async def get_trends(team: Optional[str] = None, quarter: Optional[str] = None):
+    """
+    Pass-rate and defect trends per team across quarters, read from
+    materialized aggregates
+    """
+    # Waits on the lock while the archive is still being replayed at startup
+    trends = await run_in_threadpool(trends_service.get_trends, team=team, quarter=quarter)
+    return TrendsResponse(trends=trends, total=len(trends))
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from app.models import WebhookAccepted, WebhookStatus
+from app.routers.qsr import get_tenant_service
+from app.services.kissflow_service import KissflowService
+from app.services.webhook_service import (
+    SIGNATURE_HEADER, TIMESTAMP_HEADER, WebhookBacklogFull, WebhookRejected, parse_event, webhook_processor
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api/v1/qsr/webhooks", tags=["Webhooks"])
+
+# Seconds a sender should wait before retrying when the backlog is full
+BACKLOG_RETRY_AFTER = 30
+
+
+@router.post("/kissflow", response_model=WebhookAccepted, status_code=status.HTTP_202_ACCEPTED)
+async def receive_kissflow_event(
+    request: Request,
+    signature: Optional[str] = Header(None, alias=SIGNATURE_HEADER),
+    timestamp: Optional[str] = Header(None, alias=TIMESTAMP_HEADER),
+    kissflow_service: KissflowService = Depends(get_tenant_service)
+):
+    """
+    Receive a Kissflow item-change event for the selected tenant. The body
+    must be signed with the tenant's webhook secret. The item is dropped from
+    the cache immediately; its refresh is debounced and runs in the background.
+    """
+    if not kissflow_service.webhook_secret:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Webhooks are not enabled for tenant {kissflow_service.tenant_id}"
+        )
+
+    body = await request.body()
+    try:
+        webhook_processor.verify(kissflow_service.webhook_secret, timestamp, signature, body)
+    except WebhookRejected as e:
+        logger.warning("Rejected Kissflow webhook for tenant %s: %s", kissflow_service.tenant_id, e)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+    try:
+        event, item_id, item = parse_event(body)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid event: {e}")
+
+    try:
+        coalesced, pending = webhook_processor.submit(kissflow_service, event, item_id, item)
+    except WebhookBacklogFull as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(BACKLOG_RETRY_AFTER)}
+        )
+
+    logger.info("Accepted Kissflow %s event for item %s (tenant %s, coalesced=%s)",
+                event, item_id, kissflow_service.tenant_id, coalesced)
+    return WebhookAccepted(
+        accepted=True,
+        itemId=item_id,
+        event=event,
+        tenantId=kissflow_service.tenant_id,
+        coalesced=coalesced,
+        pending=pending
+    )
+
+
+@router.get("/stats", response_model=WebhookStatus)
+async def get_webhook_stats():
+    """Events received, rejected and coalesced, and how processed items were refreshed"""
+    return webhook_processor.status()
+
+
+@router.post("/flush", response_model=WebhookStatus)
+async def flush_webhook_events():
+    """Have every waiting item processed now instead of at the end of its debounce window"""
+    await run_in_threadpool(webhook_processor.flush)
+    return webhook_processor.status()
@@ -0,0 +1,200 @@
+"""
+Field-selective incremental parsing of a JSON object.
+
+SelectiveJsonParser is fed the body of a JSON object chunk by chunk, as it
+arrives, and keeps only the top-level keys it was asked for. Values of
+other keys are skipped with regexes that run over whole strings and
+separators up to the next bracket, so Python code only sees brackets, and
+nothing is decoded or built for them. Skipped bytes are dropped from the
+buffer right away: peak memory is about one chunk plus the wanted values,
+however large the unwanted child tables are.
+
+Scanning works on raw bytes: every JSON structural character is ASCII and
+UTF-8 multibyte sequences contain no ASCII bytes, so nothing is decoded
+until a wanted value is handed to json.loads. Skipped values are only
+checked for balanced brackets, not fully validated.
+"""
+
+import json
+import re
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_STRING = rb'"(?:[^"\\]++|\\.)*+"'
+_STRING_TOKEN = re.compile(_STRING, re.DOTALL)
+# Nesting depth of containers a single regex match can skip whole
+_SKIP_NESTING = 4
+
+
+def _skip_pattern(separators: bytes) -> re.Pattern:
+    """
+    Runs of a skipped value up to its next unmatched bracket or one of
+    `separators`, consuming whole strings and complete containers nested up
+    to _SKIP_NESTING deep. Stops early at a string or container whose end
+    is not buffered yet.
+    """
+    other = rb'[^"{}\[\]' + separators + rb']++|' + _STRING
+    content = rb'(?:[^"{}\[\]]++|' + _STRING + rb')*+'
+    for _ in range(_SKIP_NESTING - 1):
+        content = rb'(?:[^"{}\[\]]++|' + _STRING + rb'|\{' + content + rb'\}|\[' + content + rb'\])*+'
+    return re.compile(rb'(?:' + other + rb'|\{' + content + rb'\}|\[' + content + rb'\])*+', re.DOTALL)
+
+
+_SKIP_NESTED = _skip_pattern(b"")
+# At the top level a ',' ends the value
+_SKIP_TOP = _skip_pattern(b",")
+_OPENING = b"{["
+
+# Parser states
+_OBJECT_START = 0
+_KEY = 1
+_COLON = 2
+_VALUE = 3
+_AFTER_VALUE = 4
+_END = 5
+
+
+class SelectiveJsonParser:
+    """Incrementally parse a JSON object, keeping only the top-level keys in `fields`"""
+
+    def __init__(self, fields: Iterable[str]):
+        self.fields = frozenset(fields)
+        self.values: Dict[str, Any] = {}
+        self.bytes_read = 0
+        self.peak_buffer = 0
+        self._buffer = bytearray()
+        self._pos = 0
+        self._state = _OBJECT_START
+        self._key: Optional[str] = None
+        # Current value: where it starts (None until its first byte), whether
+        # it is kept, and the bracket depth reached
+        self._value_start: Optional[int] = None
+        self._capture = False
+        self._depth = 0
+
+    @property
+    def complete(self) -> bool:
+        """The object has ended, or every wanted key was found"""
+        return self._state == _END or len(self.values) == len(self.fields)
+
+    def feed(self, chunk: bytes):
+        if self.complete:
+            return
+        self.bytes_read += len(chunk)
+        self._buffer += chunk
+        self.peak_buffer = max(self.peak_buffer, len(self._buffer))
+        self._parse()
+
+        # Drop consumed bytes, keeping the start of a value being captured
+        keep = self._pos
+        if self._state == _VALUE and self._capture and self._value_start is not None:
+            keep = self._value_start
+            self._value_start = 0
+        if keep:
+            del self._buffer[:keep]
+            self._pos -= keep
+
+    def result(self) -> Dict[str, Any]:
+        """The wanted keys that were present; raises ValueError if the body ended early"""
+        if not self.complete:
+            raise ValueError("Truncated JSON object")
+        return self.values
+
+    def _error(self, expected: str):
+        found = bytes(self._buffer[self._pos:self._pos + 20])
+        raise ValueError(f"Invalid JSON object: expected {expected}, found {found!r}")
+
+    def _parse(self):
+        buffer = self._buffer
+        while not self.complete:
+            if self._state == _VALUE:
+                if not self._scan_value():
+                    return
+                continue
+
+            self._pos = _WHITESPACE.match(buffer, self._pos).end()
+            if self._pos >= len(buffer):
+                return
+            byte = buffer[self._pos]
+
+            if self._state == _OBJECT_START:
+                if byte != ord("{"):
+                    self._error("'{'")
+                self._pos += 1
+                self._state = _KEY
+            elif self._state == _KEY:
+                if byte == ord("}"):
+                    self._pos += 1
+                    self._state = _END
+                    continue
+                match = _STRING_TOKEN.match(buffer, self._pos)
+                if match is None:
+                    if byte != ord('"'):
+                        self._error("a key")
+                    return
+                key = buffer[self._pos + 1:match.end() - 1]
+                self._key = json.loads(match.group()) if b"\\" in key else key.decode("utf-8")
+                self._pos = match.end()
+                self._state = _COLON
+            elif self._state == _COLON:
+                if byte != ord(":"):
+                    self._error("':'")
+                self._pos += 1
+                self._state = _VALUE
+                self._value_start = None
+                self._capture = self._key in self.fields
+            elif self._state == _AFTER_VALUE:
+                if byte == ord(","):
+                    self._pos += 1
+                    self._state = _KEY
+                elif byte == ord("}"):
+                    self._pos += 1
+                    self._state = _END
+                else:
+                    self._error("',' or '}'")
+
+    def _scan_value(self) -> bool:
+        """Advance through the current value; False when more input is needed"""
+        buffer = self._buffer
+        if self._value_start is None:
+            self._pos = _WHITESPACE.match(buffer, self._pos).end()
+            if self._pos >= len(buffer):
+                return False
+            self._value_start = self._pos
+            self._depth = 0
+
+        while True:
+            skip = _SKIP_NESTED if self._depth else _SKIP_TOP
+            self._pos = skip.match(buffer, self._pos).end()
+            if self._pos >= len(buffer) or buffer[self._pos] == ord('"'):
+                # The end of the value, or of a string in it, has not arrived
+                return False
+            byte = buffer[self._pos]
+            if byte in _OPENING:
+                self._depth += 1
+                self._pos += 1
+            elif self._depth == 0:
+                # The ',' or '}' after a scalar or string value
+                return self._finish_value(self._pos)
+            else:
+                self._depth -= 1
+                self._pos += 1
+                if self._depth == 0:
+                    return self._finish_value(self._pos)
+
+    def _finish_value(self, end: int) -> bool:
+        if self._capture:
+            self.values[self._key] = json.loads(self._buffer[self._value_start:end])
+        self._pos = end
+        self._state = _AFTER_VALUE
+        return True
+
+
+def parse_selected(chunks: Iterable[bytes], fields: Iterable[str]) -> Tuple[Dict[str, Any], SelectiveJsonParser]:
+    """Parse `fields` out of a JSON object arriving as `chunks`, stopping once all are found"""
+    parser = SelectiveJsonParser(fields)
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.complete:
+            break
+    return parser.result(), parser
@@ -0,0 +1,218 @@
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, NamedTuple, Tuple
+from app.models import QsrData, SnapshotInfo
+
+logger = logging.getLogger(__name__)
+
+FILE_MAGIC = b"QSRARCH1"
+
+# Record header: magic, payload length, payload crc32, item id length,
+# quarter length, archived-at (epoch seconds). Item ID, quarter and the
+# zlib-compressed JSON payload follow the header.
+RECORD_MAGIC = b"QR"
+RECORD_HEADER = struct.Struct("<2sIIHHd")
+
+
+class _IndexEntry(NamedTuple):
+    item_id: str
+    quarter: str
+    archived_at: float
+    payload_offset: int
+    payload_length: int
+    checksum: int
+
+
+class ArchiveService:
+    """
+    Append-only archive of finalized QSR snapshots.
+
+    Each snapshot is one record appended to a single binary file. The
+    in-memory index only holds record offsets, read from the headers through
+    a memory map, so listing never touches payloads. Reading a snapshot
+    decompresses, checksums and validates its whole payload; records are
+    row-oriented zlib/JSON, not columnar or zero-copy. Snapshot IDs are
+    record positions, so they are stable across restarts.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("QSR_ARCHIVE_PATH", "data/qsr_archive.bin")
+        self.compression_level = int(os.getenv("QSR_ARCHIVE_COMPRESSION", 6))
+        self._lock = threading.Lock()
+        self._index: List[_IndexEntry] = []
+        # Position of each item's newest snapshot
+        self._latest: Dict[str, int] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_size = 0
+        self._loaded = False
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, "wb") as f:
+                f.write(FILE_MAGIC)
+        self._remap()
+        self._scan()
+        self._loaded = True
+
+    def _remap(self):
+        size = os.path.getsize(self.path)
+        if self._mmap is not None and size == self._mapped_size:
+            return
+        if self._mmap is not None:
+            self._mmap.close()
+        with open(self.path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapped_size = size
+
+    def _scan(self):
+        """Build the offset index from record headers, skipping over payloads"""
+        view = self._mmap
+        if view[:len(FILE_MAGIC)] != FILE_MAGIC:
+            raise ValueError(f"{self.path} is not a QSR archive")
+
+        offset = len(FILE_MAGIC)
+        size = self._mapped_size
+        while offset + RECORD_HEADER.size <= size:
+            magic, payload_length, checksum, item_len, quarter_len, archived_at = RECORD_HEADER.unpack_from(view, offset)
+            body = offset + RECORD_HEADER.size
+            end = body + item_len + quarter_len + payload_length
+            if magic != RECORD_MAGIC or end > size:
+                break
+            item_id = bytes(view[body:body + item_len]).decode("utf-8")
+            quarter = bytes(view[body + item_len:body + item_len + quarter_len]).decode("utf-8")
+            self._latest[item_id] = len(self._index)
+            self._index.append(_IndexEntry(item_id, quarter, archived_at, end - payload_length, payload_length, checksum))
+            offset = end
+
+        if offset != size:
+            # Torn write from an interrupted append; drop the partial record
+            logger.warning("Truncating %d trailing bytes of incomplete archive record in %s", size - offset, self.path)
+            self._mmap.close()
+            self._mmap = None
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+            self._remap()
+
+    def _info(self, snapshot_id: int, entry: _IndexEntry) -> SnapshotInfo:
+        return SnapshotInfo(
+            snapshotId=snapshot_id,
+            itemId=entry.item_id,
+            quarter=entry.quarter or None,
+            archivedAt=datetime.fromtimestamp(entry.archived_at, tz=timezone.utc).isoformat(),
+            sizeBytes=entry.payload_length
+        )
+
+    def append(self, item_id: str, data: QsrData) -> SnapshotInfo:
+        """Append a finalized snapshot and return its metadata"""
+        payload = zlib.compress(data.model_dump_json(exclude_none=True).encode("utf-8"), self.compression_level)
+        item_bytes = item_id.encode("utf-8")
+        quarter_bytes = (data.QuarterRelease or "").encode("utf-8")
+        archived_at = time.time()
+        checksum = zlib.crc32(payload)
+        header = RECORD_HEADER.pack(
+            RECORD_MAGIC, len(payload), checksum, len(item_bytes), len(quarter_bytes), archived_at
+        )
+
+        with self._lock:
+            self._ensure_loaded()
+            with open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(header + item_bytes + quarter_bytes + payload)
+                f.flush()
+                os.fsync(f.fileno())
+            payload_offset = offset + RECORD_HEADER.size + len(item_bytes) + len(quarter_bytes)
+            entry = _IndexEntry(item_id, data.QuarterRelease or "", archived_at, payload_offset, len(payload), checksum)
+            self._index.append(entry)
+            snapshot_id = len(self._index) - 1
+            self._latest[item_id] = snapshot_id
+
+        logger.info("Archived snapshot %d for item %s (%d bytes)", snapshot_id, item_id, len(payload))
+        return self._info(snapshot_id, entry)
+
+    def list_snapshots(self, item_id: Optional[str] = None, quarter: Optional[str] = None) -> List[SnapshotInfo]:
+        """List snapshot metadata, optionally filtered by item ID and/or quarter"""
+        with self._lock:
+            self._ensure_loaded()
+            entries = list(enumerate(self._index))
+        return [
+            self._info(snapshot_id, entry)
+            for snapshot_id, entry in entries
+            if (item_id is None or entry.item_id == item_id) and (quarter is None or entry.quarter == quarter)
+        ]
+
+    def get_snapshot(self, snapshot_id: int) -> QsrData:
+        """Read a single snapshot's QsrData; raises KeyError if it does not exist"""
+        with self._lock:
+            self._ensure_loaded()
+            if snapshot_id < 0 or snapshot_id >= len(self._index):
+                raise KeyError(f"Snapshot not found: {snapshot_id}")
+            entry = self._index[snapshot_id]
+            self._remap()
+            payload = memoryview(self._mmap)[entry.payload_offset:entry.payload_offset + entry.payload_length]
+            try:
+                if zlib.crc32(payload) != entry.checksum:
+                    raise ValueError(f"Snapshot {snapshot_id} failed its checksum")
+                raw = zlib.decompress(payload)
+            finally:
+                payload.release()
+        return QsrData.model_validate_json(raw)
+
+    def iter_snapshots(self, item_id: Optional[str] = None,
+                       quarter: Optional[str] = None) -> Iterator[Tuple[SnapshotInfo, QsrData]]:
+        """Scan snapshots in archive order, decoding each payload as it is reached"""
+        for info in self.list_snapshots(item_id=item_id, quarter=quarter):
+            yield info, self.get_snapshot(info.snapshotId)
+
+    def iter_latest(self, quarter: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+        """
+        (snapshot ID, item ID) of the newest snapshot of every item, in archive
+        order. Walks the index in place without copying it; an item archived
+        again while the walk runs is left out of it.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            count = len(self._index)
+        for snapshot_id in range(count):
+            entry = self._index[snapshot_id]
+            if (quarter is None or entry.quarter == quarter) and self._latest.get(entry.item_id) == snapshot_id:
+                yield snapshot_id, entry.item_id
+
+    def is_archived(self, item_id: str, quarter: Optional[str] = None) -> bool:
+        """Whether the item has a snapshot, and its newest one is for `quarter` if given"""
+        with self._lock:
+            self._ensure_loaded()
+            snapshot_id = self._latest.get(item_id)
+            return snapshot_id is not None and (quarter is None or self._index[snapshot_id].quarter == quarter)
+
+    def get_snapshot_info(self, snapshot_id: int) -> SnapshotInfo:
+        with self._lock:
+            self._ensure_loaded()
+            if snapshot_id < 0 or snapshot_id >= len(self._index):
+                raise KeyError(f"Snapshot not found: {snapshot_id}")
+            entry = self._index[snapshot_id]
+        return self._info(snapshot_id, entry)
+
+    def get_latest(self, item_id: str) -> Optional[SnapshotInfo]:
+        """Most recent snapshot of an item, if any"""
+        with self._lock:
+            self._ensure_loaded()
+            snapshot_id = self._latest.get(item_id)
+            if snapshot_id is None:
+                return None
+            entry = self._index[snapshot_id]
+        return self._info(snapshot_id, entry)
+
+
+# Global service instance
+archive_service = ArchiveService()
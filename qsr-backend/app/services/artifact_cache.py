@@ -0,0 +1,221 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import Any, Callable, List, Optional, Tuple
+from app.models import ArtifactCacheStats, QsrData
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a renderer's output changes so stale artifacts stop matching
+TEMPLATE_VERSION = os.getenv("REPORT_TEMPLATE_VERSION", "1")
+
+ARTIFACT_TOKEN_HEADER = "X-Artifact-Token"
+
+# Cached artifact formats and their media types
+ARTIFACT_FORMATS = {
+    "html": "text/html; charset=utf-8",
+    "svg": "image/svg+xml",
+    "pdf": "application/pdf",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+# Formats rendered by the client and uploaded. Formats the backend renders
+# itself are never accepted as uploads: they are served inline (HTML, SVG)
+# from the API origin.
+UPLOAD_FORMATS = ("pdf", "docx")
+
+# Leading bytes an upload of each format must start with (DOCX is a ZIP archive)
+UPLOAD_SIGNATURES = {
+    "pdf": b"%PDF-",
+    "docx": b"PK\x03\x04",
+}
+
+ArtifactId = Tuple[str, str]  # (content key, format)
+
+
+def _normalize(value: Any) -> Any:
+    # Empty and missing values render the same ("N/A"), so they hash the same.
+    # Whitespace is kept: the client renderer prints it as is.
+    if isinstance(value, dict):
+        normalized = {name: _normalize(item) for name, item in value.items()}
+        return {name: item for name, item in normalized.items() if item is not None}
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if value == "":
+        return None
+    return value
+
+
+def content_key(data: QsrData, summary_date: Optional[str] = None,
+                template_version: Optional[str] = None,
+                client_template_version: Optional[str] = None) -> str:
+    """
+    SHA-256 over the normalized report data, the date printed on the report,
+    the backend template version and the version of the client's template
+    (PDF and DOCX are rendered by the frontend)
+    """
+    material = {
+        "template": template_version or TEMPLATE_VERSION,
+        "clientTemplate": client_template_version or "",
+        "summaryDate": summary_date or date.today().isoformat(),
+        "data": _normalize(data.model_dump(mode="json")),
+    }
+    encoded = json.dumps(material, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def valid_key(key: str) -> bool:
+    return len(key) == 64 and all(char in "0123456789abcdef" for char in key)
+
+
+class ArtifactCache:
+    """
+    Rendered report artifacts on local disk, addressed by content key and
+    format and evicted least-recently-used once their total size exceeds
+    `max_bytes`. Access order survives restarts through file mtimes, which
+    are refreshed on every hit.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.directory = directory or os.getenv("ARTIFACT_CACHE_DIR", "data/artifacts")
+        self.max_bytes = max_bytes or int(float(os.getenv("ARTIFACT_CACHE_MAX_MB", 256)) * 1024 * 1024)
+        # Client-rendered uploads are accepted only with this token
+        self.upload_token = os.getenv("ARTIFACT_UPLOAD_TOKEN", "")
+        self._lock = threading.Lock()
+        self._entries: Optional["OrderedDict[ArtifactId, int]"] = None
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.stores = 0
+        self.evictions = 0
+        self.hits_by_format: Counter = Counter()
+
+    @property
+    def uploads_enabled(self) -> bool:
+        return bool(self.upload_token)
+
+    def authorized(self, token: Optional[str]) -> bool:
+        return self.uploads_enabled and bool(token) and hmac.compare_digest(token, self.upload_token)
+
+    def _path(self, key: str, fmt: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{fmt}")
+
+    def _ensure_loaded(self) -> "OrderedDict[ArtifactId, int]":
+        if self._entries is not None:
+            return self._entries
+        found = []
+        if os.path.isdir(self.directory):
+            for shard in os.scandir(self.directory):
+                if not shard.is_dir():
+                    continue
+                for entry in os.scandir(shard.path):
+                    key, _, fmt = entry.name.partition(".")
+                    if fmt in ARTIFACT_FORMATS and valid_key(key):
+                        stat = entry.stat()
+                        found.append((stat.st_mtime, (key, fmt), stat.st_size))
+        found.sort()
+        self._entries = OrderedDict((artifact, size) for _, artifact, size in found)
+        self._size = sum(self._entries.values())
+        if found:
+            logger.info("Artifact cache loaded %d artifacts (%d bytes)", len(found), self._size)
+        return self._entries
+
+    def get(self, key: str, fmt: str) -> Optional[bytes]:
+        """Cached artifact bytes, or None on a miss"""
+        with self._lock:
+            entries = self._ensure_loaded()
+            if (key, fmt) not in entries:
+                self.misses += 1
+                return None
+            entries.move_to_end((key, fmt))
+        path = self._path(key, fmt)
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # Removed behind our back
+            with self._lock:
+                self._size -= entries.pop((key, fmt), 0)
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self.hits_by_format[fmt] += 1
+            self.bytes_saved += len(content)
+        return content
+
+    def put(self, key: str, fmt: str, content: bytes) -> bool:
+        """Store an artifact; returns False if it alone exceeds the size cap"""
+        if len(content) > self.max_bytes:
+            logger.warning("Artifact %s.%s (%d bytes) exceeds the cache size cap", key, fmt, len(content))
+            return False
+        path = self._path(key, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            entries = self._ensure_loaded()
+            self._size += len(content) - entries.pop((key, fmt), 0)
+            entries[(key, fmt)] = len(content)
+            self.stores += 1
+            evicted = []
+            while self._size > self.max_bytes:
+                artifact, size = entries.popitem(last=False)
+                self._size -= size
+                evicted.append(artifact)
+            self.evictions += len(evicted)
+
+        for evicted_key, evicted_fmt in evicted:
+            try:
+                os.remove(self._path(evicted_key, evicted_fmt))
+            except FileNotFoundError:
+                pass
+        if evicted:
+            logger.debug("Evicted %d artifacts to stay under %d bytes", len(evicted), self.max_bytes)
+        return True
+
+    def get_or_render(self, key: str, fmt: str, render: Callable[[], bytes]) -> Tuple[bytes, bool]:
+        """Serve a cached artifact or render and store it; returns (content, hit)"""
+        content = self.get(key, fmt)
+        if content is not None:
+            return content, True
+        content = render()
+        self.put(key, fmt, content)
+        return content, False
+
+    def formats(self, key: str) -> List[str]:
+        with self._lock:
+            entries = self._ensure_loaded()
+            return [fmt for fmt in ARTIFACT_FORMATS if (key, fmt) in entries]
+
+    def stats(self) -> ArtifactCacheStats:
+        with self._lock:
+            entries = self._ensure_loaded()
+            lookups = self.hits + self.misses
+            return ArtifactCacheStats(
+                entries=len(entries),
+                sizeBytes=self._size,
+                maxBytes=self.max_bytes,
+                hits=self.hits,
+                misses=self.misses,
+                hitRatio=round(self.hits / lookups, 4) if lookups else 0.0,
+                bytesSaved=self.bytes_saved,
+                stores=self.stores,
+                evictions=self.evictions,
+                hitsByFormat=dict(self.hits_by_format)
+            )
+
+
+# Global artifact cache
+artifact_cache = ArtifactCache()
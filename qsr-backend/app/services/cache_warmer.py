@@ -0,0 +1,177 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+from app.models import CacheWarmerStatus
+from app.services.rate_limiter import LANE_BATCH
+
+logger = logging.getLogger(__name__)
+
+CURRENT_QUARTER = "current"
+
+
+def current_quarter(now: Optional[datetime] = None) -> str:
+    """Quarter label in the Kissflow 'Q3 2025' format"""
+    now = now or datetime.now()
+    return f"Q{(now.month - 1) // 3 + 1} {now.year}"
+
+
+class CacheWarmer:
+    """
+    Keeps the Kissflow item cache warm for a set of items, e.g. everything
+    launching this quarter ahead of release reviews.
+
+    Items come from an explicit list and/or every item whose
+    Estimated_launch_quarter matches a quarter ('current' follows the
+    calendar). A background thread refreshes them every `interval` seconds
+    through the batch rate-limit lane, so interactive requests keep
+    priority. Interactive lookups of warmed items are counted to report the
+    warm-hit ratio.
+    """
+
+    def __init__(self):
+        self.items: List[str] = [item.strip() for item in os.getenv("CACHE_WARM_ITEMS", "").split(",") if item.strip()]
+        self.quarter: Optional[str] = os.getenv("CACHE_WARM_QUARTER") or None
+        self.interval = float(os.getenv("CACHE_WARM_INTERVAL", 240))
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._warm_items: Set[str] = set()
+        self.runs = 0
+        self.refreshed = 0
+        self.failed = 0
+        self.warm_hits = 0
+        self.warm_misses = 0
+        self.last_run_at: Optional[str] = None
+        self.last_run_seconds: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.items or self.quarter)
+
+    def configure(self, items: List[str], quarter: Optional[str], interval: Optional[float] = None):
+        """Replace the warm set; the next refresh starts immediately"""
+        with self._lock:
+            self.items = list(dict.fromkeys(items))
+            self.quarter = quarter or None
+            if interval is not None:
+                self.interval = interval
+        logger.info("Cache warmer configured: %d items, quarter=%s, every %.0fs",
+                    len(self.items), self.quarter, self.interval)
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            if self.enabled:
+                try:
+                    self.run_once()
+                except Exception as e:
+                    logger.error("Cache warmer run failed: %s", e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def run_once(self) -> CacheWarmerStatus:
+        """Refresh every item in the warm set once"""
+        from app.services.kissflow_service import kissflow_service
+
+        with self._run_lock:
+            with self._lock:
+                items, quarter = list(self.items), self.quarter
+            if not kissflow_service.has_credentials:
+                logger.info("Skipping cache warm-up - Kissflow credentials not configured")
+                return self.status()
+            if self.interval >= kissflow_service.item_cache.ttl:
+                logger.warning("Cache warm interval (%.0fs) is not shorter than the item cache TTL (%.0fs)",
+                               self.interval, kissflow_service.item_cache.ttl)
+
+            started = time.perf_counter()
+            warmed, failed = set(), 0
+
+            if quarter:
+                quarter = current_quarter() if quarter == CURRENT_QUARTER else quarter
+                try:
+                    report = kissflow_service.prefetch(quarter=quarter)
+                    warmed.update(report.itemIds)
+                    failed += report.failedPages
+                except Exception as e:
+                    logger.warning("Could not warm items for quarter %s: %s", quarter, e)
+                    failed += 1
+
+            for item_id in items:
+                if item_id in warmed:
+                    continue
+                if kissflow_service.refresh_item(item_id, priority=LANE_BATCH):
+                    warmed.add(item_id)
+                else:
+                    failed += 1
+
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._warm_items = warmed | set(items)
+                self.runs += 1
+                self.refreshed += len(warmed)
+                self.failed += failed
+                self.last_run_at = datetime.now(timezone.utc).isoformat()
+                self.last_run_seconds = round(elapsed, 3)
+
+        logger.info("Cache warm-up refreshed %d items (%d failures) in %.3fs", len(warmed), failed, elapsed)
+        return self.status()
+
+    def is_warm(self, item_id: str) -> bool:
+        with self._lock:
+            return item_id in self._warm_items or item_id in self.items
+
+    def observe(self, item_id: str, hit: bool):
+        """Count an interactive cache lookup towards the warm-hit ratio"""
+        with self._lock:
+            if item_id not in self._warm_items:
+                return
+            if hit:
+                self.warm_hits += 1
+            else:
+                self.warm_misses += 1
+
+    def status(self) -> CacheWarmerStatus:
+        from app.services.kissflow_service import kissflow_service
+
+        with self._lock:
+            lookups = self.warm_hits + self.warm_misses
+            return CacheWarmerStatus(
+                enabled=self.enabled,
+                running=self._thread is not None and self._thread.is_alive(),
+                items=list(self.items),
+                quarter=self.quarter,
+                intervalSeconds=self.interval,
+                warmItems=len(self._warm_items),
+                runs=self.runs,
+                lastRunAt=self.last_run_at,
+                lastRunSeconds=self.last_run_seconds,
+                refreshed=self.refreshed,
+                failed=self.failed,
+                warmHits=self.warm_hits,
+                warmMisses=self.warm_misses,
+                warmHitRatio=round(self.warm_hits / lookups, 4) if lookups else 0.0,
+                cache=kissflow_service.item_cache.stats()
+            )
+
+
+# Global service instance
+cache_warmer = CacheWarmer()
@@ -0,0 +1,196 @@
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.models import Defect, DefectSearchHit, DefectSearchResponse
+
+# Indexed text fields and their weight in term frequencies
+TEXT_FIELDS = {
+    "title": 3.0,
+    "description": 1.0,
+    "reproductionSteps": 1.0,
+    "expectedResult": 0.5,
+    "actualResult": 1.0,
+}
+
+# Exact-match filter fields
+FILTER_FIELDS = ("status", "severity", "cycle", "environment")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its not of on or "
+    "should that the their then this to was were when which will with".split()
+)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS and len(token) > 1]
+
+
+class DefectSearchIndex:
+    """
+    In-memory inverted index over defect text, ranked with BM25.
+
+    Postings map each term to the documents containing it and their
+    field-weighted term frequency. Filter values (status, severity, cycle,
+    environment, feature) keep their own document sets, so a query only
+    scores documents that match both a query term and every filter.
+    Defects are added, replaced or removed one at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._filters: Dict[Tuple[str, str], Set[int]] = defaultdict(set)
+        self._documents: Dict[int, Tuple[str, Defect]] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_lengths: Dict[int, float] = {}
+        self._doc_ids: Dict[Tuple[str, str], int] = {}
+        self._total_length = 0.0
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @staticmethod
+    def _filter_keys(feature_id: str, defect: Defect) -> List[Tuple[str, str]]:
+        keys = [("featureId", feature_id)]
+        for field in FILTER_FIELDS:
+            value = getattr(defect, field)
+            if value is not None:
+                keys.append((field, str(value).lower()))
+        return keys
+
+    def add(self, feature_id: str, defect: Defect):
+        """Index a defect, replacing any earlier version with the same defectId"""
+        terms: Counter = Counter()
+        for field, weight in TEXT_FIELDS.items():
+            for token in tokenize(getattr(defect, field)):
+                terms[token] += weight
+
+        with self._lock:
+            key = (feature_id, defect.defectId)
+            if key in self._doc_ids:
+                self._remove_doc(self._doc_ids[key])
+            doc_id = self._next_id
+            self._next_id += 1
+
+            self._doc_ids[key] = doc_id
+            self._documents[doc_id] = (feature_id, defect)
+            self._doc_terms[doc_id] = terms
+            length = sum(terms.values())
+            self._doc_lengths[doc_id] = length
+            self._total_length += length
+            for token, frequency in terms.items():
+                self._postings[token][doc_id] = frequency
+            for filter_key in self._filter_keys(feature_id, defect):
+                self._filters[filter_key].add(doc_id)
+
+    def add_many(self, feature_id: str, defects: Iterable[Defect]):
+        for defect in defects:
+            self.add(feature_id, defect)
+
+    def remove(self, feature_id: str, defect_id: str) -> bool:
+        with self._lock:
+            doc_id = self._doc_ids.get((feature_id, defect_id))
+            if doc_id is None:
+                return False
+            self._remove_doc(doc_id)
+            return True
+
+    def remove_feature(self, feature_id: str):
+        with self._lock:
+            for doc_id in list(self._filters.get(("featureId", feature_id), ())):
+                self._remove_doc(doc_id)
+
+    def _remove_doc(self, doc_id: int):
+        feature_id, defect = self._documents.pop(doc_id)
+        del self._doc_ids[(feature_id, defect.defectId)]
+        for token in self._doc_terms.pop(doc_id):
+            postings = self._postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[token]
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        for filter_key in self._filter_keys(feature_id, defect):
+            matches = self._filters[filter_key]
+            matches.discard(doc_id)
+            if not matches:
+                del self._filters[filter_key]
+
+    def search(self, query: str = "", feature_id: Optional[str] = None, status: Optional[str] = None,
+               severity: Optional[str] = None, cycle: Optional[int] = None,
+               environment: Optional[str] = None, limit: int = 20, offset: int = 0) -> DefectSearchResponse:
+        """
+        Rank defects matching any query term by BM25, restricted to the given
+        filters. Without query terms, every filtered defect matches with score 0.
+        """
+        started = time.perf_counter()
+        tokens = list(dict.fromkeys(tokenize(query)))
+        filters = [("featureId", feature_id), ("status", status), ("severity", severity),
+                   ("cycle", cycle), ("environment", environment)]
+
+        with self._lock:
+            allowed: Optional[Set[int]] = None
+            for field, value in sorted(
+                ((field, value) for field, value in filters if value is not None),
+                key=lambda entry: len(self._filters.get((entry[0], str(entry[1]).lower()), ()))
+            ):
+                matches = self._filters.get((field, str(value).lower()), set())
+                allowed = set(matches) if allowed is None else allowed & matches
+                if not allowed:
+                    break
+
+            if tokens:
+                scores = self._score(tokens, allowed)
+            else:
+                candidates = self._documents.keys() if allowed is None else allowed
+                scores = dict.fromkeys(candidates, 0.0)
+
+            top = heapq.nlargest(offset + limit, scores.items(), key=lambda entry: (entry[1], -entry[0]))
+            hits = [
+                DefectSearchHit(featureId=self._documents[doc_id][0], score=round(score, 4),
+                                defect=self._documents[doc_id][1])
+                for doc_id, score in top[offset:]
+            ]
+            total = len(scores)
+
+        return DefectSearchResponse(
+            query=query,
+            total=total,
+            hits=hits,
+            tookMs=round((time.perf_counter() - started) * 1000, 3)
+        )
+
+    def _score(self, tokens: List[str], allowed: Optional[Set[int]]) -> Dict[int, float]:
+        documents = len(self._documents)
+        if not documents:
+            return {}
+        average_length = self._total_length / documents or 1.0
+        lengths = self._doc_lengths
+        scores: Dict[int, float] = defaultdict(float)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (documents - len(postings) + 0.5) / (len(postings) + 0.5))
+            if allowed is not None and len(allowed) < len(postings):
+                entries = ((doc_id, postings[doc_id]) for doc_id in allowed if doc_id in postings)
+            else:
+                entries = postings.items()
+            for doc_id, frequency in entries:
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                norm = K1 * (1 - B + B * lengths[doc_id] / average_length)
+                scores[doc_id] += idf * frequency * (K1 + 1) / (frequency + norm)
+        return scores
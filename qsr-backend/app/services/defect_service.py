@@ -1,7 +1,10 @@
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
-from app.models import Defect
+from typing import Dict, List, Any, Optional
+from app.models import Defect, DefectSearchResponse, DuplicateClustersResponse, DuplicateScanReport
+from app.services.defect_search import DefectSearchIndex
+from app.services.duplicate_detection import DuplicateDetector, scan
 
 logger = logging.getLogger(__name__)
 
@@ -9,6 +12,17 @@ logger = logging.getLogger(__name__)
 class DefectService:
     def __init__(self):
         self.mock_defects = self._generate_mock_defects()
+        self.kissflow_mapping = {
+            "KFF-0111": "67309a1b2c3d4e5f60718293",  # Flow Lock
+            "KFF-0219": "67309a1b2c3d4e5f60718294",  # FM Logistics
+            "KFF-0001": "67309a1b2c3d4e5f60718295",  # User Dashboard
+            "KFF-0123": "67309a1b2c3d4e5f60718296",  # API Authentication
+        }
+        self._lock = threading.Lock()
+        # Full-text index, built on first search and kept in sync afterwards
+        self._search_index: Optional[DefectSearchIndex] = None
+        # Near-duplicate detector, built by the first scan and kept in sync afterwards
+        self._duplicate_detector: Optional[DuplicateDetector] = None
 
     def _generate_mock_defects(self) -> Dict[str, List[Defect]]:
         """Generate comprehensive mock defect data for different features"""
@@ -266,16 +280,91 @@ class DefectService:
 
     def get_defects_by_kissflow_id(self, kissflow_item_id: str) -> List[Defect]:
         """Map Kissflow Item ID to defects"""
-        kissflow_mapping = {
-            "KFF-0111": "67309a1b2c3d4e5f60718293",  # Flow Lock
-            "KFF-0219": "67309a1b2c3d4e5f60718294",  # FM Logistics
-            "KFF-0001": "67309a1b2c3d4e5f60718295",  # User Dashboard
-            "KFF-0123": "67309a1b2c3d4e5f60718296",  # API Authentication
-        }
-
-        feature_id = kissflow_mapping.get(kissflow_item_id, "67309a1b2c3d4e5f60718293")
+        feature_id = self.kissflow_mapping.get(kissflow_item_id, "67309a1b2c3d4e5f60718293")
         return self.get_defects_by_feature(feature_id)
 
+    def load_defects(self, feature_id: str, defects: List[Defect], kissflow_item_id: str = None):
+        """Replace the defects of a feature, e.g. with synthetic data"""
+        with self._lock:
+            self.mock_defects[feature_id] = list(defects)
+            if kissflow_item_id:
+                self.kissflow_mapping[kissflow_item_id] = feature_id
+            if self._search_index is not None:
+                self._search_index.remove_feature(feature_id)
+                self._search_index.add_many(feature_id, defects)
+            if self._duplicate_detector is not None:
+                self._duplicate_detector.remove_feature(feature_id)
+                self._duplicate_detector.add_many(feature_id, defects)
+
+    def add_defects(self, feature_id: str, defects: List[Defect]) -> int:
+        """
+        Add defects to a feature, replacing existing ones with the same
+        defectId. Returns the feature's defect count afterwards.
+        """
+        with self._lock:
+            existing = {defect.defectId: defect for defect in self.mock_defects.get(feature_id, [])}
+            for defect in defects:
+                existing[defect.defectId] = defect
+            self.mock_defects[feature_id] = list(existing.values())
+            if self._search_index is not None:
+                self._search_index.add_many(feature_id, defects)
+            if self._duplicate_detector is not None:
+                self._duplicate_detector.add_many(feature_id, defects)
+            return len(existing)
+
+    def _get_search_index(self) -> DefectSearchIndex:
+        with self._lock:
+            if self._search_index is None:
+                index = DefectSearchIndex()
+                for feature_id, defects in self.mock_defects.items():
+                    index.add_many(feature_id, defects)
+                logger.info("Built defect search index over %d defects", len(index))
+                self._search_index = index
+            return self._search_index
+
+    def scan_duplicates(self) -> DuplicateScanReport:
+        """Batch job: rebuild near-duplicate clusters over every defect"""
+        with self._lock:
+            detector, report = scan(self.mock_defects)
+            self._duplicate_detector = detector
+        logger.info(
+            "Duplicate scan over %d defects: %d clusters, %d duplicates (%.3fs)",
+            report.defects, report.clusters, report.duplicateDefects, report.elapsedSeconds
+        )
+        return report
+
+    def get_duplicate_clusters(self, feature_id: Optional[str] = None) -> DuplicateClustersResponse:
+        """
+        Near-duplicate clusters touching a feature (or all clusters). For a
+        feature, uniqueDefects excludes its defects that re-file an earlier report.
+        """
+        if self._duplicate_detector is None:
+            self.scan_duplicates()
+        clusters = self._duplicate_detector.clusters(feature_id)
+        if feature_id is None:
+            return DuplicateClustersResponse(clusters=clusters, total=len(clusters))
+
+        total_defects = len(self.get_defects_by_feature(feature_id))
+        refiled = sum(
+            1 for cluster in clusters for member in cluster.members[1:] if member.featureId == feature_id
+        )
+        return DuplicateClustersResponse(
+            featureId=feature_id,
+            clusters=clusters,
+            total=len(clusters),
+            totalDefects=total_defects,
+            uniqueDefects=total_defects - refiled
+        )
+
+    def search_defects(self, query: str = "", feature_id: Optional[str] = None, status: Optional[str] = None,
+                       severity: Optional[str] = None, cycle: Optional[int] = None,
+                       environment: Optional[str] = None, limit: int = 20, offset: int = 0) -> DefectSearchResponse:
+        """Ranked full-text search over defect text across all features"""
+        return self._get_search_index().search(
+            query, feature_id=feature_id, status=status, severity=severity,
+            cycle=cycle, environment=environment, limit=limit, offset=offset
+        )
+
     def get_defect_summary(self, feature_id: str) -> Dict[str, Any]:
         """Get defect summary statistics for a feature"""
         defects = self.get_defects_by_feature(feature_id)
@@ -0,0 +1,226 @@
+import hashlib
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import defaultdict, deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from app.models import Defect, DuplicateCluster, DuplicateMember, DuplicateScanReport
+from app.services.defect_search import tokenize
+
+# Defect text that identifies a root cause (reproduction steps and expected
+# results are mostly boilerplate and would pull unrelated defects together)
+SHINGLE_FIELDS = ("title", "description", "actualResult")
+SHINGLE_SIZE = 3
+
+DefectKey = Tuple[str, str]  # (feature ID, defect ID)
+Node = FrozenSet[int]  # shingle set shared by textually identical defects
+
+
+def shingles(defect: Defect, size: int = SHINGLE_SIZE) -> FrozenSet[int]:
+    """Hashed word n-grams of the defect's text"""
+    tokens = []
+    for field in SHINGLE_FIELDS:
+        tokens.extend(tokenize(getattr(defect, field)))
+    if len(tokens) < size:
+        return frozenset([zlib.crc32(" ".join(tokens).encode())]) if tokens else frozenset()
+    return frozenset(
+        zlib.crc32(" ".join(tokens[i:i + size]).encode()) for i in range(len(tokens) - size + 1)
+    )
+
+
+def jaccard(a: FrozenSet[int], b: FrozenSet[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class DuplicateDetector:
+    """
+    Near-duplicate defect detection with MinHash and locality-sensitive hashing.
+
+    Each defect's text is reduced to a set of word shingles. Defects with
+    identical shingle sets share one node; every node gets a MinHash
+    signature of `bands * rows` values, split into bands, and nodes sharing
+    any band bucket become candidate pairs, so only a small fraction of all
+    pairs is ever compared. Candidates are confirmed by exact Jaccard
+    similarity; confirmed pairs form a graph whose connected components are
+    the duplicate clusters. Defects can be added or replaced one at a time,
+    e.g. on ingest.
+    """
+
+    def __init__(self, bands: Optional[int] = None, rows: Optional[int] = None,
+                 threshold: Optional[float] = None, seed: int = 1):
+        self.bands = bands or int(os.getenv("DUPLICATE_LSH_BANDS", 12))
+        self.rows = rows or int(os.getenv("DUPLICATE_LSH_ROWS", 6))
+        self.threshold = threshold if threshold is not None else float(os.getenv("DUPLICATE_THRESHOLD", 0.7))
+        self._seed = seed.to_bytes(8, "little")
+        self._hash_format = f"<{self.bands * self.rows}I"
+        self._shingle_hashes: Dict[int, Tuple[int, ...]] = {}
+        self._lock = threading.RLock()
+        self._defects: Dict[DefectKey, Defect] = {}
+        self._node_of: Dict[DefectKey, Node] = {}
+        self._members: Dict[Node, List[DefectKey]] = {}
+        self._band_keys: Dict[Node, List[Tuple[int, int]]] = {}
+        self._buckets: Dict[Tuple[int, int], Set[Node]] = defaultdict(set)
+        self._edges: Dict[Node, Dict[Node, float]] = defaultdict(dict)
+        self.candidate_pairs = 0
+
+    def __len__(self) -> int:
+        return len(self._defects)
+
+    def _hashes(self, shingle: int) -> Tuple[int, ...]:
+        """One 32-bit value per MinHash function, all derived from a single SHAKE digest"""
+        values = self._shingle_hashes.get(shingle)
+        if values is None:
+            digest = hashlib.shake_128(self._seed + shingle.to_bytes(4, "little")).digest(4 * self.bands * self.rows)
+            values = struct.unpack(self._hash_format, digest)
+            if len(self._shingle_hashes) < 1_000_000:
+                self._shingle_hashes[shingle] = values
+        return values
+
+    def _signature(self, node: Node) -> List[int]:
+        # Column-wise minimum across the shingles' hash rows
+        return list(map(min, zip(*map(self._hashes, node))))
+
+    def _bands(self, signature: List[int]) -> List[Tuple[int, int]]:
+        rows = self.rows
+        return [(band, hash(tuple(signature[band * rows:(band + 1) * rows]))) for band in range(self.bands)]
+
+    def add(self, feature_id: str, defect: Defect):
+        """Index a defect, replacing any earlier version with the same defectId"""
+        key = (feature_id, defect.defectId)
+        node = shingles(defect)
+
+        with self._lock:
+            if key in self._defects:
+                self._remove(key)
+            self._defects[key] = defect
+            if not node:
+                return
+            self._node_of[key] = node
+            if node in self._members:
+                # Exact textual duplicate of an indexed defect
+                self._members[node].append(key)
+                return
+            self._members[node] = [key]
+
+        band_keys = self._bands(self._signature(node))
+
+        with self._lock:
+            if self._members.get(node) is None:
+                return  # removed meanwhile
+            self._band_keys[node] = band_keys
+            candidates: Set[Node] = set()
+            for band_key in band_keys:
+                bucket = self._buckets[band_key]
+                candidates.update(bucket)
+                bucket.add(node)
+            self.candidate_pairs += len(candidates)
+
+            for other in candidates:
+                similarity = jaccard(node, other)
+                if similarity >= self.threshold:
+                    self._edges[node][other] = similarity
+                    self._edges[other][node] = similarity
+
+    def add_many(self, feature_id: str, defects: Iterable[Defect]):
+        for defect in defects:
+            self.add(feature_id, defect)
+
+    def remove_feature(self, feature_id: str):
+        with self._lock:
+            for key in [key for key in self._defects if key[0] == feature_id]:
+                self._remove(key)
+
+    def _remove(self, key: DefectKey):
+        del self._defects[key]
+        node = self._node_of.pop(key, None)
+        if node is None:
+            return
+        members = self._members[node]
+        members.remove(key)
+        if members:
+            return
+
+        del self._members[node]
+        for band_key in self._band_keys.pop(node, ()):
+            bucket = self._buckets[band_key]
+            bucket.discard(node)
+            if not bucket:
+                del self._buckets[band_key]
+        for other in self._edges.pop(node, {}):
+            self._edges[other].pop(node, None)
+            if not self._edges[other]:
+                del self._edges[other]
+
+    def _component(self, start: Node) -> List[Node]:
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            for neighbour in self._edges.get(queue.popleft(), ()):
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return list(seen)
+
+    def clusters(self, feature_id: Optional[str] = None) -> List[DuplicateCluster]:
+        """
+        Duplicate clusters, largest first. With `feature_id`, only clusters
+        containing at least one of that feature's defects (members from other
+        features are included).
+        """
+        with self._lock:
+            if feature_id is None:
+                starts = list(self._members)
+            else:
+                starts = list(dict.fromkeys(node for key, node in self._node_of.items() if key[0] == feature_id))
+            seen: Set[Node] = set()
+            clusters = []
+            for node in starts:
+                if node in seen:
+                    continue
+                component = self._component(node)
+                seen.update(component)
+                if len(component) > 1 or len(self._members[node]) > 1:
+                    clusters.append(self._cluster(component))
+
+        clusters.sort(key=lambda cluster: (-cluster.size, cluster.clusterId))
+        return clusters
+
+    def _cluster(self, component: List[Node]) -> DuplicateCluster:
+        keys = [key for node in component for key in self._members[node]]
+        # The earliest report is treated as the original
+        keys.sort(key=lambda key: (self._defects[key].createdAt or "", key))
+        canonical = self._node_of[keys[0]]
+        members = [
+            DuplicateMember(
+                featureId=key[0],
+                defectId=key[1],
+                title=self._defects[key].title,
+                cycle=self._defects[key].cycle,
+                status=self._defects[key].status,
+                similarity=round(jaccard(canonical, self._node_of[key]), 4)
+            )
+            for key in keys
+        ]
+        return DuplicateCluster(clusterId=f"{keys[0][0]}:{keys[0][1]}", size=len(members), members=members)
+
+
+def scan(defects_by_feature: Dict[str, List[Defect]],
+         detector: Optional[DuplicateDetector] = None) -> Tuple[DuplicateDetector, DuplicateScanReport]:
+    """Batch job: index every defect and report what was found"""
+    started = time.perf_counter()
+    detector = detector or DuplicateDetector()
+    for feature_id, defects in defects_by_feature.items():
+        detector.add_many(feature_id, defects)
+    clusters = detector.clusters()
+    report = DuplicateScanReport(
+        defects=len(detector),
+        candidatePairs=detector.candidate_pairs,
+        clusters=len(clusters),
+        duplicateDefects=sum(cluster.size - 1 for cluster in clusters),
+        elapsedSeconds=round(time.perf_counter() - started, 3)
+    )
+    return detector, report
@@ -0,0 +1,277 @@
+"""
+Quarter-wide export of QSR metrics as CSV or XLSX.
+
+Rows are pulled lazily: the newest archived report of each item in the
+quarter is decoded one at a time, then live Kissflow items not archived yet
+are read page by page and enriched from the test execution and defect
+services. Each row holds the QsrData scalar fields, one build's TestBuild
+metrics and the feature's defect counts by severity (features without
+builds get one row with empty build columns).
+
+Both writers emit the header straight away and then flush every
+EXPORT_CHUNK_KB of output, so memory does not grow with the number of
+features: archived reports are found by walking the archive index in place
+and live items are checked against it by lookup. XLSX is written with
+zipfile into an unseekable sink: entries use data descriptors and the
+worksheet is deflated as rows arrive.
+
+The archive holds reports of the default tenant only, so exports of other
+tenants cover their live items alone. The status and headers are sent
+before any row, so a request deadline passing mid-export cannot turn into a
+504: the file ends with an INCOMPLETE_MARKER row instead, and stays a
+well-formed CSV or workbook.
+"""
+
+import csv
+import io
+import logging
+import os
+import re
+import zipfile
+from typing import Any, Iterator, List, Optional
+from xml.sax.saxutils import escape
+from app import deadlines
+from app.deadlines import DeadlineExceeded
+from app.models import QsrData, TestBuild
+from app.services.report_renderer import SEVERITIES
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+EXPORT_SOURCES = ("all", "archive", "kissflow")
+
+CHUNK_BYTES = int(os.getenv("EXPORT_CHUNK_KB", 64)) * 1024
+
+SCALAR_FIELDS = [name for name in QsrData.model_fields if name not in ("TestExecutionData", "DefectData")]
+BUILD_FIELDS = list(TestBuild.model_fields)
+COLUMNS = [
+    "ItemId", "Source", *SCALAR_FIELDS, *BUILD_FIELDS,
+    *(f"Defects{severity}" for severity in SEVERITIES), "DefectsTotal", "DefectsOpen",
+]
+
+CLOSED_STATUSES = ("Closed", "Resolved")
+
+# ItemId cell of the last row of an export cut short by its deadline
+INCOMPLETE_MARKER = "#INCOMPLETE"
+
+# Spreadsheet apps evaluate CSV cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+# Characters XML 1.0 does not allow, even escaped
+_XML_ILLEGAL = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]")
+
+# Excel's cell text limit
+_MAX_CELL_CHARS = 32767
+
+
+def _defect_counts(data: QsrData) -> List[int]:
+    counts = dict.fromkeys(SEVERITIES, 0)
+    total = open_count = 0
+    for defect in data.DefectData or ():
+        if defect.severity in counts:
+            counts[defect.severity] += 1
+        total += 1
+        open_count += defect.status not in CLOSED_STATUSES
+    return [*counts.values(), total, open_count]
+
+
+def feature_rows(item_id: str, source: str, data: QsrData) -> Iterator[List[Any]]:
+    """One row per build of a feature, or a single row without builds"""
+    head = [item_id, source, *(getattr(data, field) for field in SCALAR_FIELDS)]
+    tail = _defect_counts(data)
+    builds = sorted(data.TestExecutionData or (), key=lambda build: build.buildNumber)
+    if not builds:
+        yield head + [None] * len(BUILD_FIELDS) + tail
+    for build in builds:
+        yield head + [getattr(build, field) for field in BUILD_FIELDS] + tail
+
+
+def uses_archive(kissflow) -> bool:
+    """Whether exports for `kissflow`'s tenant include archived reports"""
+    from app.services.kissflow_service import DEFAULT_TENANT
+    return kissflow is None or kissflow.tenant_id == DEFAULT_TENANT
+
+
+def iter_rows(quarter: str, team: Optional[str] = None, source: str = "all",
+              kissflow=None) -> Iterator[List[Any]]:
+    """
+    Rows of every feature in `quarter`: archived reports first (default
+    tenant only), then live items from `kissflow` (a tenant's
+    KissflowService) not archived yet. Ends with an INCOMPLETE_MARKER row
+    if the request deadline passes.
+    """
+    from app.services.archive_service import archive_service
+
+    archive = uses_archive(kissflow)
+    features = 0
+    try:
+        if source in ("all", "archive") and archive:
+            for snapshot_id, item_id in archive_service.iter_latest(quarter):
+                deadlines.check("export")
+                data = archive_service.get_snapshot(snapshot_id)
+                if team and data.TeamName != team:
+                    continue
+                features += 1
+                yield from feature_rows(item_id, "archive", data)
+
+        if source in ("all", "kissflow") and kissflow is not None:
+            for item_id, data in kissflow.iter_items(team=team, quarter=quarter):
+                deadlines.check("export")
+                if source == "all" and archive and archive_service.is_archived(item_id, quarter):
+                    continue
+                features += 1
+                yield from feature_rows(item_id, "kissflow", data)
+    except DeadlineExceeded as e:
+        logger.warning("Export of quarter %s stopped after %d features: %s", quarter, features, e)
+        yield [INCOMPLETE_MARKER, f"Export stopped after {features} features: {e}"] + [None] * (len(COLUMNS) - 2)
+        return
+
+    logger.info("Exported %d features for quarter %s (team=%s, source=%s)", features, quarter, team, source)
+
+
+def _csv_cell(value: Any) -> Any:
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(rows: Iterator[List[Any]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # The BOM makes Excel read the file as UTF-8
+    buffer.write("\ufeff")
+    writer.writerow(COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    for row in rows:
+        writer.writerow([_csv_cell(value) for value in row])
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class _Sink:
+    """Write-only, unseekable file object collecting zipfile output"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+def _column_letters(index: int) -> str:
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+_COLUMN_LETTERS = [_column_letters(index) for index in range(len(COLUMNS))]
+
+_CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+
+_ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+
+_WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+
+_WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+
+# Style 1 is the bold header
+_STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font><font><b/><sz val="11"/><name val="Calibri"/></font></fonts>
+<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>
+<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>
+<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/><xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>
+</styleSheet>"""
+
+_SHEET_HEAD = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>
+<sheetData>"""
+
+_SHEET_TAIL = "</sheetData></worksheet>"
+
+
+def _xlsx_cell(ref: str, value: Any, style: str = "") -> str:
+    if value is None or value == "":
+        return ""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c r="{ref}"{style}><v>{value}</v></c>'
+    text = escape(_XML_ILLEGAL.sub("", str(value))[:_MAX_CELL_CHARS])
+    return f'<c r="{ref}"{style} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(number: int, values: List[Any], style: str = "") -> str:
+    cells = "".join(
+        _xlsx_cell(f"{letters}{number}", value, style) for letters, value in zip(_COLUMN_LETTERS, values)
+    )
+    return f'<row r="{number}">{cells}</row>'
+
+
+def iter_xlsx(rows: Iterator[List[Any]], sheet_name: str = "QSR") -> Iterator[bytes]:
+    sink = _Sink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archive.writestr("_rels/.rels", _ROOT_RELS)
+        archive.writestr("xl/workbook.xml", _WORKBOOK.format(name=escape(sheet_name[:31], {'"': "&quot;"})))
+        archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", _STYLES)
+
+        # force_zip64: the sheet's size is not known up front and may pass 4 GB
+        with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+            sheet.write((_SHEET_HEAD + _xlsx_row(1, COLUMNS, ' s="1"')).encode("utf-8"))
+            yield sink.drain()
+            for number, row in enumerate(rows, start=2):
+                sheet.write(_xlsx_row(number, row).encode("utf-8"))
+                if sink.size >= CHUNK_BYTES:
+                    yield sink.drain()
+            sheet.write(_SHEET_TAIL.encode("utf-8"))
+    yield sink.drain()
+
+
+def export_filename(quarter: str, fmt: str, team: Optional[str] = None) -> str:
+    parts = ["qsr", quarter] + ([team] if team else [])
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", "-".join(parts)).strip("-").lower()
+    return f"{slug}.{fmt}"
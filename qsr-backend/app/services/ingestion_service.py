@@ -0,0 +1,247 @@
+import codecs
+import csv
+import json
+import logging
+import os
+import time
+from typing import List, Any, Iterable, AsyncIterable, Optional
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from app.models import TestCase, IngestionReport, TestStatistics
+from app.services.test_execution_service import test_execution_service
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("csv", "jsonl")
+
+# Only the first few rejected rows are reported back to the caller
+MAX_REPORTED_ERRORS = 20
+
+# csv's strict-mode error for input that ends inside a quoted field
+_CSV_UNTERMINATED = "unexpected end of data"
+
+
+def detect_format(format_name: Optional[str], content_type: Optional[str] = None,
+                  filename: Optional[str] = None) -> str:
+    """
+    Resolve the payload format from an explicit name, a file extension or a
+    Content-Type header, in that order.
+    """
+    if format_name:
+        format_name = format_name.lower()
+        if format_name == "ndjson":
+            format_name = "jsonl"
+        if format_name not in SUPPORTED_FORMATS:
+            raise ValueError(f"Unsupported format '{format_name}'. Use one of: {', '.join(SUPPORTED_FORMATS)}")
+        return format_name
+
+    if filename:
+        lowered = filename.lower()
+        if lowered.endswith(".csv"):
+            return "csv"
+        if lowered.endswith((".jsonl", ".ndjson")):
+            return "jsonl"
+
+    if content_type:
+        lowered = content_type.lower()
+        if "csv" in lowered:
+            return "csv"
+        if "ndjson" in lowered or "jsonl" in lowered:
+            return "jsonl"
+
+    raise ValueError("Could not determine payload format. Pass format=csv or format=jsonl")
+
+
+class RecordParser:
+    """
+    Incremental CSV / JSONL parser. Raw byte chunks are fed in as they arrive
+    and complete records are returned; only the current partial line (or the
+    current multi-line quoted CSV record) is held in memory.
+    """
+
+    def __init__(self, format_name: str):
+        self.format_name = format_name
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""
+        self._record_lines: List[str] = []
+        self._header: Optional[List[str]] = None
+        self.line_number = 0
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        """Consume a chunk and return the records completed by it"""
+        self._pending += self._decoder.decode(chunk)
+        if "\n" not in self._pending:
+            return []
+        *lines, self._pending = self._pending.split("\n")
+        return self._parse_lines(lines)
+
+    def close(self) -> List[Any]:
+        """Flush the trailing line once the stream has ended"""
+        self._pending += self._decoder.decode(b"", final=True)
+        lines = [self._pending] if self._pending else []
+        self._pending = ""
+        records = self._parse_lines(lines)
+        if self._record_lines:
+            records.append(ValueError(f"Line {self.line_number}: unterminated quoted field"))
+            self._record_lines = []
+        return records
+
+    def _parse_lines(self, lines: List[str]) -> List[Any]:
+        records = []
+        for line in lines:
+            self.line_number += 1
+            line = line.rstrip("\r")
+            record = self._parse_jsonl(line) if self.format_name == "jsonl" else self._parse_csv(line)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def _parse_jsonl(self, line: str) -> Any:
+        if not line.strip():
+            return None
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            return ValueError(f"Line {self.line_number}: invalid JSON ({e.msg})")
+        if not isinstance(record, dict):
+            return ValueError(f"Line {self.line_number}: expected a JSON object")
+        return record
+
+    def _parse_csv(self, line: str) -> Any:
+        if not self._record_lines and not line.strip():
+            return None
+
+        # Lines are buffered until csv.reader can read a whole record from
+        # them: in strict mode it reports a quoted field still open at the
+        # end of the buffer, which means the record continues on the next line
+        self._record_lines.append(line + "\n")
+        try:
+            values = next(csv.reader(self._record_lines, strict=True))
+        except csv.Error as e:
+            if str(e) == _CSV_UNTERMINATED:
+                return None
+            # Malformed but complete (e.g. text after a closing quote): parse leniently
+            values = next(csv.reader(self._record_lines))
+        self._record_lines = []
+
+        if self._header is None:
+            self._header = [name.strip() for name in values]
+            return None
+        if len(values) != len(self._header):
+            return ValueError(
+                f"Line {self.line_number}: expected {len(self._header)} columns, got {len(values)}"
+            )
+        return {name: value for name, value in zip(self._header, values) if value != ""}
+
+
+class _IngestionRun:
+    """Accumulates parsed records into batches and writes them to the store"""
+
+    def __init__(self, feature_id: str, cycle: int, format_name: str, batch_size: int):
+        self.feature_id = feature_id
+        self.cycle = cycle
+        self.format_name = format_name
+        self.batch_size = batch_size
+        self.parser = RecordParser(format_name)
+        self.batch: List[TestCase] = []
+        self.rows_received = 0
+        self.rows_ingested = 0
+        self.rows_rejected = 0
+        self.batches = 0
+        self.errors: List[str] = []
+        self.started = time.perf_counter()
+
+    def _reject(self, message: str):
+        self.rows_rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(message)
+
+    def feed(self, chunk: bytes):
+        self.add(self.parser.feed(chunk))
+
+    def add(self, records: List[Any]):
+        for record in records:
+            self.rows_received += 1
+            if isinstance(record, ValueError):
+                self._reject(str(record))
+                continue
+            record.setdefault("comments", "")
+            try:
+                self.batch.append(TestCase(**record))
+            except ValidationError as e:
+                fields = ", ".join(".".join(str(p) for p in err["loc"]) for err in e.errors())
+                self._reject(f"Row {self.rows_received}: invalid or missing fields: {fields}")
+                continue
+            if len(self.batch) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        if not self.batch:
+            return
+        self.rows_ingested += test_execution_service.record_test_cases(self.feature_id, self.cycle, self.batch)
+        self.batches += 1
+        self.batch = []
+
+    def finish(self) -> IngestionReport:
+        self.add(self.parser.close())
+        self.flush()
+        if self.batches:
+            # Batches only marked trend aggregates dirty; persist them once per run
+            from app.services.trends_service import trends_service
+            trends_service.flush()
+
+        elapsed = time.perf_counter() - self.started
+        statistics = test_execution_service.get_run_statistics(self.feature_id, self.cycle)
+        report = IngestionReport(
+            featureId=self.feature_id,
+            cycle=self.cycle,
+            runId=test_execution_service.run_id_for(self.feature_id, self.cycle),
+            format=self.format_name,
+            rowsReceived=self.rows_received,
+            rowsIngested=self.rows_ingested,
+            rowsRejected=self.rows_rejected,
+            batches=self.batches,
+            elapsedSeconds=round(elapsed, 3),
+            rowsPerSecond=round(self.rows_ingested / elapsed, 1) if elapsed > 0 else 0.0,
+            errors=self.errors,
+            statistics=TestStatistics(**statistics) if statistics else None
+        )
+        logger.info(
+            "Ingested %d test results into %s (%d rejected, %s rows/s)",
+            report.rowsIngested, report.runId, report.rowsRejected, report.rowsPerSecond
+        )
+        return report
+
+
+class IngestionService:
+    def __init__(self):
+        self.batch_size = int(os.getenv("INGEST_BATCH_SIZE", 1000))
+
+    def _start(self, feature_id: str, cycle: int, format_name: str) -> _IngestionRun:
+        # Fail fast on unknown features before consuming the body
+        test_execution_service.get_feature(feature_id)
+        return _IngestionRun(feature_id, cycle, format_name, self.batch_size)
+
+    async def ingest_stream(self, feature_id: str, cycle: int, chunks: AsyncIterable[bytes],
+                            format_name: str) -> IngestionReport:
+        """
+        Ingest an async byte stream, e.g. an HTTP request body. Only reading
+        the body happens on the event loop; parsing, validation and writes
+        run in the threadpool, one received chunk at a time.
+        """
+        run = self._start(feature_id, cycle, format_name)
+        async for chunk in chunks:
+            await run_in_threadpool(run.feed, chunk)
+        return await run_in_threadpool(run.finish)
+
+    def ingest_chunks(self, feature_id: str, cycle: int, chunks: Iterable[bytes],
+                      format_name: str) -> IngestionReport:
+        """Ingest a synchronous byte stream, e.g. a file opened in binary mode"""
+        run = self._start(feature_id, cycle, format_name)
+        for chunk in chunks:
+            run.feed(chunk)
+        return run.finish()
+
+
+# Global service instance
+ingestion_service = IngestionService()
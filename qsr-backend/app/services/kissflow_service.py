@@ -1,80 +1,520 @@
+import contextvars
+import json
 import requests
 import os
-from typing import Dict, Any, List
-from app.models import QsrData, KissflowResponse
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from app.models import QsrData, KissflowResponse, FetchProgressEvent, PrefetchReport, Defect, TenantStatus
+from app.admission import AdmissionController, admission_controller
+from app.services.cache import TTLCache
+from app.services.rate_limiter import TokenBucketLimiter, RateLimitTimeout, LANE_INTERACTIVE, LANE_BATCH
+from app import deadlines
+from app.deadlines import DeadlineExceeded
+from app.memory import memory_monitor, MemoryBudgetExceeded
+from app.selective_json import parse_selected
+from app.fast_models import test_builds_from_cycles, validate_records
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Tenant selection: header, or query parameter for clients that cannot set
+# headers (EventSource). Requests naming no tenant use the default one.
+TENANT_HEADER = "X-Tenant-ID"
+TENANT_QUERY_PARAM = "tenant_id"
+DEFAULT_TENANT = "default"
+
+# Progress stages of a fetch, in the order they are emitted
+STAGE_UPSTREAM_FETCHED = "upstream_fetched"
+STAGE_MAPPED = "mapped"
+STAGE_TEST_EXECUTION = "test_execution_enriched"
+STAGE_DEFECTS = "defects_enriched"
+STAGE_COMPLETE = "missing_fields_computed"
+
+# Upper bound on a Retry-After pause, and the pause when the header is
+# missing or unreadable
+MAX_RETRY_AFTER = float(os.getenv("KISSFLOW_MAX_RETRY_AFTER", 60))
+DEFAULT_RETRY_AFTER = 1.0
+
+
+def retry_after_seconds(value: Optional[str]) -> float:
+    """
+    Seconds to wait from a Retry-After header, in either of its forms:
+    delay seconds or an HTTP date. Clamped to [0, MAX_RETRY_AFTER].
+    """
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            logger.warning("Unreadable Retry-After header: %r", value)
+            return DEFAULT_RETRY_AFTER
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    if math.isnan(seconds):
+        return DEFAULT_RETRY_AFTER
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+# Memory checkpoint after defects are loaded; over budget, defects are cut down
+# to the fields the report prints
+STAGE_DEFECT_DETAILS = "defect_details"
+REPORT_DEFECT_FIELDS = ("defectId", "status", "severity")
+
+# Defects are shared with the defect service, so their cost is paid when the
+# response is validated and serialized: about 2 KB per fully populated
+# defect (tracemalloc peak of fetch-data with 20k synthetic defects)
+DEFECT_RESPONSE_BYTES = int(os.getenv("MEMORY_DEFECT_RESPONSE_BYTES", 2048))
+
+# Kissflow fields read by _map_kissflow_to_qsr; list queries request only
+# these, and single-item responses are parsed for only these
+MAPPED_FIELDS = [
+    "_id", "Name", "Team", "Estimated_launch_quarter", "Frontend_PR_link",
+    "Backend_PR_Link", "TDD_Link_1", "Test_Case_Link", "TC_Prepared_by",
+    "AssignedTo", "Frontend_Developer", "Backend_Developer", "TDD_Prepared_by",
+]
+
 
 class KissflowService:
-    def __init__(self):
-        self.base_url = os.getenv("KISSFLOW_BASE_URL")
-        self.access_key_id = os.getenv("KISSFLOW_ACCESS_KEY_ID")
-        self.access_key_secret = os.getenv("KISSFLOW_ACCESS_KEY_SECRET")
-        
+    """
+    Kissflow client of one tenant (Kissflow account). Each tenant has its own
+    credentials, connection pool, rate limiter, item cache, admission share
+    and fetch counters, so one tenant's load cannot exhaust another's.
+    Without `config`, the default tenant is configured from the environment.
+    """
+
+    def __init__(self, tenant_id: str = DEFAULT_TENANT, config: Optional[Dict[str, Any]] = None):
+        self.tenant_id = tenant_id
+        if config is None:
+            self.base_url = os.getenv("KISSFLOW_BASE_URL")
+            self.access_key_id = os.getenv("KISSFLOW_ACCESS_KEY_ID")
+            self.access_key_secret = os.getenv("KISSFLOW_ACCESS_KEY_SECRET")
+            list_url = os.getenv("KISSFLOW_LIST_URL")
+            self.webhook_secret = os.getenv("KISSFLOW_WEBHOOK_SECRET") or None
+            config = {}
+        else:
+            # Credentials and the webhook secret never fall back to the
+            # environment: a tenant missing them serves mock data rather than
+            # another account's items
+            self.base_url = config.get("base_url")
+            self.access_key_id = config.get("access_key_id")
+            self.access_key_secret = config.get("access_key_secret") or (
+                os.getenv(config["access_key_secret_env"]) if config.get("access_key_secret_env") else None
+            )
+            list_url = config.get("list_url")
+            self.webhook_secret = config.get("webhook_secret") or (
+                os.getenv(config["webhook_secret_env"]) if config.get("webhook_secret_env") else None
+            )
+
+        def setting(name: str, env: str, default):
+            return config[name] if name in config else os.getenv(env, default)
+
         # Check if credentials are available
         self.has_credentials = all([self.base_url, self.access_key_id, self.access_key_secret])
         
         if not self.has_credentials:
-            logger.warning("Kissflow credentials not configured. Will use mock data.")
+            logger.warning("Kissflow credentials not configured for tenant %s. Will use mock data.", tenant_id)
 
-    def fetch_qsr_data(self, item_id: str) -> KissflowResponse:
+        # Admission control for this tenant's upstream calls (rate <= 0 disables it)
+        self.rate_limiter = TokenBucketLimiter(
+            rate=float(setting("rate_limit", "KISSFLOW_RATE_LIMIT", 10)),
+            burst=int(setting("rate_burst", "KISSFLOW_RATE_BURST", 20)),
+            queue_timeout=float(setting("queue_timeout", "KISSFLOW_QUEUE_TIMEOUT", 10))
+        )
+
+        # Mapped (pre-enrichment) items, filled by fetches and bulk prefetch
+        self.item_cache = TTLCache(
+            ttl=float(setting("cache_ttl", "KISSFLOW_CACHE_TTL", 300)),
+            max_entries=int(setting("cache_max_entries", "KISSFLOW_CACHE_MAX_ENTRIES", 10000))
+        )
+        self.list_url = list_url or (f"{self.base_url}/list" if self.base_url else None)
+        self.prefetch_concurrency = int(setting("prefetch_concurrency", "KISSFLOW_PREFETCH_CONCURRENCY", 4))
+
+        # Upper bound per upstream call; shortened to the request deadline if sooner
+        self.request_timeout = float(setting("timeout", "KISSFLOW_TIMEOUT", 30))
+
+        # Item responses are parsed as they arrive, keeping only MAPPED_FIELDS,
+        # instead of decoding the whole body (child tables, attachments) first
+        self.streaming_parse = str(setting("streaming_parse", "KISSFLOW_STREAMING_PARSE", "true")).lower() == "true"
+        self.parse_chunk_bytes = int(setting("parse_chunk_kb", "KISSFLOW_PARSE_CHUNK_KB", 64)) * 1024
+
+        # Keep-alive connections of this tenant only. A blocking pool makes
+        # callers wait for a connection instead of opening extra ones.
+        self.pool_size = int(setting("pool_size", "KISSFLOW_POOL_SIZE", 10))
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # This tenant's share of the server's request slots (0: unbounded)
+        self.admission = AdmissionController(
+            max_in_flight=int(setting("max_in_flight", "ADMISSION_TENANT_MAX_IN_FLIGHT", 0)),
+            max_queued=int(setting("max_queued", "ADMISSION_TENANT_MAX_QUEUED", 64)),
+            max_queue_wait=admission_controller.max_queue_wait
+        )
+
+        # Completed fetches by data source, and failed upstream calls
+        self._stats_lock = threading.Lock()
+        self.fetches: Dict[str, int] = {"kissflow": 0, "cache": 0, "mock": 0}
+        self.upstream_errors = 0
+
+    def _count_error(self):
+        with self._stats_lock:
+            self.upstream_errors += 1
+
+    def stats(self) -> TenantStatus:
+        with self._stats_lock:
+            fetches = dict(self.fetches)
+            upstream_errors = self.upstream_errors
+        return TenantStatus(
+            tenantId=self.tenant_id,
+            configured=self.has_credentials,
+            baseUrl=self.base_url,
+            poolSize=self.pool_size,
+            fetches=fetches,
+            upstreamErrors=upstream_errors,
+            rateLimit=self.rate_limiter.metrics(),
+            cache=self.item_cache.stats(),
+            admission=self.admission.metrics()
+        )
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            'X-Access-Key-Id': self.access_key_id,
+            'X-Access-Key-Secret': self.access_key_secret,
+            'Content-Type': 'application/json',
+            'Accept': 'application/json',
+        }
+
+    def fetch_qsr_data(self, item_id: str, priority: str = LANE_INTERACTIVE) -> KissflowResponse:
+        """
+        Fetch QSR data from Kissflow API or return mock data if credentials not available.
+        `priority` selects the rate limiter lane ('interactive', 'sync' or 'batch').
+        """
+        event = None
+        try:
+            for event in self.iter_fetch_stages(item_id, priority):
+                pass
+        except UpstreamStageError as e:
+            # Nothing was returned yet, so mock data can still stand in whole
+            logger.info("Falling back to mock data: %s", e)
+            event = None
+            for event in self._iter_mock_stages(item_id):
+                pass
+
+        return KissflowResponse(
+            success=True,
+            data=event.data,
+            missingFields=event.missingFields,
+            source=event.source,
+            degraded=event.degraded
+        )
+
+    def iter_fetch_stages(self, item_id: str, priority: str = LANE_INTERACTIVE) -> Iterator[FetchProgressEvent]:
         """
-        Fetch QSR data from Kissflow API or return mock data if credentials not available
+        Fetch QSR data stage by stage. Each stage yields an event carrying the
+        partial QsrData available at that point; the last event ('done') holds
+        the complete data and its missing fields.
+
+        Upstream failures fall back to mock stages only before the first event
+        is yielded. Once real stages went out, a failure raises
+        UpstreamStageError so a stream never mixes sources.
         """
         # If no credentials, return mock data
         if not self.has_credentials:
-            logger.info(f"Using mock data for item: {item_id} (no credentials configured)")
-            return self._get_mock_data(item_id)
+            logger.info("Using mock data for item: %s (no credentials configured)", item_id)
+            yield from self._iter_mock_stages(item_id)
+            return
         
+        cached = self.item_cache.get(item_id)
+        # The cache warmer refreshes through the default tenant only
+        if priority == LANE_INTERACTIVE and self.tenant_id == DEFAULT_TENANT:
+            from app.services.cache_warmer import cache_warmer
+            cache_warmer.observe(item_id, cached is not None)
+        if cached is not None:
+            logger.info("Serving Kissflow data for item %s from cache", item_id)
+            yield FetchProgressEvent(stage=STAGE_UPSTREAM_FETCHED, source="cache")
+            yield from self._iter_enrichment_stages(cached.model_copy(), item_id, "cache")
+            return
+
+        started = False
         try:
-            url = f"{self.base_url}/{item_id}"
-            
-            headers = {
-                'X-Access-Key-Id': self.access_key_id,
-                'X-Access-Key-Secret': self.access_key_secret,
-                'Content-Type': 'application/json',
-                'Accept': 'application/json',
-            }
-            
-            logger.info(f"Fetching data from Kissflow for item: {item_id}")
-            
-            response = requests.get(url, headers=headers, timeout=30)
-            
+            response = self._request_item(item_id, priority)
+
             if response.status_code != 200:
-                logger.error(f"Kissflow API error: {response.status_code} - {response.text}")
+                self._count_error()
+                logger.error("Kissflow API error: %s - %s", response.status_code, response.text)
                 logger.info("Falling back to mock data due to API error")
-                return self._get_mock_data(item_id)
+                started = True
+                yield from self._iter_mock_stages(item_id)
+                return
             
-            kissflow_data = response.json()
+            kissflow_data = self._read_item(response)
             logger.info("Successfully fetched data from Kissflow")
-            
-            # Map Kissflow data to QSR format
+            started = True
+            yield FetchProgressEvent(stage=STAGE_UPSTREAM_FETCHED, source="kissflow")
+
             mapped_data = self._map_kissflow_to_qsr(kissflow_data)
+            self.item_cache.set(item_id, mapped_data.model_copy())
+            yield from self._iter_enrichment_stages(mapped_data, item_id, "kissflow")
+            
+        except (DeadlineExceeded, MemoryBudgetExceeded):
+            raise
+        except Exception as e:
+            if started:
+                logger.error("Fetch of item %s failed after upstream stages were sent: %s", item_id, e)
+                raise UpstreamStageError(f"Fetch of item {item_id} failed mid-stream: {e}") from e
+            yield from self._iter_fallback_stages(item_id, e)
+
+    def _iter_fallback_stages(self, item_id: str, error: Exception) -> Iterator[FetchProgressEvent]:
+        """Mock stages standing in for a fetch that failed before yielding anything"""
+        if isinstance(error, RateLimitTimeout):
+            self._count_error()
+            logger.warning("Rate limited: %s", error)
+            logger.info("Falling back to mock data due to upstream rate limit")
+        elif isinstance(error, requests.RequestException):
+            self._count_error()
+            logger.error("Request error: %s", error)
+            logger.info("Falling back to mock data due to network error")
+        else:
+            logger.error("Unexpected error: %s", error)
+            logger.info("Falling back to mock data due to unexpected error")
+        yield from self._iter_mock_stages(item_id)
 
-            # Enhance with test execution data
-            self._enhance_with_test_execution_data(mapped_data, item_id)
+    def _request_item(self, item_id: str, priority: str) -> requests.Response:
+        """GET a single item through the rate limiter"""
+        url = f"{self.base_url}/{item_id}"
 
-            # Enhance with defect data
-            self._enhance_with_defect_data(mapped_data, item_id)
+        waited = self.rate_limiter.acquire(
+            priority, timeout=deadlines.bounded(self.rate_limiter.queue_timeout, "upstream slot")
+        )
+        logger.info("Fetching data from Kissflow for item: %s (tenant %s, queued %.3fs)", item_id, self.tenant_id, waited)
 
-            missing_fields = self._identify_missing_fields(mapped_data)
+        response = self.session.get(
+            url, headers=self._headers(), timeout=deadlines.bounded(self.request_timeout, STAGE_UPSTREAM_FETCHED),
+            stream=self.streaming_parse
+        )
 
-            return KissflowResponse(
-                success=True,
-                data=mapped_data,
-                missingFields=missing_fields
-            )
-            
-        except requests.RequestException as e:
-            logger.error(f"Request error: {str(e)}")
-            logger.info("Falling back to mock data due to network error")
-            return self._get_mock_data(item_id)
-        except Exception as e:
-            logger.error(f"Unexpected error: {str(e)}")
-            logger.info("Falling back to mock data due to unexpected error")
-            return self._get_mock_data(item_id)
+        if response.status_code == 429:
+            self.rate_limiter.pause(retry_after_seconds(response.headers.get("Retry-After")))
+        return response
+
+    def _read_item(self, response: requests.Response) -> Dict[str, Any]:
+        """
+        The MAPPED_FIELDS of a single-item response. Streamed responses are
+        parsed chunk by chunk; once every mapped field is found the rest of
+        the body is read and discarded, so the connection can be reused.
+        """
+        if not self.streaming_parse:
+            return response.json()
+        try:
+            chunks = response.iter_content(self.parse_chunk_bytes)
+            values, parser = parse_selected(chunks, MAPPED_FIELDS)
+            for _ in chunks:
+                pass
+        finally:
+            response.close()
+        logger.debug("Parsed %d mapped fields from the first %d bytes (peak buffer %d bytes)",
+                     len(values), parser.bytes_read, parser.peak_buffer)
+        return values
+
+    def refresh_item(self, item_id: str, priority: str = LANE_BATCH) -> bool:
+        """
+        Re-fetch an item from Kissflow into the item cache, bypassing any cached
+        copy. Returns False if the item could not be fetched.
+        """
+        mapped_data = self.fetch_uncached(item_id, priority)
+        if mapped_data is None:
+            return False
+        self.item_cache.set(item_id, mapped_data)
+        return True
+
+    def fetch_uncached(self, item_id: str, priority: str = LANE_BATCH) -> Optional[QsrData]:
+        """
+        Fetch and map an item from Kissflow without reading or filling the
+        item cache. Returns None if the item could not be fetched.
+        """
+        if not self.has_credentials:
+            return None
+        try:
+            response = self._request_item(item_id, priority)
+            if response.status_code != 200:
+                response.close()
+                logger.warning("Could not refresh item %s: Kissflow returned %s", item_id, response.status_code)
+                return None
+            return self._map_kissflow_to_qsr(self._read_item(response))
+        except (RateLimitTimeout, requests.RequestException, ValueError) as e:
+            logger.warning("Could not refresh item %s: %s", item_id, e)
+            return None
+
+    def prefetch(self, team: Optional[str] = None, quarter: Optional[str] = None,
+                 page_size: int = 100) -> PrefetchReport:
+        """
+        Bulk-load every item matching team/quarter through the paginated list
+        API into the item cache. Only the mapped fields are requested, and
+        pages after the first are fetched concurrently on the batch lane.
+        """
+        started = time.perf_counter()
+        report = PrefetchReport(team=team, quarter=quarter, source="kissflow", items=0, pages=0,
+                                failedPages=0, elapsedSeconds=0.0)
+
+        if not self.has_credentials:
+            logger.info("Skipping prefetch - Kissflow credentials not configured")
+            report.source = "mock"
+            return report
+
+        filters = self._list_filters(team, quarter)
+        items, total = self._fetch_page(1, page_size, filters)
+        report.pages = 1
+        report.itemIds.extend(self._cache_items(items))
+
+        if total is not None:
+            remaining = list(range(2, math.ceil(total / page_size) + 1))
+            with ThreadPoolExecutor(max_workers=max(1, self.prefetch_concurrency)) as pool:
+                # Each page runs in a copy of this context so it shares the request deadline
+                futures = [
+                    pool.submit(contextvars.copy_context().run, self._fetch_page, page, page_size, filters)
+                    for page in remaining
+                ]
+                for future in futures:
+                    report.pages += 1
+                    try:
+                        page_items, _ = future.result()
+                    except (requests.RequestException, RateLimitTimeout, ValueError) as e:
+                        logger.warning("Prefetch page failed: %s", e)
+                        report.failedPages += 1
+                        continue
+                    report.itemIds.extend(self._cache_items(page_items))
+        else:
+            # No total reported: walk pages until a short one
+            page = 1
+            while len(items) == page_size:
+                page += 1
+                items, _ = self._fetch_page(page, page_size, filters)
+                report.pages += 1
+                report.itemIds.extend(self._cache_items(items))
+
+        report.items = len(report.itemIds)
+        report.elapsedSeconds = round(time.perf_counter() - started, 3)
+        logger.info(
+            "Prefetched %d items (team=%s, quarter=%s) in %d pages, %.3fs",
+            report.items, team, quarter, report.pages, report.elapsedSeconds
+        )
+        return report
+
+    def iter_items(self, team: Optional[str] = None, quarter: Optional[str] = None,
+                   page_size: int = 100) -> Iterator[Tuple[str, QsrData]]:
+        """
+        Walk the list API one page at a time on the batch lane, yielding each
+        item mapped and enriched with test execution and defect data. Only the
+        current page is held, so callers can stream any number of items.
+        Nothing is yielded without credentials.
+        """
+        if not self.has_credentials:
+            return
+        filters = self._list_filters(team, quarter)
+        page = 1
+        while True:
+            items, total = self._fetch_page(page, page_size, filters)
+            for item in items:
+                item_id = item.get("_id")
+                if not item_id:
+                    continue
+                mapped_data = self._map_kissflow_to_qsr(item)
+                self._enhance_with_test_execution_data(mapped_data, item_id)
+                self._enhance_with_defect_data(mapped_data, item_id)
+                yield item_id, mapped_data
+            if len(items) < page_size or (total is not None and page * page_size >= total):
+                return
+            page += 1
+
+    @staticmethod
+    def _list_filters(team: Optional[str], quarter: Optional[str]) -> Dict[str, str]:
+        filters = {}
+        if team:
+            filters["Team"] = team
+        if quarter:
+            filters["Estimated_launch_quarter"] = quarter
+        return filters
+
+    def _fetch_page(self, page_number: int, page_size: int,
+                    filters: Dict[str, str]) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Fetch one page of the list API; returns (items, total count if reported)"""
+        self.rate_limiter.acquire(LANE_BATCH, timeout=deadlines.bounded(self.rate_limiter.queue_timeout, "upstream slot"))
+        params = {
+            "page_number": page_number,
+            "page_size": page_size,
+            "fields": ",".join(MAPPED_FIELDS),
+            **filters,
+        }
+        response = self.session.get(
+            self.list_url, headers=self._headers(), params=params,
+            timeout=deadlines.bounded(self.request_timeout, f"list page {page_number}")
+        )
+        if response.status_code == 429:
+            self.rate_limiter.pause(retry_after_seconds(response.headers.get("Retry-After")))
+        response.raise_for_status()
+
+        body = response.json()
+        if isinstance(body, list):
+            return body, None
+        items = body.get("Data") or body.get("data") or []
+        total = body.get("Total", body.get("TotalCount", body.get("total")))
+        return items, int(total) if total is not None else None
+
+    def _cache_items(self, items: List[Dict[str, Any]]) -> List[str]:
+        cached = []
+        for item in items:
+            item_id = item.get("_id")
+            if not item_id:
+                continue
+            self.item_cache.set(item_id, self._map_kissflow_to_qsr(item))
+            cached.append(item_id)
+        return cached
+
+    def _iter_enrichment_stages(self, mapped_data: QsrData, item_id: str, source: str) -> Iterator[FetchProgressEvent]:
+        """Stages shared by the Kissflow and mock paths, starting from the mapped data"""
+        yield FetchProgressEvent(stage=STAGE_MAPPED, source=source, data=mapped_data.model_copy())
+
+        # Enhance with test execution data
+        deadlines.check(STAGE_TEST_EXECUTION)
+        self._enhance_with_test_execution_data(mapped_data, item_id)
+        yield FetchProgressEvent(stage=STAGE_TEST_EXECUTION, source=source, data=mapped_data.model_copy())
+
+        # Enhance with defect data, the bulk of a defect-heavy response. Over
+        # the request's memory budget it is skipped, or slimmed once loaded.
+        deadlines.check(STAGE_DEFECTS)
+        if not memory_monitor.checkpoint(STAGE_DEFECTS):
+            self._enhance_with_defect_data(mapped_data, item_id)
+            expected = len(mapped_data.DefectData or ()) * DEFECT_RESPONSE_BYTES
+            if mapped_data.DefectData and memory_monitor.checkpoint(STAGE_DEFECT_DETAILS, expected):
+                mapped_data.DefectData = validate_records(Defect, (
+                    {field: getattr(defect, field) for field in REPORT_DEFECT_FIELDS}
+                    for defect in mapped_data.DefectData
+                ))
+        yield FetchProgressEvent(stage=STAGE_DEFECTS, source=source, data=mapped_data.model_copy())
+
+        deadlines.check(STAGE_COMPLETE)
+        missing_fields = self._identify_missing_fields(mapped_data)
+        request_memory = memory_monitor.current_request()
+        with self._stats_lock:
+            self.fetches[source] = self.fetches.get(source, 0) + 1
+        yield FetchProgressEvent(
+            stage=STAGE_COMPLETE,
+            source=source,
+            done=True,
+            data=mapped_data,
+            missingFields=missing_fields,
+            degraded=list(request_memory.degraded) if request_memory and request_memory.degraded else None
+        )
 
     def _map_kissflow_to_qsr(self, kissflow_data: Dict[str, Any]) -> QsrData:
         """
@@ -179,10 +619,28 @@ class KissflowService:
         """
         Return mock data for testing when Kissflow credentials are not available
         """
+        event = None
+        for event in self._iter_mock_stages(item_id):
+            pass
+
+        return KissflowResponse(
+            success=True,
+            data=event.data,
+            missingFields=event.missingFields,
+            source=event.source,
+            degraded=event.degraded
+        )
+
+    def _iter_mock_stages(self, item_id: str) -> Iterator[FetchProgressEvent]:
+        """
+        Mock counterpart of iter_fetch_stages, used when Kissflow credentials
+        are not available or the upstream call fails
+        """
         import time
         
-        # Simulate API delay
-        time.sleep(1)
+        # Simulate API delay, but never past the request deadline
+        time.sleep(deadlines.bounded(1, STAGE_UPSTREAM_FETCHED))
+        deadlines.check(STAGE_UPSTREAM_FETCHED)
         
         # Mock Kissflow API response based on the actual JSON structure
         mock_kissflow_data = {
@@ -259,11 +717,14 @@ class KissflowService:
             "Bugs_Reported": False
         }
         
+        yield FetchProgressEvent(stage=STAGE_UPSTREAM_FETCHED, source="mock")
+
         # Map the mock data to QSR format using the same mapping function
         mapped_data = self._map_kissflow_to_qsr(mock_kissflow_data)
 
-        # Add Test Execution Data for Flow Lock feature
-        from app.models import TestBuild, Defect
+        # Basic Test Execution Data for Flow Lock feature, kept if the
+        # test execution service cannot enhance it
+        from app.models import TestBuild
         mapped_data.TestExecutionData = [
             TestBuild(
                 buildNumber=1,
@@ -303,49 +764,8 @@ class KissflowService:
             )
         ]
 
-        # Add enhanced Defect Data using defect service
-        from app.services.defect_service import defect_service
-        mapped_data.DefectData = defect_service.get_defects_by_kissflow_id(item_id)
-
-        # Add enhanced Test Execution Data from test execution service
-        try:
-            from app.services.test_execution_service import test_execution_service
-            from app.models import TestBuild
-            feature = test_execution_service.get_feature_by_kissflow_id(item_id)
-            feature_cycles = test_execution_service.get_feature_cycles(feature.id)
-
-            # Convert feature cycles to TestBuild objects
-            enhanced_test_data = []
-            for cycle in feature_cycles.cycles:
-                enhanced_test_data.append(TestBuild(
-                    buildNumber=cycle.cycle,
-                    startDate=cycle.startDate[:10],  # Extract date part
-                    endDate=cycle.endDate[:10],
-                    totalDesigned=cycle.totalTests,
-                    totalExecuted=cycle.totalTests,
-                    totalPassed=cycle.passed,
-                    totalFailed=cycle.failed,
-                    passPercentage=round(cycle.passRate, 2),
-                    failPercentage=round(100 - cycle.passRate, 2),
-                    defectsFound=cycle.bugsFound
-                ))
-
-            # Replace the basic test execution data with enhanced data
-            mapped_data.TestExecutionData = enhanced_test_data
-
-        except Exception as e:
-            logger.warning(f"Could not enhance test execution data: {str(e)}")
-            # Keep the existing basic test data if enhancement fails
-
-        missing_fields = self._identify_missing_fields(mapped_data)
-
-        logger.info(f"Returning mock data for item: {item_id}")
-
-        return KissflowResponse(
-            success=True,
-            data=mapped_data,
-            missingFields=missing_fields
-        )
+        logger.info("Returning mock data for item: %s", item_id)
+        yield from self._iter_enrichment_stages(mapped_data, item_id, "mock")
 
     def _enhance_with_test_execution_data(self, mapped_data: QsrData, item_id: str):
         """
@@ -353,32 +773,18 @@ class KissflowService:
         """
         try:
             from app.services.test_execution_service import test_execution_service
-            from app.models import TestBuild
             feature = test_execution_service.get_feature_by_kissflow_id(item_id)
             feature_cycles = test_execution_service.get_feature_cycles(feature.id)
 
             # Convert feature cycles to TestBuild objects
-            enhanced_test_data = []
-            for cycle in feature_cycles.cycles:
-                enhanced_test_data.append(TestBuild(
-                    buildNumber=cycle.cycle,
-                    startDate=cycle.startDate[:10],  # Extract date part
-                    endDate=cycle.endDate[:10],
-                    totalDesigned=cycle.totalTests,
-                    totalExecuted=cycle.totalTests,
-                    totalPassed=cycle.passed,
-                    totalFailed=cycle.failed,
-                    passPercentage=round(cycle.passRate, 2),
-                    failPercentage=round(100 - cycle.passRate, 2),
-                    defectsFound=cycle.bugsFound
-                ))
+            enhanced_test_data = test_builds_from_cycles(feature_cycles.cycles)
 
             # Set the enhanced test execution data
             mapped_data.TestExecutionData = enhanced_test_data
-            logger.info(f"Enhanced QSR data with {len(enhanced_test_data)} test cycles")
+            logger.info("Enhanced QSR data with %d test cycles", len(enhanced_test_data))
 
         except Exception as e:
-            logger.warning(f"Could not enhance test execution data for {item_id}: {str(e)}")
+            logger.warning("Could not enhance test execution data for %s: %s", item_id, e)
             # Continue without enhancement if it fails
 
     def _enhance_with_defect_data(self, mapped_data: QsrData, item_id: str):
@@ -389,12 +795,66 @@ class KissflowService:
             from app.services.defect_service import defect_service
             enhanced_defects = defect_service.get_defects_by_kissflow_id(item_id)
             mapped_data.DefectData = enhanced_defects
-            logger.info(f"Enhanced QSR data with {len(enhanced_defects)} defects")
+            logger.info("Enhanced QSR data with %d defects", len(enhanced_defects))
 
         except Exception as e:
-            logger.warning(f"Could not enhance defect data for {item_id}: {str(e)}")
+            logger.warning("Could not enhance defect data for %s: %s", item_id, e)
             # Continue without enhancement if it fails
 
 
-# Global service instance
-kissflow_service = KissflowService()
\ No newline at end of file
+class UpstreamStageError(Exception):
+    """A fetch failed after some of its stages were already yielded"""
+
+
+class UnknownTenant(KeyError):
+    """A request named a tenant that is not configured"""
+
+
+class KissflowTenants:
+    """
+    Registry of Kissflow tenants. The default tenant is configured from the
+    KISSFLOW_* environment; further tenants come from the JSON file named by
+    KISSFLOW_TENANTS_FILE, an object mapping tenant IDs to their settings.
+    """
+
+    def __init__(self, default: KissflowService):
+        self._services: Dict[str, KissflowService] = {DEFAULT_TENANT: default}
+        path = os.getenv("KISSFLOW_TENANTS_FILE")
+        if path:
+            self.load(path)
+
+    def load(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            tenants = json.load(f)
+        for tenant_id, config in tenants.items():
+            if tenant_id == DEFAULT_TENANT:
+                logger.warning("Ignoring tenant %r in %s: it is configured from KISSFLOW_* variables", tenant_id, path)
+                continue
+            self._services[tenant_id] = KissflowService(tenant_id, config)
+
+        # With several tenants sharing the server, none may take more than
+        # half of its request slots unless configured otherwise
+        if len(self._services) > 1 and admission_controller.enabled:
+            share = max(1, admission_controller.max_in_flight // 2)
+            for service in self._services.values():
+                if not service.admission.enabled:
+                    service.admission.max_in_flight = share
+        logger.info("Loaded %d Kissflow tenants from %s", len(self._services) - 1, path)
+
+    def get(self, tenant_id: Optional[str] = None) -> KissflowService:
+        """The tenant's service; the default one when `tenant_id` is empty"""
+        service = self._services.get(tenant_id or DEFAULT_TENANT)
+        if service is None:
+            raise UnknownTenant(f"Unknown tenant: {tenant_id}")
+        return service
+
+    def find(self, tenant_id: Optional[str] = None) -> Optional[KissflowService]:
+        return self._services.get(tenant_id or DEFAULT_TENANT)
+
+    def all(self) -> List[KissflowService]:
+        return list(self._services.values())
+
+
+# Global service instance (the default tenant) and the tenant registry
+kissflow_service = KissflowService()
+kissflow_tenants = KissflowTenants(kissflow_service)
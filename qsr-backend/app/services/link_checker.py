@@ -0,0 +1,385 @@
+"""
+Health checks for the artifact links of QSR reports.
+
+Links of one or many reports are deduplicated and checked concurrently on a
+bounded thread pool. A per-batch dispatcher keeps at most
+LINK_CHECK_PER_HOST checks in flight per host, so a batch dominated by one
+host (GitHub, Google Docs) neither trips its rate limits nor ties up every
+worker; the shared connection pool enforces the same bound across batches.
+Results are cached per URL: definite answers for LINK_CHECK_CACHE_TTL,
+transient failures (timeouts, 5xx) for the shorter LINK_CHECK_FAILURE_TTL.
+
+Each link gets a HEAD request, retried as a streamed GET (body not read)
+when the server rejects HEAD. Besides dead links, per-field checks flag
+links that point to the wrong thing: PR fields that are not pull request
+URLs, links that land on a sign-in page and one URL used for several fields.
+
+URLs come from clients, so the checker must not become a way into the
+internal network: every host is resolved first, and one with a loopback,
+private, link-local or otherwise non-public address is refused. Redirects
+are followed by hand, so each hop gets the same check. The connection then
+resolves the host again, and a DNS rebinding server could answer with a
+private address this time, so each new connection also checks the address
+it actually connected to before sending anything (TLS included). Proxies
+from the environment are ignored for the same reason.
+"""
+
+import ipaddress
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urldefrag, urljoin, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from app import deadlines
+from app.deadlines import DeadlineExceeded
+from app.models import LinkCheckResult, QsrData, ReportLinkCheck
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# QsrData fields holding links, in report order
+LINK_FIELDS = (
+    "URL", "FrontendPRLink", "BackendPRLink", "SpecDocLink", "DesignLink", "TDDLink",
+    "TestCaseDocLink", "TestCaseExecutionLink", "EvidenceDocLink", "RTMDocLink",
+)
+
+# Link statuses; only ok and restricted (exists, needs sign-in) count as healthy
+STATUS_OK = "ok"
+STATUS_RESTRICTED = "restricted"
+STATUS_BROKEN = "broken"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_UNREACHABLE = "unreachable"
+STATUS_INVALID = "invalid"
+STATUS_BLOCKED = "blocked"
+HEALTHY_STATUSES = (STATUS_OK, STATUS_RESTRICTED)
+
+# Worth re-checking soon rather than caching for the full TTL
+TRANSIENT_STATUSES = (STATUS_ERROR, STATUS_TIMEOUT, STATUS_UNREACHABLE)
+
+# HEAD answers some servers give instead of supporting it
+HEAD_REJECTED = (400, 403, 405, 406, 501)
+
+PULL_REQUEST_PATTERN = re.compile(r"/(pull|pulls|merge_requests|pull-requests)/\d+")
+SIGN_IN_PATTERN = re.compile(r"(login|signin|sign-in|sign_in|ServiceLogin|auth/)", re.IGNORECASE)
+
+# Fields whose URL must match a pattern, with the warning when it does not
+FIELD_PATTERNS = {
+    "FrontendPRLink": (PULL_REQUEST_PATTERN, "not a pull request URL"),
+    "BackendPRLink": (PULL_REQUEST_PATTERN, "not a pull request URL"),
+}
+
+
+class BlockedAddress(requests.RequestException):
+    """The link (or a redirect) points to a host that must not be reached"""
+
+
+class _BlockedPeer(Exception):
+    # Not an OSError, so urllib3 does not turn it into a retryable connection error
+    pass
+
+
+def _is_public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%")[0])
+    return ip.is_global and not ip.is_multicast
+
+
+class _CheckedPeer:
+    """Connection mixin refusing sockets connected to a non-public address"""
+
+    def _new_conn(self):
+        sock = super()._new_conn()
+        address = sock.getpeername()[0]
+        if not _is_public(address):
+            sock.close()
+            raise _BlockedPeer(f"{self.host} connected to non-public address {address}")
+        return sock
+
+
+class _CheckedHTTPConnection(_CheckedPeer, HTTPConnection):
+    pass
+
+
+class _CheckedHTTPSConnection(_CheckedPeer, HTTPSConnection):
+    pass
+
+
+class _CheckedHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _CheckedHTTPConnection
+
+
+class _CheckedHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _CheckedHTTPSConnection
+
+
+class PublicOnlyAdapter(HTTPAdapter):
+    """HTTPAdapter whose new connections must reach a public address"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _CheckedHTTPPool, "https": _CheckedHTTPSPool}
+
+
+def normalize_url(url: str) -> str:
+    """Cache key of a link: trimmed, without its fragment"""
+    return urldefrag(url.strip())[0]
+
+
+def _host(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class LinkChecker:
+    def __init__(self):
+        self.concurrency = max(1, int(os.getenv("LINK_CHECK_CONCURRENCY", 32)))
+        self.per_host = max(1, int(os.getenv("LINK_CHECK_PER_HOST", 8)))
+        self.timeout = float(os.getenv("LINK_CHECK_TIMEOUT", 5))
+        self.failure_ttl = float(os.getenv("LINK_CHECK_FAILURE_TTL", 60))
+        self.cache = TTLCache(
+            ttl=float(os.getenv("LINK_CHECK_CACHE_TTL", 3600)),
+            max_entries=int(os.getenv("LINK_CHECK_CACHE_MAX_ENTRIES", 20000))
+        )
+        self.user_agent = os.getenv("LINK_CHECK_USER_AGENT", "QSR-LinkChecker/1.0")
+
+        self.max_redirects = int(os.getenv("LINK_CHECK_MAX_REDIRECTS", 5))
+        # Only for local testing against link_stub.py
+        self.allow_private = os.getenv("LINK_CHECK_ALLOW_PRIVATE", "false").lower() == "true"
+
+        # One pool per host of at most `per_host` connections; callers wait for a free one
+        self.session = requests.Session()
+        # A proxy would be the peer of every connection
+        self.session.trust_env = False
+        adapter_class = HTTPAdapter if self.allow_private else PublicOnlyAdapter
+        adapter = adapter_class(pool_connections=64, pool_maxsize=self.per_host, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = self.user_agent
+
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Checks running now, shared by overlapping batches
+        self._in_flight: Dict[str, Future] = {}
+        self.checks = 0
+        self.coalesced = 0
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="link-check")
+            return self._pool
+
+    # Single link
+
+    def _check_host(self, url: str):
+        """Raise BlockedAddress unless every address of the URL's host is public"""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise BlockedAddress(f"Not an http(s) URL: {url}")
+        if self.allow_private:
+            return
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            addresses = socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)
+        except (socket.gaierror, ValueError) as e:
+            raise requests.ConnectionError(f"Cannot resolve {parts.hostname}: {e}")
+        if not all(_is_public(address[4][0]) for address in addresses):
+            raise BlockedAddress(f"{parts.hostname} resolves to a non-public address")
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send `method`, following redirects one checked hop at a time"""
+        for _ in range(self.max_redirects + 1):
+            self._check_host(url)
+            try:
+                response = self.session.request(method, url, timeout=self.timeout, allow_redirects=False, **kwargs)
+            except _BlockedPeer as e:
+                raise BlockedAddress(str(e))
+            location = self.session.get_redirect_target(response)
+            if location is None:
+                return response
+            response.close()
+            url = urljoin(response.url, location)
+        raise requests.TooManyRedirects(f"Exceeded {self.max_redirects} redirects")
+
+    def _request(self, url: str) -> requests.Response:
+        response = self._send("HEAD", url)
+        if response.status_code in HEAD_REJECTED:
+            response.close()
+            response = self._send("GET", url, stream=True)
+            response.close()
+        return response
+
+    def check_url(self, url: str) -> LinkCheckResult:
+        """Check one link now, bypassing the cache (the result is cached)"""
+        started = time.perf_counter()
+        result = LinkCheckResult(url=url, status=STATUS_OK, checkedAt=datetime.now(timezone.utc).isoformat())
+        if urlsplit(url).scheme not in ("http", "https") or not urlsplit(url).netloc:
+            result.status = STATUS_INVALID
+            result.message = "Not an http(s) URL"
+        else:
+            try:
+                response = self._request(url)
+                result.httpStatus = response.status_code
+                if response.url != url:
+                    result.finalUrl = response.url
+                if response.status_code < 400:
+                    result.status = STATUS_OK
+                elif response.status_code in (401, 403):
+                    result.status = STATUS_RESTRICTED
+                elif response.status_code in (404, 410):
+                    result.status = STATUS_BROKEN
+                else:
+                    result.status = STATUS_ERROR
+                    result.message = response.reason
+            except BlockedAddress as e:
+                result.status = STATUS_BLOCKED
+                result.message = str(e)
+            except requests.Timeout:
+                result.status = STATUS_TIMEOUT
+                result.message = f"No response within {self.timeout:g}s"
+            except (requests.exceptions.InvalidURL, requests.exceptions.MissingSchema,
+                    requests.exceptions.InvalidSchema) as e:
+                result.status = STATUS_INVALID
+                result.message = str(e)
+            except requests.ConnectionError as e:
+                result.status = STATUS_UNREACHABLE
+                result.message = type(e).__name__
+            except requests.RequestException as e:
+                result.status = STATUS_ERROR
+                result.message = str(e)
+        result.elapsedMs = round((time.perf_counter() - started) * 1000, 1)
+
+        with self._lock:
+            self.checks += 1
+        self.cache.set(normalize_url(url), result,
+                       ttl=self.failure_ttl if result.status in TRANSIENT_STATUSES else None)
+        return result
+
+    def _submit(self, url: str) -> Future:
+        """Start a check of `url`, or join one already running"""
+        pool = self._get_pool()
+        with self._lock:
+            future = self._in_flight.get(url)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = pool.submit(self.check_url, url)
+            self._in_flight[url] = future
+        future.add_done_callback(lambda _: self._forget(url, future))
+        return future
+
+    def _forget(self, url: str, future: Future):
+        with self._lock:
+            if self._in_flight.get(url) is future:
+                del self._in_flight[url]
+
+    # Batches
+
+    def check_urls(self, urls: Iterable[str], refresh: bool = False) -> Dict[str, LinkCheckResult]:
+        """
+        Results for every URL (keyed by normalized URL), from the cache unless
+        `refresh`, checking the rest concurrently within the per-host limit.
+        Raises DeadlineExceeded when the request deadline passes first; checks
+        still running finish in the background and are cached.
+        """
+        results: Dict[str, LinkCheckResult] = {}
+        by_host: Dict[str, Deque[str]] = {}
+        for url in dict.fromkeys(normalize_url(url) for url in urls if url and url.strip()):
+            cached = None if refresh else self.cache.get(url)
+            if cached is not None:
+                results[url] = cached.model_copy(update={"cached": True})
+            else:
+                by_host.setdefault(_host(url), deque()).append(url)
+
+        active: Dict[str, int] = dict.fromkeys(by_host, 0)
+        running: Dict[Future, Tuple[str, str]] = {}
+        while by_host or running:
+            # Round-robin over hosts so one busy host does not delay the others
+            for host in list(by_host):
+                queue = by_host[host]
+                while queue and active[host] < self.per_host and len(running) < self.concurrency:
+                    url = queue.popleft()
+                    running[self._submit(url)] = (url, host)
+                    active[host] += 1
+                if not queue:
+                    del by_host[host]
+            done, _ = wait(running, timeout=deadlines.bounded(None, "link checks"), return_when=FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("link checks")
+            for future in done:
+                url, host = running.pop(future)
+                active[host] -= 1
+                results[url] = future.result()
+        return results
+
+    def check_reports(self, reports: List[Tuple[Optional[str], QsrData]],
+                      refresh: bool = False) -> List[ReportLinkCheck]:
+        """Check the links of (item ID, QsrData) reports; shared links are checked once"""
+        links = [
+            [(field, getattr(data, field).strip()) for field in LINK_FIELDS if (getattr(data, field) or "").strip()]
+            for _, data in reports
+        ]
+        results = self.check_urls((url for report in links for _, url in report), refresh)
+
+        checked = []
+        for (item_id, _), report_links in zip(reports, links):
+            seen: Dict[str, str] = {}
+            entries = []
+            for field, url in report_links:
+                result = results[normalize_url(url)].model_copy(update={"field": field, "url": url})
+                result.warnings = self._warnings(field, url, result, seen)
+                entries.append(result)
+            checked.append(ReportLinkCheck(
+                itemId=item_id,
+                links=entries,
+                healthy=sum(entry.status in HEALTHY_STATUSES for entry in entries),
+                unhealthy=sum(entry.status not in HEALTHY_STATUSES for entry in entries),
+                warnings=sum(bool(entry.warnings) for entry in entries)
+            ))
+        return checked
+
+    @staticmethod
+    def _warnings(field: str, url: str, result: LinkCheckResult, seen: Dict[str, str]) -> Optional[List[str]]:
+        """Signs that a working link points to the wrong thing"""
+        warnings = []
+        expected = FIELD_PATTERNS.get(field)
+        if expected and not expected[0].search(urlsplit(url).path):
+            warnings.append(expected[1])
+        if result.finalUrl and SIGN_IN_PATTERN.search(urlsplit(result.finalUrl).path):
+            warnings.append("redirects to a sign-in page")
+        key = normalize_url(url)
+        if key in seen:
+            warnings.append(f"same URL as {seen[key]}")
+        else:
+            seen[key] = field
+        return warnings or None
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            checks, coalesced, in_flight = self.checks, self.coalesced, len(self._in_flight)
+        return {
+            "checks": checks,
+            "coalesced": coalesced,
+            "inFlight": in_flight,
+            "concurrency": self.concurrency,
+            "perHost": self.per_host,
+            "timeoutSeconds": self.timeout,
+            "failureTtlSeconds": self.failure_ttl,
+            "cache": self.cache.stats(),
+        }
+
+
+# Global link checker
+link_checker = LinkChecker()
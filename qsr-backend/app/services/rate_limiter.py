@@ -0,0 +1,146 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# Priority lanes, highest priority first
+LANE_INTERACTIVE = "interactive"
+LANE_SYNC = "sync"
+LANE_BATCH = "batch"
+LANES = (LANE_INTERACTIVE, LANE_SYNC, LANE_BATCH)
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a caller waited longer than its timeout for a token"""
+
+
+class _LaneStats:
+    def __init__(self):
+        self.granted = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+
+class TokenBucketLimiter:
+    """
+    Thread-safe token bucket shared by every caller in the process.
+
+    Waiting callers queue in priority lanes; a token is only handed to the
+    oldest waiter of the highest-priority non-empty lane, so interactive
+    traffic always overtakes queued batch or sync work.
+    """
+
+    def __init__(self, rate: float, burst: int, queue_timeout: Optional[float] = None):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.queue_timeout = queue_timeout
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+        self._queues: Dict[str, deque] = {lane: deque() for lane in LANES}
+        self._stats: Dict[str, _LaneStats] = {lane: _LaneStats() for lane in LANES}
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _refill(self, now: float):
+        if now < self._paused_until:
+            self._last_refill = now
+            return
+        elapsed = now - max(self._last_refill, self._paused_until)
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def _is_next(self, lane: str, ticket: object) -> bool:
+        for candidate in LANES:
+            if self._queues[candidate]:
+                return candidate == lane and self._queues[candidate][0] is ticket
+        return False
+
+    def acquire(self, lane: str = LANE_INTERACTIVE, timeout: Optional[float] = None) -> float:
+        """
+        Block until a token is available for `lane`. Returns the time spent
+        waiting in seconds; raises RateLimitTimeout if `timeout` (or the
+        limiter's default queue timeout) elapses first.
+        """
+        if lane not in self._queues:
+            raise ValueError(f"Unknown lane '{lane}'. Use one of: {', '.join(LANES)}")
+        if not self.enabled:
+            return 0.0
+
+        timeout = self.queue_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout if timeout is not None else None
+        ticket = object()
+
+        with self._condition:
+            queue = self._queues[lane]
+            queue.append(ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._is_next(lane, ticket) and self._tokens >= 1:
+                        self._tokens -= 1
+                        break
+
+                    if deadline is not None and now >= deadline:
+                        self._stats[lane].timeouts += 1
+                        raise RateLimitTimeout(
+                            f"Timed out after {timeout:.1f}s waiting for an upstream slot ({lane} lane)"
+                        )
+
+                    if self._is_next(lane, ticket):
+                        # Sleep until the next token is due
+                        wait = max(self._paused_until - now, (1 - self._tokens) / self.rate, 0.001)
+                    else:
+                        # Woken by notify_all whenever a waiter ahead of us leaves
+                        wait = 1.0
+                    if deadline is not None:
+                        wait = min(wait, deadline - now)
+                    self._condition.wait(wait)
+            finally:
+                queue.remove(ticket)
+                self._condition.notify_all()
+
+            waited = time.monotonic() - started
+            stats = self._stats[lane]
+            stats.granted += 1
+            stats.total_wait += waited
+            stats.max_wait = max(stats.max_wait, waited)
+        return waited
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for `seconds`, e.g. after an upstream 429"""
+        with self._condition:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+        logger.warning("Upstream rate limiter paused for %.1fs", seconds)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current queue depth and wait-time statistics per lane"""
+        with self._condition:
+            self._refill(time.monotonic())
+            lanes = {}
+            for lane in LANES:
+                stats = self._stats[lane]
+                lanes[lane] = {
+                    "queueDepth": len(self._queues[lane]),
+                    "granted": stats.granted,
+                    "timeouts": stats.timeouts,
+                    "avgWaitMs": round(stats.total_wait * 1000 / stats.granted, 2) if stats.granted else 0.0,
+                    "maxWaitMs": round(stats.max_wait * 1000, 2),
+                }
+            return {
+                "enabled": self.enabled,
+                "rate": self.rate,
+                "burst": self.burst,
+                "availableTokens": round(self._tokens, 2),
+                "lanes": lanes,
+            }
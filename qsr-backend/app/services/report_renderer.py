@@ -0,0 +1,287 @@
+"""
+Server-side rendering of the test summary report.
+
+render_html mirrors the frontend's generateReportHTML template; the SVG
+chart plots the pass rate of each test execution build. Both are pure
+functions of the report data and the summary date, so their output can be
+cached by content key.
+"""
+
+from datetime import date
+from html import escape
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+from app.models import QsrData
+
+SEVERITIES = ("Critical", "High", "Medium", "Low")
+
+# Only these link schemes are rendered as links; anything else (javascript:,
+# data:, ...) is shown as text
+LINK_SCHEMES = ("http", "https")
+
+_STYLE = """
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 100%; margin: 0; padding: 15px; word-wrap: break-word; overflow-wrap: break-word; }
+        h1 { color: #2c3e50; border-bottom: 2px solid #3498db; padding-bottom: 10px; word-wrap: break-word; font-size: 18px; }
+        h2 { color: #34495e; margin-top: 30px; word-wrap: break-word; font-size: 16px; }
+        h3 { color: #7f8c8d; word-wrap: break-word; font-size: 14px; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; table-layout: fixed; }
+        th, td { border: 1px solid #ddd; padding: 6px; text-align: left; word-wrap: break-word; overflow-wrap: break-word; font-size: 12px; }
+        th { background-color: #f2f2f2; font-weight: bold; }
+        .section { margin-bottom: 25px; }
+        .metadata { background-color: #f9f9f9; padding: 12px; border-radius: 5px; word-wrap: break-word; }
+        a { color: #3498db; text-decoration: none; word-wrap: break-word; overflow-wrap: break-word; }
+        a:hover { text-decoration: underline; }
+        p { word-wrap: break-word; overflow-wrap: break-word; margin: 10px 0; }
+"""
+
+
+def _text(value, default: str = "N/A") -> str:
+    return escape(str(value)) if value not in (None, "") else default
+
+
+def _link(url: Optional[str], default: str = "NA") -> str:
+    if not url:
+        return f'<a href="#">{default}</a>'
+    if urlsplit(url.strip()).scheme.lower() not in LINK_SCHEMES:
+        return escape(url)
+    return f'<a href="{escape(url)}">{escape(url)}</a>'
+
+
+def defect_summary(data: QsrData) -> Dict[str, Dict[str, int]]:
+    """Defect counts per severity, split into closed (Closed/Resolved) and open"""
+    summary = {severity: {"total": 0, "closed": 0, "open": 0} for severity in SEVERITIES}
+    for defect in data.DefectData or []:
+        counts = summary.get(defect.severity)
+        if counts is None:
+            continue
+        counts["total"] += 1
+        counts["closed" if defect.status in ("Closed", "Resolved") else "open"] += 1
+    return summary
+
+
+def format_summary_date(summary_date: Optional[str] = None) -> str:
+    day = date.fromisoformat(summary_date) if summary_date else date.today()
+    return f"{day.strftime('%B')} {day.day}, {day.year}"
+
+
+def render_html(data: QsrData, summary_date: Optional[str] = None) -> str:
+    feature = _text(data.FeatureName)
+    builds = data.TestExecutionData or []
+    defects = data.DefectData or []
+
+    build_rows = "".join(
+        f"""
+              <tr>
+                <td>Build {build.buildNumber} / Cycle {build.buildNumber}<br/>{_text(build.startDate, '')} - {_text(build.endDate, '')}</td>
+                <td>{build.totalDesigned or 0}</td>
+                <td>{build.totalExecuted or 0}</td>
+                <td>{build.totalPassed or 0}</td>
+                <td>{build.passPercentage or 0}%</td>
+                <td>{build.totalFailed or 0}</td>
+                <td>{build.failPercentage or 0}%</td>
+                <td>{build.defectsFound or 0}</td>
+              </tr>"""
+        for build in builds
+    ) or '<tr><td colspan="8">No test execution data available</td></tr>'
+
+    summary = defect_summary(data)
+    severity_rows = "".join(
+        f"""
+            <tr>
+              <td>{severity}</td>
+              <td>{summary[severity]['total'] or '-'}</td>
+              <td>{summary[severity]['closed'] or '-'}</td>
+              <td>{summary[severity]['open'] or '-'}</td>
+            </tr>"""
+        for severity in SEVERITIES
+    )
+
+    defect_rows = "".join(
+        f"""
+              <tr>
+                <td>{escape(defect.defectId)}</td>
+                <td>{escape(defect.status)}</td>
+                <td>{escape(defect.severity)}</td>
+              </tr>"""
+        for defect in defects
+    ) or '<tr><td colspan="3">No defects reported</td></tr>'
+
+    rtm = _link(data.RTMDocLink) if data.RTMDocLink else "NA (optional)"
+
+    return f"""<!DOCTYPE html>
+    <html>
+    <head>
+      <style>{_STYLE}      </style>
+    </head>
+    <body>
+      <h1>TEST SUMMARY REPORT</h1>
+
+      <div class="section">
+        <h2>1. Purpose</h2>
+        <p>The purpose of this Test Summary Report (TSR) is to demonstrate the establishment of the qualified state of the Apps system, summarize overall the activities as outlined in the associated Test Plan (TP) including result and conclusion of the testing &amp; validation activities performed for implementing/upgrading the Kissflow application.</p>
+      </div>
+
+      <div class="section">
+        <h2>2. Scope</h2>
+        <p>The scope of the <strong>{_text(data.TeamName)}</strong> squad release is limited to the items specified in the <strong>{feature}</strong> feature under description of change section.</p>
+      </div>
+
+      <div class="section">
+        <h2>3. Environmental Details</h2>
+        <p><strong>Pesagi Env:</strong> {_text(data.env)}<br/>
+        <strong>TST Env:</strong> {_text(data.env)}</p>
+      </div>
+
+      <div class="section">
+        <h2>4. System Risk Assessment Summary</h2>
+        <h3>AUDIT LOG</h3>
+        <table>
+          <tr><td><strong>Prepared By</strong></td><td>{_text(data.PreparedBy)}</td></tr>
+          <tr><td><strong>Tested By</strong></td><td>{_text(data.TestedBy)}</td></tr>
+          <tr><td><strong>Developed By</strong></td><td>{_text(data.DevelopedBy)}</td></tr>
+          <tr><td><strong>Designed By</strong></td><td>{_text(data.DesignedBy)}</td></tr>
+          <tr><td><strong>Reviewed By</strong></td><td>{_text(data.ReviewedBy)}</td></tr>
+        </table>
+      </div>
+
+      <div class="section">
+        <h2>Test Summary Report for {feature} feature</h2>
+
+        <h3>GENERAL INFORMATION</h3>
+        <div class="metadata">
+          <p><strong>Test Level:</strong> System Testing &nbsp;&nbsp;&nbsp;&nbsp; <strong>Summary Date:</strong> {format_summary_date(summary_date)}</p>
+          <p><strong>Application:</strong> Pesagi URL: {_text(data.URL)} &nbsp;&nbsp;&nbsp;&nbsp; <strong>Priority:</strong> High</p>
+          <p><strong>Frontend PR:</strong> {_link(data.FrontendPRLink, 'N/A')}</p>
+          <p><strong>Backend PR:</strong> {_link(data.BackendPRLink, 'N/A')}</p>
+          <p><strong>PBR Numbers:</strong> {_text(data.PRNumber)}</p>
+        </div>
+
+        <h3>FEATURE ARTIFACTS</h3>
+        <p>
+          <strong>Spec Document:</strong> {_link(data.SpecDocLink)}<br/>
+          <strong>Design Document:</strong> {_link(data.DesignLink)}<br/>
+          <strong>TDD Document:</strong> {_link(data.TDDLink)}
+        </p>
+
+        <h3>TEST DELIVERABLES &amp; REUSABLE ASSETS</h3>
+        <p>
+          <strong>Test Case Document:</strong> {_link(data.TestCaseDocLink)}<br/>
+          <strong>Test Case Execution Document:</strong> {_link(data.TestCaseExecutionLink)}<br/>
+          <strong>Evidence Document:</strong> {_link(data.EvidenceDocLink)}<br/>
+          <strong>RTM:</strong> {rtm}
+        </p>
+      </div>
+
+      <div class="section">
+        <h2>Test Execution Summary</h2>
+        <p>The table below summarizes the overall test results for the builds that were tested for <strong>{feature}</strong> feature during <strong>{_text(data.QuarterRelease)}</strong>.</p>
+
+        <table>
+          <thead>
+            <tr>
+              <th>Builds/Build Date</th>
+              <th>Total Designed Test Cases</th>
+              <th>Total Test Cases Executed</th>
+              <th>No. Of Test Cases Passed</th>
+              <th>% Of Passed Test Cases</th>
+              <th>No. Of Test Cases Failed</th>
+              <th>% Of Failed Test Cases</th>
+              <th>Defects Found</th>
+            </tr>
+          </thead>
+          <tbody>{build_rows}
+          </tbody>
+        </table>
+      </div>
+
+      <div class="section">
+        <h2>Defect Report</h2>
+        <table>
+          <thead>
+            <tr>
+              <th>Severity Level Of Defect</th>
+              <th>Total No. Of Defects Found In The Test Level</th>
+              <th>Total No. Of Defects Closed At The End Of The Test Level</th>
+              <th>Total No. Of Defects Open At The End Of The Test Level</th>
+            </tr>
+          </thead>
+          <tbody>{severity_rows}
+          </tbody>
+        </table>
+
+        <h3>Defect Summary</h3>
+        <table>
+          <thead>
+            <tr>
+              <th>Defect ID</th>
+              <th>Status</th>
+              <th>Severity Level of Defect</th>
+            </tr>
+          </thead>
+          <tbody>{defect_rows}
+          </tbody>
+        </table>
+      </div>
+
+      <div class="section">
+        <h2>Approvals</h2>
+        <table>
+          <thead>
+            <tr>
+              <th>TITLE</th>
+              <th>NAME</th>
+              <th>STATUS</th>
+              <th>DATE</th>
+            </tr>
+          </thead>
+          <tbody>
+            <tr><td>Test Lead</td><td></td><td></td><td></td></tr>
+            <tr><td>Test Manager</td><td></td><td></td><td></td></tr>
+            <tr><td>Technical Manager</td><td></td><td></td><td></td></tr>
+            <tr><td>Project Manager</td><td></td><td></td><td></td></tr>
+          </tbody>
+        </table>
+      </div>
+    </body>
+    </html>
+"""
+
+
+def render_pass_rate_svg(data: QsrData, width: int = 640, height: int = 320) -> str:
+    """Bar chart of the pass rate of each test execution build"""
+    builds = data.TestExecutionData or []
+    left, right, top, bottom = 48, 16, 36, 40
+    plot_width = width - left - right
+    plot_height = height - top - bottom
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="Arial, sans-serif" font-size="11">',
+        f'<rect width="{width}" height="{height}" fill="#ffffff"/>',
+        f'<text x="{width / 2}" y="20" text-anchor="middle" font-size="14" fill="#2c3e50">'
+        f'Pass rate by build - {_text(data.FeatureName)}</text>',
+    ]
+    for percent in range(0, 101, 25):
+        y = top + plot_height * (1 - percent / 100)
+        parts.append(f'<line x1="{left}" y1="{y:.1f}" x2="{width - right}" y2="{y:.1f}" stroke="#eeeeee"/>')
+        parts.append(f'<text x="{left - 6}" y="{y + 4:.1f}" text-anchor="end" fill="#7f8c8d">{percent}%</text>')
+
+    if not builds:
+        parts.append(f'<text x="{width / 2}" y="{top + plot_height / 2}" text-anchor="middle" '
+                     f'fill="#7f8c8d">No test execution data available</text>')
+    slot = plot_width / max(len(builds), 1)
+    bar_width = min(slot * 0.6, 64)
+    for index, build in enumerate(builds):
+        rate = max(0.0, min(100.0, build.passPercentage or 0.0))
+        bar_height = plot_height * rate / 100
+        x = left + slot * index + (slot - bar_width) / 2
+        y = top + plot_height - bar_height
+        center = x + bar_width / 2
+        parts.append(f'<rect x="{x:.1f}" y="{y:.1f}" width="{bar_width:.1f}" height="{bar_height:.1f}" fill="#3498db"/>')
+        parts.append(f'<text x="{center:.1f}" y="{y - 4:.1f}" text-anchor="middle" fill="#333333">{rate:g}%</text>')
+        parts.append(f'<text x="{center:.1f}" y="{height - bottom + 16}" text-anchor="middle" '
+                     f'fill="#333333">Build {build.buildNumber}</text>')
+
+    parts.append(f'<line x1="{left}" y1="{top + plot_height}" x2="{width - right}" y2="{top + plot_height}" stroke="#333333"/>')
+    parts.append("</svg>")
+    return "\n".join(parts)
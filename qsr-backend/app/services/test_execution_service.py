@@ -0,0 +1,390 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Iterable, Optional, Any
+from app.models import (
+    Feature, FeatureCycle, FeatureCyclesResponse, FeaturesResponse,
+    TestCase, TestRunSummary, TestStatistics, TestRunResponse,
+    BugSummary, BugsByPriority, BugsByStatus, BugDetail
+)
+
+logger = logging.getLogger(__name__)
+
+# Kissflow item IDs of the features known to the mock data set
+KISSFLOW_FEATURE_MAPPING = {
+    "KFF-0111": "67309a1b2c3d4e5f60718293",  # Flow Lock
+    "KFF-0219": "67309a1b2c3d4e5f60718294",  # FM Logistics
+    "KFF-0001": "67309a1b2c3d4e5f60718295",  # User Dashboard
+    "KFF-0123": "67309a1b2c3d4e5f60718296",  # API Authentication
+}
+
+DEFAULT_FEATURE_ID = "67309a1b2c3d4e5f60718293"
+
+# Accepted spellings of a test case status, keyed by their normalized form
+STATUS_BUCKETS = {
+    "passed": "passed",
+    "pass": "passed",
+    "failed": "failed",
+    "fail": "failed",
+    "skipped": "skipped",
+    "skip": "skipped",
+    "blocked": "skipped",
+    "outofscope": "outOfScope",
+    "na": "outOfScope",
+    "notapplicable": "outOfScope",
+}
+
+
+def status_bucket(status: str) -> str:
+    """Map a raw test case status to its statistics bucket ('notExecuted' if unknown)"""
+    key = status.strip().lower().replace(" ", "").replace("_", "").replace("-", "").replace("/", "")
+    return STATUS_BUCKETS.get(key, "notExecuted")
+
+
+class _RunState:
+    """
+    Per-run state. Statistics are maintained incrementally as test cases are
+    recorded so reads never have to rescan the stored results.
+    """
+
+    def __init__(self, run_id: str, feature_id: str, cycle: int, name: str,
+                 start_date: Optional[str] = None, end_date: Optional[str] = None):
+        self.run_id = run_id
+        self.feature_id = feature_id
+        self.cycle = cycle
+        self.name = name
+        self.start_date = start_date
+        self.end_date = end_date
+        self.created_at = datetime.utcnow().isoformat() + "Z"
+        self.updated_at = self.created_at
+        self.counts = Counter()
+        self.bug_refs = Counter()
+        self.base_bugs_found = 0
+        self.bugs_fixed = 0
+        self.test_cases: Dict[str, TestCase] = {}
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def executed(self) -> int:
+        return self.counts["passed"] + self.counts["failed"]
+
+    @property
+    def pass_rate(self) -> float:
+        executed = self.executed
+        return round(self.counts["passed"] * 100.0 / executed, 2) if executed else 0.0
+
+    @property
+    def bugs_found(self) -> int:
+        return self.base_bugs_found + len(self.bug_refs)
+
+    def record(self, test_case: TestCase):
+        """Insert or replace a test case, adjusting the aggregates in place"""
+        previous = self.test_cases.get(test_case.id)
+        if previous is not None:
+            self.counts[status_bucket(previous.status)] -= 1
+            if previous.bugId:
+                self.bug_refs[previous.bugId] -= 1
+                if self.bug_refs[previous.bugId] <= 0:
+                    del self.bug_refs[previous.bugId]
+
+        self.test_cases[test_case.id] = test_case
+        self.counts[status_bucket(test_case.status)] += 1
+        if test_case.bugId:
+            self.bug_refs[test_case.bugId] += 1
+
+        executed_at = test_case.executedAt
+        if executed_at:
+            if not self.start_date or executed_at < self.start_date:
+                self.start_date = executed_at
+            if not self.end_date or executed_at > self.end_date:
+                self.end_date = executed_at
+
+    def to_statistics(self) -> TestStatistics:
+        return TestStatistics(
+            totalTests=self.total,
+            executed=self.executed,
+            passed=self.counts["passed"],
+            failed=self.counts["failed"],
+            skipped=self.counts["skipped"],
+            outOfScope=self.counts["outOfScope"],
+            passRate=self.pass_rate
+        )
+
+    def to_feature_cycle(self) -> FeatureCycle:
+        start_date = self.start_date or self.created_at
+        end_date = self.end_date or start_date
+        return FeatureCycle(
+            cycle=self.cycle,
+            runId=self.run_id,
+            runName=self.name,
+            date=end_date,
+            startDate=start_date,
+            endDate=end_date,
+            passRate=self.pass_rate,
+            totalTests=self.total,
+            passed=self.counts["passed"],
+            failed=self.counts["failed"],
+            bugsFound=self.bugs_found,
+            bugsFixed=self.bugs_fixed,
+            totalDefects=self.bugs_found
+        )
+
+
+class TestExecutionService:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.features: Dict[str, Feature] = {}
+        self.runs: Dict[str, _RunState] = {}
+        self._runs_by_feature: Dict[str, Dict[int, _RunState]] = defaultdict(dict)
+        self.kissflow_mapping: Dict[str, str] = dict(KISSFLOW_FEATURE_MAPPING)
+        self.feature_items: Dict[str, str] = {v: k for k, v in KISSFLOW_FEATURE_MAPPING.items()}
+        self._seed_mock_data()
+
+    def _seed_mock_data(self):
+        """Seed the features and cycle aggregates used by the mock QSR data"""
+        seeds = {
+            "67309a1b2c3d4e5f60718293": (
+                "Flow Lock - Concurrent edit prevention",
+                [
+                    (1, "2025-11-01", "2025-11-03", 45, 35, 7, 7, 5),
+                    (2, "2025-11-05", "2025-11-07", 45, 40, 5, 5, 4),
+                    (3, "2025-11-08", "2025-11-10", 45, 43, 2, 2, 1),
+                ],
+            ),
+            "67309a1b2c3d4e5f60718294": (
+                "FM Logistics - Notification System",
+                [
+                    (1, "2025-10-06", "2025-10-08", 60, 48, 10, 4, 3),
+                    (2, "2025-10-10", "2025-10-13", 60, 54, 5, 3, 2),
+                    (3, "2025-10-15", "2025-10-17", 60, 58, 2, 1, 0),
+                ],
+            ),
+            "67309a1b2c3d4e5f60718295": (
+                "User Dashboard - Widget System",
+                [
+                    (1, "2025-09-15", "2025-09-17", 30, 26, 4, 2, 2),
+                    (2, "2025-09-19", "2025-09-22", 30, 29, 1, 1, 0),
+                ],
+            ),
+            "67309a1b2c3d4e5f60718296": (
+                "API Authentication Module",
+                [
+                    (1, "2025-08-04", "2025-08-06", 52, 44, 6, 3, 3),
+                    (2, "2025-08-08", "2025-08-11", 52, 49, 3, 1, 1),
+                    (3, "2025-08-13", "2025-08-15", 52, 51, 1, 1, 0),
+                ],
+            ),
+        }
+
+        for feature_id, (name, cycles) in seeds.items():
+            created_at = cycles[0][1] + "T00:00:00Z"
+            feature = Feature(
+                id=feature_id,
+                name=name,
+                description=name,
+                totalCycles=0,
+                totalTestCases=0,
+                createdAt=created_at,
+                updatedAt=created_at
+            )
+            self.load_feature(feature, [
+                FeatureCycle(
+                    cycle=cycle,
+                    runId=self.run_id_for(feature_id, cycle),
+                    runName=f"Cycle {cycle}",
+                    date=end + "T00:00:00Z",
+                    startDate=start + "T00:00:00Z",
+                    endDate=end + "T00:00:00Z",
+                    passRate=round(passed * 100.0 / (passed + failed), 2),
+                    totalTests=total,
+                    passed=passed,
+                    failed=failed,
+                    bugsFound=bugs_found,
+                    bugsFixed=bugs_fixed,
+                    totalDefects=bugs_found
+                )
+                for cycle, start, end, total, passed, failed, bugs_found, bugs_fixed in cycles
+            ])
+
+    def load_feature(self, feature: Feature, cycles: Iterable[FeatureCycle],
+                     kissflow_item_id: Optional[str] = None):
+        """
+        Register a feature together with pre-aggregated cycles (no individual
+        test cases), e.g. from seed or synthetic data.
+        """
+        with self._lock:
+            self.features[feature.id] = feature
+            if kissflow_item_id:
+                self.kissflow_mapping[kissflow_item_id] = feature.id
+                self.feature_items[feature.id] = kissflow_item_id
+            for cycle in cycles:
+                run = self._get_or_create_run(feature.id, cycle.cycle)
+                run.name = cycle.runName
+                run.start_date = cycle.startDate
+                run.end_date = cycle.endDate
+                run.counts["passed"] = cycle.passed
+                run.counts["failed"] = cycle.failed
+                run.counts["notExecuted"] = cycle.totalTests - cycle.passed - cycle.failed
+                run.base_bugs_found = cycle.bugsFound
+                run.bugs_fixed = cycle.bugsFixed
+
+    @staticmethod
+    def run_id_for(feature_id: str, cycle: int) -> str:
+        return f"run-{feature_id}-{cycle}"
+
+    def _get_or_create_run(self, feature_id: str, cycle: int) -> _RunState:
+        run_id = self.run_id_for(feature_id, cycle)
+        run = self.runs.get(run_id)
+        if run is None:
+            run = _RunState(run_id, feature_id, cycle, f"Cycle {cycle}")
+            self.runs[run_id] = run
+            self._runs_by_feature[feature_id][cycle] = run
+        return run
+
+    def _feature_runs(self, feature_id: str) -> List[_RunState]:
+        runs = self._runs_by_feature.get(feature_id, {})
+        return [runs[cycle] for cycle in sorted(runs)]
+
+    def _require_feature(self, feature_id: str) -> Feature:
+        feature = self.features.get(feature_id)
+        if feature is None:
+            raise KeyError(f"Feature not found: {feature_id}")
+        return feature
+
+    def get_features(self) -> FeaturesResponse:
+        """List all features with their cycle and test case totals"""
+        features = [self.get_feature(feature_id) for feature_id in self.features]
+        return FeaturesResponse(
+            features=features,
+            total=len(features),
+            metadata={"generatedAt": datetime.utcnow().isoformat() + "Z"}
+        )
+
+    def get_feature(self, feature_id: str) -> Feature:
+        feature = self._require_feature(feature_id)
+        runs = self._feature_runs(feature_id)
+        return feature.model_copy(update={
+            "totalCycles": len(runs),
+            "totalTestCases": max((run.total for run in runs), default=0)
+        })
+
+    def get_feature_by_kissflow_id(self, kissflow_item_id: str) -> Feature:
+        """Map Kissflow Item ID to a feature"""
+        feature_id = self.kissflow_mapping.get(kissflow_item_id, DEFAULT_FEATURE_ID)
+        return self.get_feature(feature_id)
+
+    def get_feature_cycles(self, feature_id: str) -> FeatureCyclesResponse:
+        """Get per-cycle aggregates for a feature, ordered by cycle number"""
+        feature = self.get_feature(feature_id)
+        with self._lock:
+            cycles = [run.to_feature_cycle() for run in self._feature_runs(feature_id)]
+        return FeatureCyclesResponse(
+            feature={"id": feature.id, "name": feature.name},
+            cycles=cycles
+        )
+
+    def get_test_run(self, run_id: str) -> TestRunResponse:
+        """Get a test run with its statistics, bug summary and test cases"""
+        from app.services.defect_service import defect_service
+
+        run = self.runs.get(run_id)
+        if run is None:
+            raise KeyError(f"Test run not found: {run_id}")
+        feature = self.get_feature(run.feature_id)
+
+        with self._lock:
+            statistics = run.to_statistics()
+            test_cases = list(run.test_cases.values())
+            start_date = run.start_date or run.created_at
+            end_date = run.end_date or start_date
+
+        defects = defect_service.get_defects_by_cycle(run.feature_id, run.cycle)
+        severity_keys = {"Critical": "critical", "High": "high", "Medium": "medium", "Low": "low"}
+        by_priority = Counter(severity_keys.get(d.severity, "low") for d in defects)
+        fixed = sum(1 for d in defects if d.status in ("Closed", "Resolved"))
+        in_progress = sum(1 for d in defects if d.status == "In Progress")
+
+        return TestRunResponse(
+            run=TestRunSummary(
+                id=run.run_id,
+                name=run.name,
+                description=f"{feature.name} - {run.name}",
+                status="Completed" if statistics.executed else "Not Started",
+                cycle=run.cycle,
+                startDate=start_date,
+                endDate=end_date,
+                createdBy="system",
+                assignedTo="QA",
+                createdAt=run.created_at,
+                completedAt=end_date if statistics.executed else None,
+                updatedAt=run.updated_at
+            ),
+            feature={"id": feature.id, "name": feature.name},
+            statistics=statistics,
+            bugs=BugSummary(
+                total=len(defects),
+                fixed=fixed,
+                notFixed=len(defects) - fixed,
+                byPriority=BugsByPriority(
+                    critical=by_priority["critical"],
+                    high=by_priority["high"],
+                    medium=by_priority["medium"],
+                    low=by_priority["low"]
+                ),
+                byStatus=BugsByStatus(
+                    open=len(defects) - fixed - in_progress,
+                    in_progress=in_progress,
+                    fixed=fixed
+                )
+            ),
+            bugDetails=[
+                BugDetail(
+                    id=d.defectId,
+                    bugId=d.defectId,
+                    title=d.title or "",
+                    priority=d.priority or "",
+                    status=d.status,
+                    createdAt=d.createdAt or ""
+                )
+                for d in defects
+            ],
+            testCases=test_cases,
+            metadata={"generatedAt": datetime.utcnow().isoformat() + "Z"}
+        )
+
+    def record_test_cases(self, feature_id: str, cycle: int, test_cases: Iterable[TestCase]) -> int:
+        """
+        Write a batch of test case results into a feature cycle, creating the
+        run if needed. FeatureCycle and TestStatistics aggregates are updated
+        as part of the same write.
+        """
+        self._require_feature(feature_id)
+        written = 0
+        with self._lock:
+            run = self._get_or_create_run(feature_id, cycle)
+            for test_case in test_cases:
+                run.record(test_case)
+                written += 1
+            run.updated_at = datetime.utcnow().isoformat() + "Z"
+
+        # Keep quarter-over-quarter trend aggregates in step with the new results
+        item_id = self.feature_items.get(feature_id)
+        if item_id:
+            from app.services.trends_service import trends_service
+            trends_service.record_test_cycles(item_id, self.get_feature_cycles(feature_id).cycles)
+        return written
+
+    def get_run_statistics(self, feature_id: str, cycle: int) -> Optional[Dict[str, Any]]:
+        run = self.runs.get(self.run_id_for(feature_id, cycle))
+        if run is None:
+            return None
+        with self._lock:
+            return run.to_statistics().model_dump()
+
+
+# Global service instance
+test_execution_service = TestExecutionService()
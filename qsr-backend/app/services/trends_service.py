@@ -0,0 +1,298 @@
+import json
+import logging
+import os
+import re
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from app.models import QsrData, FeatureCycle, TrendPoint
+
+logger = logging.getLogger(__name__)
+
+SEVERITIES = ("Critical", "High", "Medium", "Low")
+
+# Additive counters kept per item and summed per (team, quarter)
+_COUNTERS = (
+    "features", "builds", "passRateSum", "passRateCount",
+    "openDefects", "resolvedDefects", "resolveHoursSum",
+) + tuple(f"defects{severity}" for severity in SEVERITIES)
+
+_QUARTER_PATTERN = re.compile(r"Q([1-4])\s*(\d{4})", re.IGNORECASE)
+
+
+def quarter_sort_key(quarter: str) -> Tuple[int, int, str]:
+    """Order 'Q3 2025' style quarters chronologically; unknown formats sort last"""
+    match = _QUARTER_PATTERN.search(quarter or "")
+    if not match:
+        return (9999, 9, quarter or "")
+    return (int(match.group(2)), int(match.group(1)), quarter)
+
+
+def _parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+class TrendsService:
+    """
+    Materialized per-team, per-quarter quality aggregates.
+
+    Every item contributes one set of additive counters to its (team, quarter)
+    bucket. When a newer report or test cycle for an item lands, its previous
+    contribution is subtracted and the new one added, so aggregates stay
+    current without rescanning stored reports. State is persisted together
+    with the last archive snapshot applied, and only newer snapshots are
+    replayed on startup.
+
+    Writes only mark the state dirty. It is saved at most once per
+    QSR_TRENDS_FLUSH_SECONDS by a background timer, and by flush() at the end
+    of an ingestion run and on shutdown, so per-batch updates on the ingest
+    path do not rewrite the whole file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("QSR_TRENDS_PATH", "data/qsr_trends.json")
+        self._lock = threading.Lock()
+        self._contributions: Dict[str, Dict[str, Any]] = {}
+        self._aggregates: Dict[Tuple[str, str], Dict[str, float]] = defaultdict(lambda: dict.fromkeys(_COUNTERS, 0))
+        self._last_snapshot_id = -1
+        self._loaded = False
+        # Debounced persistence: changes since the last save, and the timer that saves them
+        self.flush_delay = float(os.getenv("QSR_TRENDS_FLUSH_SECONDS", 2))
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._save_lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    state = json.load(f)
+                self._last_snapshot_id = state.get("lastSnapshotId", -1)
+                for item_id, contribution in state.get("items", {}).items():
+                    self._apply(item_id, contribution)
+            except (OSError, ValueError) as e:
+                logger.warning("Could not load trend aggregates from %s, rebuilding: %s", self.path, e)
+                self._contributions.clear()
+                self._aggregates.clear()
+                self._last_snapshot_id = -1
+
+        # Catch up on reports archived since the state was last saved
+        from app.services.archive_service import archive_service
+        replayed = 0
+        for info in archive_service.list_snapshots():
+            if info.snapshotId > self._last_snapshot_id:
+                self._apply(info.itemId, self._report_contribution(archive_service.get_snapshot(info.snapshotId)))
+                self._last_snapshot_id = info.snapshotId
+                replayed += 1
+        if replayed:
+            logger.info("Replayed %d archived reports into trend aggregates", replayed)
+            self._dirty = True
+
+    def load(self):
+        """
+        Load the saved state and replay newly archived reports now rather than
+        on first use (called at startup; the replay can take a while)
+        """
+        with self._lock:
+            self._ensure_loaded()
+
+    def _schedule_flush(self):
+        """Save pending changes after flush_delay (called without the lock held)"""
+        if self.flush_delay <= 0:
+            self.flush()
+            return
+        with self._lock:
+            if not self._dirty or self._flush_timer is not None:
+                return
+            self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Save the state now if it changed since the last save"""
+        with self._save_lock:
+            with self._lock:
+                if self._flush_timer is not None:
+                    self._flush_timer.cancel()
+                    self._flush_timer = None
+                if not self._dirty:
+                    return
+                # Serialize under the lock, write outside it
+                state = json.dumps({"lastSnapshotId": self._last_snapshot_id, "items": self._contributions})
+                self._dirty = False
+            try:
+                self._save(state)
+            except OSError as e:
+                logger.error("Could not save trend aggregates to %s: %s", self.path, e)
+                with self._lock:
+                    self._dirty = True
+
+    def _save(self, state: str):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(state)
+        os.replace(tmp_path, self.path)
+
+    def _retract(self, item_id: str) -> bool:
+        """Take an item's contribution out of the aggregates; False if it had none"""
+        previous = self._contributions.pop(item_id, None)
+        if previous is None:
+            return False
+        bucket = self._aggregates[(previous["team"], previous["quarter"])]
+        for counter in _COUNTERS:
+            bucket[counter] -= previous["counters"][counter]
+        if bucket["features"] <= 0:
+            del self._aggregates[(previous["team"], previous["quarter"])]
+        return True
+
+    def _apply(self, item_id: str, contribution: Dict[str, Any]):
+        """Swap an item's previous contribution for a new one"""
+        self._retract(item_id)
+        bucket = self._aggregates[(contribution["team"], contribution["quarter"])]
+        for counter in _COUNTERS:
+            bucket[counter] += contribution["counters"][counter]
+        self._contributions[item_id] = contribution
+
+    @staticmethod
+    def _build_counters(counters: Dict[str, float], builds: int, final_pass_rate: Optional[float]):
+        counters["builds"] = builds
+        counters["passRateSum"] = final_pass_rate if final_pass_rate is not None else 0
+        counters["passRateCount"] = 1 if final_pass_rate is not None else 0
+
+    def _report_contribution(self, data: QsrData) -> Dict[str, Any]:
+        counters = dict.fromkeys(_COUNTERS, 0)
+        counters["features"] = 1
+
+        builds = sorted(data.TestExecutionData or [], key=lambda build: build.buildNumber)
+        final_pass_rate = builds[-1].passPercentage if builds else None
+        self._build_counters(counters, len(builds), final_pass_rate)
+
+        for defect in data.DefectData or []:
+            if defect.severity in SEVERITIES:
+                counters[f"defects{defect.severity}"] += 1
+            if defect.status in ("Closed", "Resolved"):
+                created_at = _parse_timestamp(defect.createdAt)
+                resolved_at = _parse_timestamp(defect.resolvedAt)
+                if created_at and resolved_at:
+                    counters["resolvedDefects"] += 1
+                    counters["resolveHoursSum"] += (resolved_at - created_at).total_seconds() / 3600
+            else:
+                counters["openDefects"] += 1
+
+        return {
+            "team": data.TeamName or "Unknown",
+            "quarter": data.QuarterRelease or "Unknown",
+            "counters": counters,
+        }
+
+    def record_report(self, item_id: str, data: QsrData, snapshot_id: Optional[int] = None):
+        """Fold a newly stored report into the aggregates"""
+        contribution = self._report_contribution(data)
+        with self._lock:
+            self._ensure_loaded()
+            if snapshot_id is not None:
+                if snapshot_id <= self._last_snapshot_id:
+                    return
+                self._last_snapshot_id = snapshot_id
+            self._apply(item_id, contribution)
+            self._dirty = True
+        self._schedule_flush()
+
+    def record_test_cycles(self, item_id: str, cycles: List[FeatureCycle]):
+        """
+        Refresh the build metrics of an item that already has a report, e.g.
+        after new test results were ingested into one of its cycles.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            previous = self._contributions.get(item_id)
+            if previous is None:
+                return
+            counters = dict(previous["counters"])
+            ordered = sorted(cycles, key=lambda cycle: cycle.cycle)
+            self._build_counters(counters, len(ordered), round(ordered[-1].passRate, 2) if ordered else None)
+            self._apply(item_id, {**previous, "counters": counters})
+            self._dirty = True
+        self._schedule_flush()
+
+    def tracks(self, item_id: str) -> bool:
+        """Whether the item contributes to the aggregates"""
+        with self._lock:
+            self._ensure_loaded()
+            return item_id in self._contributions
+
+    def record_item_fields(self, item_id: str, team: Optional[str], quarter: Optional[str]) -> bool:
+        """
+        Move an item's contribution to another (team, quarter) bucket after
+        the item was edited in Kissflow. Returns True if it moved.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            previous = self._contributions.get(item_id)
+            if previous is None:
+                return False
+            team, quarter = team or "Unknown", quarter or "Unknown"
+            if (previous["team"], previous["quarter"]) == (team, quarter):
+                return False
+            self._apply(item_id, {**previous, "team": team, "quarter": quarter})
+            self._dirty = True
+        self._schedule_flush()
+        logger.info("Moved item %s to team %s, quarter %s in trend aggregates", item_id, team, quarter)
+        return True
+
+    def remove_item(self, item_id: str) -> bool:
+        """
+        Drop an item's contribution, e.g. after it was deleted in Kissflow.
+        Returns True if it had one. Its archived reports stay in the archive.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            if not self._retract(item_id):
+                return False
+            self._dirty = True
+        self._schedule_flush()
+        logger.info("Removed item %s from trend aggregates", item_id)
+        return True
+
+    def get_trends(self, team: Optional[str] = None, quarter: Optional[str] = None) -> List[TrendPoint]:
+        """Read the materialized aggregates, ordered by team then quarter"""
+        with self._lock:
+            self._ensure_loaded()
+            buckets = [
+                (key, dict(counters)) for key, counters in self._aggregates.items()
+                if (team is None or key[0] == team) and (quarter is None or key[1] == quarter)
+            ]
+
+        buckets.sort(key=lambda entry: (entry[0][0], quarter_sort_key(entry[0][1])))
+        return [
+            TrendPoint(
+                teamName=team_name,
+                quarter=quarter_name,
+                features=int(counters["features"]),
+                builds=int(counters["builds"]),
+                finalPassRate=round(counters["passRateSum"] / counters["passRateCount"], 2)
+                if counters["passRateCount"] else None,
+                defectsBySeverity={severity: int(counters[f"defects{severity}"]) for severity in SEVERITIES},
+                openDefects=int(counters["openDefects"]),
+                avgTimeToResolveHours=round(counters["resolveHoursSum"] / counters["resolvedDefects"], 1)
+                if counters["resolvedDefects"] else None
+            )
+            for (team_name, quarter_name), counters in buckets
+        ]
+
+
+# Global service instance
+trends_service = TrendsService()
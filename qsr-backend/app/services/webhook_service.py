@@ -0,0 +1,347 @@
+"""
+Push-based invalidation of Kissflow items.
+
+Kissflow posts an event to the webhook receiver whenever an item changes.
+Each event is verified with an HMAC-SHA256 signature over its timestamp and
+raw body, using the tenant's webhook secret, and events older than
+KISSFLOW_WEBHOOK_TOLERANCE are rejected as replays.
+
+A verified event drops the item from the tenant's item cache right away, so
+no stale copy is served. The follow-up work is debounced: events for one
+item are coalesced until it has been quiet for KISSFLOW_WEBHOOK_DEBOUNCE_MS
+(or KISSFLOW_WEBHOOK_MAX_DELAY_MS after its first event, so a steady stream
+of edits still lands). A background thread then refreshes the item once:
+
+- from the event payload itself when it carries every mapped field, at no
+  upstream cost;
+- otherwise through the batch rate-limit lane, but only if something holds
+  derived state of it (it was cached, is in the warm set or contributes to
+  trend aggregates); other items are simply left out of the cache.
+
+The refreshed team and quarter move the item's trend contribution when they
+changed, and a deleted item's contribution is dropped. Trends are not
+tenant-scoped, so only default-tenant events touch them, as with the cache
+warmer.
+
+Changes are only ever processed by that one thread, so two refreshes of
+an item never run at once; flush() just makes every waiting change due and
+waits for the thread. A refresh is stored only if no newer event for the
+item arrived while it ran. Otherwise the refresh is dropped and the newer
+event's own refresh replaces it, so an old copy cannot overwrite a newer
+invalidation.
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from app import deadlines
+from app.models import WebhookStatus
+from app.services.rate_limiter import LANE_BATCH
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_HEADER = "X-Kissflow-Signature"
+TIMESTAMP_HEADER = "X-Kissflow-Timestamp"
+SIGNATURE_PREFIX = "sha256="
+
+EVENT_CREATED = "item.created"
+EVENT_UPDATED = "item.updated"
+EVENT_DELETED = "item.deleted"
+EVENTS = (EVENT_CREATED, EVENT_UPDATED, EVENT_DELETED)
+
+
+class WebhookRejected(Exception):
+    """The event is not authentic: bad or missing signature, or too old"""
+
+
+class WebhookBacklogFull(Exception):
+    """Too many items wait for processing; the sender should retry later"""
+
+
+def sign(secret: str, timestamp: str, body: bytes) -> str:
+    """Signature header value of a webhook body sent at `timestamp` (Unix seconds)"""
+    digest = hmac.new(secret.encode("utf-8"), timestamp.encode("ascii") + b"." + body, hashlib.sha256)
+    return SIGNATURE_PREFIX + digest.hexdigest()
+
+
+def parse_event(body: bytes) -> Tuple[str, str, Optional[Dict[str, Any]]]:
+    """
+    (event, item ID, item fields if sent) of a webhook body. Accepts an
+    envelope {"event", "item_id", "data"} or the bare item, as Kissflow
+    sends it, which counts as an update. Raises ValueError if malformed.
+    """
+    payload = json.loads(body)
+    if not isinstance(payload, dict):
+        raise ValueError("Event must be a JSON object")
+    item = payload.get("data") if isinstance(payload.get("data"), dict) else None
+    if item is None and "event" not in payload and "item_id" not in payload:
+        item = payload
+    event = payload.get("event") or EVENT_UPDATED
+    if event not in EVENTS:
+        raise ValueError(f"Unsupported event: {event}. Supported: {', '.join(EVENTS)}")
+    item_id = payload.get("item_id") or (item or {}).get("_id")
+    if not item_id or not isinstance(item_id, str):
+        raise ValueError("Event names no item")
+    return event, item_id, item
+
+
+class _PendingChange:
+    """Coalesced events of one item waiting for its debounce window"""
+
+    __slots__ = ("service", "item_id", "first_at", "last_at", "events", "deleted", "item", "was_cached")
+
+    def __init__(self, service, item_id: str, now: float, was_cached: bool):
+        self.service = service
+        self.item_id = item_id
+        self.first_at = now
+        self.last_at = now
+        self.events = 0
+        self.deleted = False
+        self.item: Optional[Dict[str, Any]] = None
+        self.was_cached = was_cached
+
+    def add(self, event: str, item: Optional[Dict[str, Any]], now: float):
+        # The latest event wins: an update after a delete revives the item,
+        # and one without fields makes an earlier payload stale
+        self.events += 1
+        self.last_at = now
+        self.deleted = event == EVENT_DELETED
+        self.item = item
+
+
+class WebhookProcessor:
+    def __init__(self):
+        self.debounce = float(os.getenv("KISSFLOW_WEBHOOK_DEBOUNCE_MS", 2000)) / 1000
+        self.max_delay = max(self.debounce, float(os.getenv("KISSFLOW_WEBHOOK_MAX_DELAY_MS", 10000)) / 1000)
+        self.tolerance = float(os.getenv("KISSFLOW_WEBHOOK_TOLERANCE", 300))
+        self.max_pending = int(os.getenv("KISSFLOW_WEBHOOK_MAX_PENDING", 10000))
+
+        self._changed = threading.Condition()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # (tenant ID, item ID) -> its coalesced events
+        self._pending: Dict[Tuple[str, str], _PendingChange] = {}
+        # Keys of the batch the processing thread is working on
+        self._in_progress: Set[Tuple[str, str]] = set()
+        # Changes first seen up to this time are due regardless of debounce (flush)
+        self._flush_before = float("-inf")
+        self.received = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.processed = 0
+        self.applied = 0
+        self.refreshed = 0
+        self.invalidated = 0
+        self.failed = 0
+        self.trends_moved = 0
+        self.trends_removed = 0
+        self.superseded = 0
+        self.last_processed_at: Optional[str] = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._loop, name="kissflow-webhooks", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopping.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    # Receiving
+
+    def verify(self, secret: str, timestamp: Optional[str], signature: Optional[str], body: bytes):
+        """Raise WebhookRejected unless the body was signed with `secret` recently"""
+        try:
+            if not timestamp or not signature:
+                raise WebhookRejected(f"Missing {SIGNATURE_HEADER} or {TIMESTAMP_HEADER} header")
+            try:
+                sent_at = float(timestamp)
+            except ValueError:
+                raise WebhookRejected(f"Invalid {TIMESTAMP_HEADER} header")
+            if abs(time.time() - sent_at) > self.tolerance:
+                raise WebhookRejected(f"Event timestamp is more than {self.tolerance:g}s away from now")
+            if not hmac.compare_digest(sign(secret, timestamp, body), signature.strip()):
+                raise WebhookRejected("Signature does not match")
+        except WebhookRejected:
+            with self._changed:
+                self.rejected += 1
+            raise
+
+    def submit(self, service, event: str, item_id: str, item: Optional[Dict[str, Any]] = None) -> Tuple[bool, int]:
+        """
+        Invalidate the item now and schedule its refresh. Returns whether it
+        joined changes already waiting, and how many items are waiting.
+        """
+        now = time.monotonic()
+        with self._changed:
+            # Drop the cached copy first so no reader gets the stale one. Under
+            # the lock, so a refresh finishing now sees this change pending.
+            was_cached = service.item_cache.invalidate(item_id)
+            key = (service.tenant_id, item_id)
+            change = self._pending.get(key)
+            coalesced = change is not None
+            if change is None:
+                if len(self._pending) >= self.max_pending:
+                    raise WebhookBacklogFull(f"{len(self._pending)} items are waiting to be refreshed")
+                change = self._pending[key] = _PendingChange(service, item_id, now, was_cached)
+            else:
+                change.was_cached = change.was_cached or was_cached
+                self.coalesced += 1
+            change.add(event, item, now)
+            self.received += 1
+            pending = len(self._pending)
+            self._changed.notify_all()
+        self.start()
+        return coalesced, pending
+
+    # Processing
+
+    def _due_at(self, change: _PendingChange) -> float:
+        if change.first_at <= self._flush_before:
+            return change.first_at
+        return min(change.last_at + self.debounce, change.first_at + self.max_delay)
+
+    def _take_due(self, now: float) -> Tuple[List[_PendingChange], Optional[float]]:
+        """Pop the changes whose window has closed, and the seconds until the next one does"""
+        due, next_at = [], None
+        for key, change in list(self._pending.items()):
+            due_at = self._due_at(change)
+            if due_at <= now:
+                due.append(self._pending.pop(key))
+            elif next_at is None or due_at < next_at:
+                next_at = due_at
+        return due, (next_at - now if next_at is not None else None)
+
+    def _loop(self):
+        while not self._stopping.is_set():
+            with self._changed:
+                due, wait = self._take_due(time.monotonic())
+                if not due:
+                    self._changed.wait(wait)
+                    continue
+                self._in_progress = {(change.service.tenant_id, change.item_id) for change in due}
+            try:
+                for change in due:
+                    self._process_safely(change)
+            finally:
+                with self._changed:
+                    self._in_progress = set()
+                    self._changed.notify_all()
+
+    def flush(self) -> int:
+        """
+        Make every waiting change due now, ignoring debounce windows, and wait
+        (up to the request deadline) until the processing thread has handled
+        them. Returns how many changes were waiting.
+        """
+        self.start()
+        with self._changed:
+            flushed = dict(self._pending)
+            self._flush_before = time.monotonic()
+            self._changed.notify_all()
+
+            def done() -> bool:
+                waiting = any(self._pending.get(key) is change for key, change in flushed.items())
+                return not waiting and not self._in_progress.intersection(flushed)
+            self._changed.wait_for(done, timeout=deadlines.remaining())
+        return len(flushed)
+
+    def _process_safely(self, change: _PendingChange):
+        # One failing item must not hold up the others
+        try:
+            self._process(change)
+        except Exception as e:
+            logger.error("Could not process Kissflow events for item %s: %s", change.item_id, e)
+            with self._changed:
+                self.failed += 1
+
+    def _store(self, change: _PendingChange, mapped) -> bool:
+        """Cache a refreshed item unless a newer event for it is waiting"""
+        with self._changed:
+            if (change.service.tenant_id, change.item_id) in self._pending:
+                return False
+            change.service.item_cache.set(change.item_id, mapped)
+            return True
+
+    def _process(self, change: _PendingChange):
+        from app.services.cache_warmer import cache_warmer
+        from app.services.kissflow_service import DEFAULT_TENANT, MAPPED_FIELDS
+        from app.services.trends_service import trends_service
+
+        service, item_id = change.service, change.item_id
+        default_tenant = service.tenant_id == DEFAULT_TENANT
+        outcome = "invalidated"
+        mapped = None
+        removed = False
+        if change.deleted:
+            # The cached copy was dropped when the event arrived
+            removed = default_tenant and trends_service.remove_item(item_id)
+        elif change.item is not None and all(field in change.item for field in MAPPED_FIELDS):
+            mapped = service._map_kissflow_to_qsr(change.item)
+            outcome = "applied"
+        elif change.was_cached or (default_tenant and (cache_warmer.is_warm(item_id) or trends_service.tracks(item_id))):
+            mapped = service.fetch_uncached(item_id, priority=LANE_BATCH)
+            outcome = "refreshed" if mapped is not None else "failed"
+
+        moved = False
+        if mapped is not None:
+            if not self._store(change, mapped):
+                outcome = "superseded"
+            elif default_tenant:
+                moved = trends_service.record_item_fields(item_id, mapped.TeamName, mapped.QuarterRelease)
+
+        with self._changed:
+            self.processed += 1
+            if outcome == "applied":
+                self.applied += 1
+            elif outcome == "refreshed":
+                self.refreshed += 1
+            elif outcome == "failed":
+                self.failed += 1
+            elif outcome == "superseded":
+                self.superseded += 1
+            else:
+                self.invalidated += 1
+            self.trends_moved += moved
+            self.trends_removed += removed
+            self.last_processed_at = datetime.now(timezone.utc).isoformat()
+        logger.info("Processed %d Kissflow event(s) for item %s (tenant %s): %s",
+                    change.events, item_id, service.tenant_id, outcome)
+
+    def status(self) -> WebhookStatus:
+        with self._changed:
+            return WebhookStatus(
+                running=self._thread is not None and self._thread.is_alive(),
+                debounceSeconds=self.debounce,
+                maxDelaySeconds=self.max_delay,
+                received=self.received,
+                rejected=self.rejected,
+                coalesced=self.coalesced,
+                pending=len(self._pending),
+                processed=self.processed,
+                applied=self.applied,
+                refreshed=self.refreshed,
+                invalidated=self.invalidated,
+                failed=self.failed,
+                superseded=self.superseded,
+                trendsMoved=self.trends_moved,
+                trendsRemoved=self.trends_removed,
+                lastProcessedAt=self.last_processed_at
+            )
+
+
+# Global service instance
+webhook_processor = WebhookProcessor()
@@ -0,0 +1,337 @@
+import json
+import logging
+import os
+import random
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional
+from app.models import Defect, Feature, FeatureCycle, TestBuild
+from app.fast_models import test_builds_from_cycles, validate_records
+
+logger = logging.getLogger(__name__)
+
+BASE_DATE = datetime(2025, 1, 6, 9, 0, 0)
+
+TEAMS = ["Apps", "Platform", "Integrations", "Analytics", "Mobile", "Security"]
+QUARTERS = ["Q1 2025", "Q2 2025", "Q3 2025", "Q4 2025", "Q1 2026"]
+ENVIRONMENTS = ["TST", "Pesagi", "Draco"]
+PEOPLE = [
+    "Roshini R S", "Rashmi Subramani", "Sankaran Baskaran", "Abdul Raghmaan K",
+    "Priya Natarajan", "Karthik Venkatesh", "Meera Iyer", "Arjun Ramesh",
+    "Divya Krishnan", "Vikram Sundar", "Lakshmi Narayanan", "Farhan Ali",
+]
+
+SEVERITIES = [("Critical", 0.05), ("High", 0.25), ("Medium", 0.45), ("Low", 0.25)]
+SEVERITY_PRIORITY = {"Critical": "P1", "High": "P1", "Medium": "P2", "Low": "P3"}
+STATUSES = [("Closed", 0.45), ("Resolved", 0.15), ("In Progress", 0.15), ("Open", 0.25)]
+
+# Vocabulary for defect and feature text
+_COMPONENTS = [
+    "flow lock", "notification", "dashboard widget", "API token", "form builder",
+    "approval step", "file upload", "search index", "audit log", "role permission",
+    "email template", "webhook", "report export", "date picker", "user session",
+]
+_SYMPTOMS = [
+    "not refreshed after save", "shows stale data", "fails with 500 error",
+    "is not visible in dark mode", "times out under load", "ignores user locale",
+    "duplicates entries", "loses unsaved changes", "returns wrong count",
+    "is not accessible by keyboard", "breaks on mobile viewport", "leaks memory",
+]
+_CONTEXTS = [
+    "when two users edit simultaneously", "after switching workspaces",
+    "for users with read-only access", "on slow network connections",
+    "when the list has more than 100 items", "after session expiry",
+    "in Safari", "for non-English locales", "during bulk import", "after a page reload",
+]
+_FEATURE_KINDS = ["Enhancement", "New Feature", "Improvement"]
+_FEATURE_AREAS = ["App", "Process", "Board", "Dataset", "Portal", "Integration"]
+
+
+def _weighted(rng: random.Random, choices) -> str:
+    return rng.choices([c for c, _ in choices], weights=[w for _, w in choices])[0]
+
+
+def _iso(moment: datetime) -> str:
+    return moment.isoformat() + "Z"
+
+
+def _person(rng: random.Random) -> Dict[str, str]:
+    name = rng.choice(PEOPLE)
+    return {"_id": f"Us{zlib.crc32(name.encode()):010d}", "Name": name, "Kind": "User"}
+
+
+def cycles_to_test_builds(cycles: List[FeatureCycle]) -> List[TestBuild]:
+    """Convert feature cycles to TestBuild objects, as the Kissflow service does"""
+    return test_builds_from_cycles(cycles)
+
+
+class SyntheticDataset:
+    """Generated records, keyed by Kissflow item ID and feature ID"""
+
+    def __init__(self):
+        self.kissflow_items: Dict[str, Dict[str, Any]] = {}
+        self.item_features: Dict[str, str] = {}
+        self.features: Dict[str, Feature] = {}
+        self.cycles: Dict[str, List[FeatureCycle]] = {}
+        self.defects: Dict[str, List[Defect]] = {}
+
+    def test_builds(self, item_id: str) -> List[TestBuild]:
+        return cycles_to_test_builds(self.cycles[self.item_features[item_id]])
+
+    @property
+    def defect_count(self) -> int:
+        return sum(len(defects) for defects in self.defects.values())
+
+
+def generate_dataset(seed: int = 42, features: int = 100, defects_per_feature: int = 10,
+                     cycles: int = 3, attachments_per_item: int = 0,
+                     duplicate_rate: float = 0.05, item_id_start: int = 1000) -> SyntheticDataset:
+    """
+    Generate a seeded synthetic dataset for load and scale testing: raw
+    Kissflow items, Feature / FeatureCycle aggregates and Defect records.
+    Everything derives from `seed` and a fixed base date, so the same
+    arguments always produce identical output.
+
+    Each of the `features` items gets `cycles` test cycles and
+    `defects_per_feature` defects. `duplicate_rate` is the fraction of
+    defects re-filed from an earlier defect with lightly edited text, and
+    `attachments_per_item` pads the raw Kissflow items with attachment
+    metadata to mimic large upstream payloads.
+    """
+    rng = random.Random(seed)
+    dataset = SyntheticDataset()
+    filed: List[Defect] = []
+
+    for index in range(features):
+        item_id = f"KFF-{item_id_start + index:04d}"
+        feature_id = f"{rng.getrandbits(96):024x}"
+        team = rng.choice(TEAMS)
+        quarter = rng.choice(QUARTERS)
+        title = f"{rng.choice(_COMPONENTS).title()} - {rng.choice(_SYMPTOMS).split(' ')[0].title()} {index}"
+        created = BASE_DATE + timedelta(days=rng.randint(0, 360), hours=rng.randint(0, 8))
+
+        dataset.item_features[item_id] = feature_id
+        dataset.kissflow_items[item_id] = _kissflow_item(
+            rng, item_id, title, team, quarter, created, attachments_per_item
+        )
+
+        # Test cycles: pass rate improves from cycle to cycle
+        total_tests = rng.randint(30, 200)
+        pass_rate = rng.uniform(0.6, 0.85)
+        cycle_start = created + timedelta(days=rng.randint(20, 40))
+        feature_cycles = []
+        for cycle in range(1, cycles + 1):
+            executed = total_tests - rng.randint(0, max(1, total_tests // 20))
+            passed = min(executed, int(round(executed * pass_rate)))
+            failed = executed - passed
+            end = cycle_start + timedelta(days=rng.randint(2, 4))
+            bugs_found = max(0, min(failed, rng.randint(failed // 3, failed)))
+            feature_cycles.append(FeatureCycle(
+                cycle=cycle,
+                runId=f"run-{feature_id}-{cycle}",
+                runName=f"Cycle {cycle}",
+                date=_iso(end),
+                startDate=_iso(cycle_start),
+                endDate=_iso(end),
+                passRate=round(passed * 100.0 / executed, 2) if executed else 0.0,
+                totalTests=total_tests,
+                passed=passed,
+                failed=failed,
+                bugsFound=bugs_found,
+                bugsFixed=rng.randint(0, bugs_found),
+                totalDefects=bugs_found
+            ))
+            pass_rate = min(1.0, pass_rate + rng.uniform(0.03, 0.12))
+            cycle_start = end + timedelta(days=rng.randint(1, 3))
+
+        dataset.features[feature_id] = Feature(
+            id=feature_id,
+            name=title,
+            description=f"{team} feature targeting {quarter}",
+            totalCycles=cycles,
+            totalTestCases=total_tests,
+            createdAt=_iso(created),
+            updatedAt=feature_cycles[-1].endDate if feature_cycles else _iso(created)
+        )
+        dataset.cycles[feature_id] = feature_cycles
+
+        prefix = "".join(word[0] for word in title.split(" - ")[0].split()).upper() or "DF"
+        feature_defects = []
+        for number in range(1, defects_per_feature + 1):
+            source = rng.choice(filed) if filed and rng.random() < duplicate_rate else None
+            defect = _defect(rng, f"{prefix}{index}-{number:03d}", source, cycles, feature_cycles, created)
+            feature_defects.append(defect)
+            filed.append(defect)
+        dataset.defects[feature_id] = feature_defects
+
+    logger.info(
+        "Generated %d features, %d defects, %d cycles each (seed %d)",
+        features, dataset.defect_count, cycles, seed
+    )
+    return dataset
+
+
+def _kissflow_item(rng: random.Random, item_id: str, title: str, team: str, quarter: str,
+                   created: datetime, attachments: int) -> Dict[str, Any]:
+    """Raw Kissflow item in the shape returned by GET {base_url}/{item_id}"""
+    frontend_dev, backend_dev, tester = _person(rng), _person(rng), _person(rng)
+    kind = rng.choice(_FEATURE_KINDS)
+    item = {
+        "_id": item_id,
+        "Name": f"[ {kind} ][ {rng.choice(_FEATURE_AREAS)} ] :  {title}",
+        "_created_by": _person(rng),
+        "_modified_by": _person(rng),
+        "_created_at": _iso(created),
+        "_modified_at": _iso(created + timedelta(days=rng.randint(10, 60))),
+        "_flow_name": "Kissflow Product Features",
+        "_item_id": item_id,
+        "AssignedTo": tester,
+        "_status_name": rng.choice(["TST", "DEV", "UAT", "Released"]),
+        "_priority_name": rng.choice(["High", "Medium", "Low"]),
+        "Title_1": title,
+        "Description_1": f"{title}. " + " ".join(
+            f"{rng.choice(_COMPONENTS).capitalize()} {rng.choice(_SYMPTOMS)} {rng.choice(_CONTEXTS)}."
+            for _ in range(3)
+        ),
+        "Work_type": kind,
+        "TDD_Link_1": f"https://coda.io/d/Engineering-Docs/TDD-{item_id}",
+        "TDD_Prepared_by": [backend_dev, frontend_dev],
+        "Backend_PR_Link": f"https://github.com/OrangeScape/kissflow-xg/pull/{rng.randint(10000, 30000)}",
+        "Frontend_PR_link": f"https://github.com/OrangeScape/kf-xg-frontend/pull/{rng.randint(5000, 20000)}",
+        "Frontend_Developer": frontend_dev,
+        "Backend_Developer": backend_dev,
+        "Test_Case_Link": f"https://docs.google.com/spreadsheets/d/{rng.getrandbits(128):032x}/edit",
+        "TC_Prepared_by": [tester],
+        "Epic": rng.choice(_FEATURE_AREAS),
+        "Estimated_launch_quarter": quarter,
+        "Team": team,
+        "Required_Stakeholders": ["Design", "Backend", "Frontend", "QA", "Content", "PM"],
+        "Bugs_Reported": rng.random() < 0.5,
+    }
+    if attachments:
+        item["Attachments"] = [
+            {
+                "_id": f"At{rng.getrandbits(64):016x}",
+                "name": f"evidence-{n:04d}.png",
+                "size": rng.randint(10_000, 5_000_000),
+                "content_type": "image/png",
+                "uploaded_by": _person(rng),
+                "uploaded_at": _iso(created + timedelta(hours=n)),
+                "url": f"https://files.kissflow.com/{item_id}/{rng.getrandbits(64):016x}",
+            }
+            for n in range(attachments)
+        ]
+    return item
+
+
+def _defect(rng: random.Random, defect_id: str, source: Optional[Defect], cycles: int,
+            feature_cycles: List[FeatureCycle], created: datetime) -> Defect:
+    if source is not None:
+        # Re-filed bug: same root cause, lightly edited wording
+        title = source.title.replace(" when ", " if ") if rng.random() < 0.5 else source.title + " again"
+        description = source.description
+        steps, expected, actual = source.reproductionSteps, source.expectedResult, source.actualResult
+    else:
+        component, symptom, context = rng.choice(_COMPONENTS), rng.choice(_SYMPTOMS), rng.choice(_CONTEXTS)
+        title = f"{component.capitalize()} {symptom} {context}"
+        description = f"The {component} {symptom} {context}. Observed in {rng.randint(2, 9)} of 10 attempts."
+        steps = "\n".join(
+            f"{n}. {step}" for n, step in enumerate(
+                [f"Open the {component}", f"Reproduce the scenario {context}", "Observe the result"], 1
+            )
+        )
+        expected = f"The {component} should work correctly {context}"
+        actual = f"The {component} {symptom}"
+
+    severity = _weighted(rng, SEVERITIES)
+    status = _weighted(rng, STATUSES)
+    cycle = rng.randint(1, cycles) if cycles else None
+    opened = datetime.fromisoformat(feature_cycles[cycle - 1].startDate[:-1]) if cycle else created
+    opened += timedelta(hours=rng.randint(1, 48))
+    resolved = opened + timedelta(hours=rng.randint(4, 240)) if status in ("Closed", "Resolved") else None
+
+    return Defect(
+        defectId=defect_id,
+        title=title,
+        description=description,
+        status=status,
+        severity=severity,
+        priority=SEVERITY_PRIORITY[severity],
+        assignedTo=rng.choice(PEOPLE),
+        reportedBy=rng.choice(PEOPLE),
+        createdAt=_iso(opened),
+        updatedAt=_iso(resolved or opened + timedelta(hours=rng.randint(1, 72))),
+        resolvedAt=_iso(resolved) if resolved else None,
+        testCaseId=f"TC-{defect_id}",
+        cycle=cycle,
+        environment=rng.choice(ENVIRONMENTS),
+        reproductionSteps=steps,
+        expectedResult=expected,
+        actualResult=actual
+    )
+
+
+def write_dataset(dataset: SyntheticDataset, directory: str):
+    """Write the dataset as JSON Lines files, one record per line"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "kissflow_items.jsonl"), "w") as f:
+        for item in dataset.kissflow_items.values():
+            f.write(json.dumps(item) + "\n")
+    with open(os.path.join(directory, "features.jsonl"), "w") as f:
+        for item_id, feature_id in dataset.item_features.items():
+            record = {"itemId": item_id, **dataset.features[feature_id].model_dump()}
+            f.write(json.dumps(record) + "\n")
+    with open(os.path.join(directory, "feature_cycles.jsonl"), "w") as f:
+        for feature_id, feature_cycles in dataset.cycles.items():
+            for cycle in feature_cycles:
+                f.write(json.dumps({"featureId": feature_id, **cycle.model_dump()}) + "\n")
+    with open(os.path.join(directory, "test_builds.jsonl"), "w") as f:
+        for item_id in dataset.item_features:
+            for build in dataset.test_builds(item_id):
+                f.write(json.dumps({"itemId": item_id, **build.model_dump()}) + "\n")
+    with open(os.path.join(directory, "defects.jsonl"), "w") as f:
+        for feature_id, defects in dataset.defects.items():
+            for defect in defects:
+                f.write(json.dumps({"featureId": feature_id, **defect.model_dump()}) + "\n")
+
+
+def load_dataset(directory: str) -> SyntheticDataset:
+    """Read a dataset previously written by write_dataset"""
+    dataset = SyntheticDataset()
+
+    def records(name):
+        with open(os.path.join(directory, name)) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    for item in records("kissflow_items.jsonl"):
+        dataset.kissflow_items[item["_id"]] = item
+    for record in records("features.jsonl"):
+        item_id = record.pop("itemId")
+        feature = Feature(**record)
+        dataset.item_features[item_id] = feature.id
+        dataset.features[feature.id] = feature
+        dataset.cycles[feature.id] = []
+        dataset.defects[feature.id] = []
+    # Files may have been edited by hand, so records are validated in bulk
+    cycle_records = list(records("feature_cycles.jsonl"))
+    feature_ids = [record.pop("featureId") for record in cycle_records]
+    for feature_id, cycle in zip(feature_ids, validate_records(FeatureCycle, cycle_records)):
+        dataset.cycles[feature_id].append(cycle)
+    defect_records = list(records("defects.jsonl"))
+    feature_ids = [record.pop("featureId") for record in defect_records]
+    for feature_id, defect in zip(feature_ids, validate_records(Defect, defect_records)):
+        dataset.defects[feature_id].append(defect)
+    return dataset
+
+
+def load_into_services(dataset: SyntheticDataset):
+    """Register the dataset's features, cycles and defects with the in-process services"""
+    from app.services.defect_service import defect_service
+    from app.services.test_execution_service import test_execution_service
+
+    for item_id, feature_id in dataset.item_features.items():
+        test_execution_service.load_feature(dataset.features[feature_id], dataset.cycles[feature_id], item_id)
+        defect_service.load_defects(feature_id, dataset.defects[feature_id], item_id)
+    logger.info("Loaded %d synthetic features into services", len(dataset.item_features))
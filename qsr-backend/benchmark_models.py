@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Compare model construction costs for defects and test builds.
+
+    python benchmark_models.py --defects 5000 --builds 5000 --repeat 5
+
+Reports the best-of-N time for validated construction (Model(**fields)),
+bulk validation through a cached TypeAdapter and model_construct, plus
+creating the empty QsrData the Kissflow mapper fills in. "deployed" names the path the service uses for each
+and "speedup" is model_construct's time over it. buildsFromCycles times
+test_builds_from_cycles end to end, including reading the cycles.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Pydantic model construction paths")
+    parser.add_argument("--defects", type=int, default=5000, help="Defects to construct")
+    parser.add_argument("--builds", type=int, default=5000, help="Test builds to construct")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    from app.fast_models import list_adapter, test_builds_from_cycles, validate_records
+    from app.models import Defect, QsrData, TestBuild
+    from app.synthetic_data import generate_dataset
+
+    features = max(1, args.defects // 10)
+    dataset = generate_dataset(seed=1, features=features, defects_per_feature=10,
+                               cycles=max(1, args.builds // features))
+    defect_records = [defect.model_dump() for defects in dataset.defects.values() for defect in defects]
+    defect_records = defect_records[:args.defects]
+    build_records = [build.model_dump() for item_id in dataset.item_features for build in dataset.test_builds(item_id)]
+    build_records = build_records[:args.builds]
+
+    # Warm the cached adapters so their one-off build cost is not measured
+    list_adapter(Defect)
+    list_adapter(TestBuild)
+
+    cycles = [cycle for cycles in dataset.cycles.values() for cycle in cycles][:args.builds]
+
+    results = {"defects": len(defect_records), "builds": len(build_records), "milliseconds": {}}
+    for name, model, records in (("defects", Defect, defect_records), ("builds", TestBuild, build_records)):
+        results["milliseconds"][name] = {
+            "validated": best_of(args.repeat, lambda: [model(**record) for record in records]),
+            "bulkAdapter": best_of(args.repeat, lambda: validate_records(model, records)),
+            "modelConstruct": best_of(args.repeat, lambda: [model.model_construct(**record) for record in records]),
+        }
+    results["milliseconds"]["buildsFromCycles"] = best_of(args.repeat, lambda: test_builds_from_cycles(cycles))
+
+    # The Kissflow mapper starts from an empty QsrData and fills it in (x1000)
+    results["milliseconds"]["emptyQsrData"] = {
+        "validated": best_of(args.repeat, lambda: [QsrData() for _ in range(1000)]),
+        "modelConstruct": best_of(args.repeat, lambda: [QsrData.model_construct() for _ in range(1000)]),
+    }
+
+    # Paths the service uses: bulk validation for record lists, validated
+    # construction for single models
+    deployed = {"defects": "bulkAdapter", "builds": "bulkAdapter", "emptyQsrData": "validated"}
+    milliseconds = results["milliseconds"]
+    milliseconds["buildsFromCycles"] = round(milliseconds["buildsFromCycles"] * 1000, 3)
+    for name, path in deployed.items():
+        timings = milliseconds[name]
+        speedup = timings["modelConstruct"] / timings[path]
+        for key, seconds in timings.items():
+            timings[key] = round(seconds * 1000, 3)
+        timings["deployed"] = path
+        timings["speedup"] = round(speedup, 1)
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare parsing a Kissflow item response in full against the streaming,
+field-selective parse.
+
+    python benchmark_parse.py --attachments 100,1000,10000 --repeat 5
+
+Items are synthetic Kissflow items with an attachment child table of each
+given size, arriving in KISSFLOW_PARSE_CHUNK_KB chunks. The full path joins
+the body and decodes all of it (what response.json() does); the streaming
+path keeps only MAPPED_FIELDS. Both are mapped to QsrData and must agree.
+Each layout is measured with the child table after the mapped fields (the
+streaming parse stops early) and before them (it scans the whole body).
+Reports best-of-N latency and the tracemalloc peak, measured in a separate
+run so tracing does not slow the timings.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def peak_bytes(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark full versus streaming parse of Kissflow items")
+    parser.add_argument("--attachments", default="100,1000,10000", help="Comma-separated attachment counts")
+    parser.add_argument("--chunk-kb", type=int, default=int(os.getenv("KISSFLOW_PARSE_CHUNK_KB", 64)),
+                        help="Size of the chunks the body arrives in")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    from app.selective_json import parse_selected
+    from app.services.kissflow_service import MAPPED_FIELDS, kissflow_service
+    from app.synthetic_data import _kissflow_item
+
+    chunk_bytes = args.chunk_kb * 1024
+    results = {"chunkKb": args.chunk_kb, "items": []}
+    for attachments in (int(count) for count in args.attachments.split(",")):
+        item = _kissflow_item(random.Random(attachments), "KFF-1000", "Flow Lock", "Platform",
+                              "Q3 2025", datetime(2025, 7, 1), attachments)
+        layouts = {
+            "tableLast": item,
+            "tableFirst": {"Attachments": item["Attachments"], **item} if attachments else item,
+        }
+        for layout, body in layouts.items():
+            payload = json.dumps(body).encode("utf-8")
+            chunks = [payload[i:i + chunk_bytes] for i in range(0, len(payload), chunk_bytes)]
+
+            def full():
+                return kissflow_service._map_kissflow_to_qsr(json.loads(b"".join(chunks).decode("utf-8")))
+
+            def streaming():
+                values, _ = parse_selected(iter(chunks), MAPPED_FIELDS)
+                return kissflow_service._map_kissflow_to_qsr(values)
+
+            if full() != streaming():
+                print(f"Mapped results differ for {attachments} attachments ({layout})", file=sys.stderr)
+                return 1
+            _, state = parse_selected(iter(chunks), MAPPED_FIELDS)
+
+            timings = {"full": best_of(args.repeat, full), "streaming": best_of(args.repeat, streaming)}
+            peaks = {"full": peak_bytes(full), "streaming": peak_bytes(streaming)}
+            results["items"].append({
+                "attachments": attachments,
+                "layout": layout,
+                "bodyBytes": len(payload),
+                "bytesParsed": state.bytes_read,
+                "milliseconds": {path: round(seconds * 1000, 3) for path, seconds in timings.items()},
+                "peakKb": {path: round(peak / 1024, 1) for path, peak in peaks.items()},
+                "speedup": round(timings["full"] / timings["streaming"], 1) if timings["streaming"] else None,
+                "memoryRatio": round(peaks["full"] / peaks["streaming"], 1) if peaks["streaming"] else None,
+            })
+
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Generate a seeded synthetic dataset (Kissflow items, features, test cycles,
+test builds and defects) as JSON Lines files for load and scale testing.
+
+    python generate_data.py --features 4000 --defects 50 --cycles 5 --seed 7 --out data/synthetic
+
+Serve the items with kissflow_stub.py and start the backend with
+QSR_SYNTHETIC_DATASET pointing at the same directory.
+"""
+
+import argparse
+import sys
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic QSR dataset")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--features", type=int, default=100, help="Number of features / Kissflow items")
+    parser.add_argument("--defects", type=int, default=10, help="Defects per feature")
+    parser.add_argument("--cycles", type=int, default=3, help="Test cycles per feature")
+    parser.add_argument("--attachments", type=int, default=0, help="Attachment records per Kissflow item")
+    parser.add_argument("--duplicate-rate", type=float, default=0.05, help="Fraction of re-filed defects")
+    parser.add_argument("--out", default="data/synthetic", help="Output directory")
+    args = parser.parse_args()
+
+    from app.synthetic_data import generate_dataset, write_dataset
+
+    started = time.perf_counter()
+    dataset = generate_dataset(
+        seed=args.seed,
+        features=args.features,
+        defects_per_feature=args.defects,
+        cycles=args.cycles,
+        attachments_per_item=args.attachments,
+        duplicate_rate=args.duplicate_rate,
+    )
+    write_dataset(dataset, args.out)
+
+    print(
+        f"✅ {len(dataset.features)} features, {dataset.defect_count} defects, "
+        f"{args.cycles} cycles each written to {args.out} in {time.perf_counter() - started:.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Bulk-ingest test case execution results (CSV or JSONL) into a feature cycle.
+
+By default the file is streamed to a running backend; with --local it is
+ingested into an in-process service, which is useful for measuring parse
+and write throughput on its own.
+
+    python ingest.py results.csv --feature 67309a1b2c3d4e5f60718293 --cycle 4
+"""
+
+import argparse
+import json
+import sys
+
+CHUNK_SIZE = 64 * 1024
+
+
+def _read_chunks(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream test case results into the QSR backend")
+    parser.add_argument("path", help="CSV or JSONL file of test case results")
+    parser.add_argument("--feature", required=True, help="Feature ID to ingest into")
+    parser.add_argument("--cycle", type=int, required=True, help="Test cycle number")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="Payload format (default: from file extension)")
+    parser.add_argument("--url", default="http://localhost:8000", help="Backend base URL")
+    parser.add_argument("--local", action="store_true", help="Ingest in-process instead of over HTTP")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    from app.services.ingestion_service import detect_format
+    try:
+        format_name = detect_format(args.format, filename=args.path)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+
+    if args.local:
+        from app.services.ingestion_service import ingestion_service
+        report = ingestion_service.ingest_chunks(args.feature, args.cycle, _read_chunks(args.path), format_name)
+        report = report.model_dump()
+    else:
+        import requests
+        url = f"{args.url.rstrip('/')}/api/v1/test-execution/features/{args.feature}/cycles/{args.cycle}/results"
+        response = requests.post(
+            url,
+            params={"format": format_name},
+            data=_read_chunks(args.path),
+            headers={"Content-Type": "text/csv" if format_name == "csv" else "application/x-ndjson"},
+        )
+        if response.status_code != 200:
+            print(f"❌ Ingestion failed: {response.status_code} - {response.text}", file=sys.stderr)
+            return 1
+        report = response.json()
+
+    print(json.dumps(report, indent=2))
+    print(
+        f"✅ {report['rowsIngested']} rows ingested, {report['rowsRejected']} rejected "
+        f"in {report['elapsedSeconds']}s ({report['rowsPerSecond']} rows/s)",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
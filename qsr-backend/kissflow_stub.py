@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Kissflow item API, serving synthetic items.
+
+    python kissflow_stub.py --dataset data/synthetic --port 9000
+    python kissflow_stub.py --features 1000 --seed 7   # generate in-process
+
+GET /list?page_number=1&page_size=100&fields=_id,Name&Team=Payments serves
+paginated list queries for bulk prefetch.
+
+With --webhook-url and --webhook-secret, items can be edited to exercise
+the webhook receiver; each edit posts signed item-change events:
+
+    POST   /__edit/KFF-1000 {"Team": "Payments"}   item.updated with the item
+    POST   /__edit/KFF-1000?repeat=20&payload=id     a burst of 20 ID-only events
+    DELETE /__edit/KFF-1000                          item.deleted
+
+Point the backend at it with KISSFLOW_BASE_URL=http://localhost:9000 (any
+non-empty access key ID / secret).
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import sys
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+def send_webhook(url, secret, payload):
+    """POST a signed item-change event; returns the receiver's status code"""
+    body = json.dumps(payload).encode("utf-8")
+    timestamp = str(int(time.time()))
+    signature = hmac.new(secret.encode("utf-8"), timestamp.encode("ascii") + b"." + body, hashlib.sha256)
+    request = urllib.request.Request(url, data=body, method="POST", headers={
+        "Content-Type": "application/json",
+        "X-Kissflow-Timestamp": timestamp,
+        "X-Kissflow-Signature": "sha256=" + signature.hexdigest(),
+    })
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+    except urllib.error.URLError:
+        return None
+
+
+class KissflowStubHandler(BaseHTTPRequestHandler):
+    items = {}
+    latency = 0.0
+    webhook_url = None
+    webhook_secret = None
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.latency:
+            time.sleep(self.latency)
+        url = urlparse(self.path)
+        item_id = url.path.rstrip("/").rsplit("/", 1)[-1]
+        if item_id == "list":
+            self._send_list(parse_qs(url.query))
+            return
+        item = self.items.get(item_id)
+        if item is None:
+            self._send_json(404, {"error": "Not Found", "message": f"Item {item_id} not found"})
+            return
+        self._send_json(200, item)
+
+    def _send_list(self, query):
+        """Paginated list query: page_number/page_size, fields, and field=value filters"""
+        params = {key: values[-1] for key, values in query.items()}
+        page_number = int(params.pop("page_number", 1))
+        page_size = int(params.pop("page_size", 50))
+        fields = params.pop("fields", "")
+        fields = fields.split(",") if fields else None
+
+        matches = [
+            item for item in self.items.values()
+            if all(item.get(key) == value for key, value in params.items())
+        ]
+        page = matches[(page_number - 1) * page_size:page_number * page_size]
+        if fields:
+            page = [{field: item[field] for field in fields if field in item} for item in page]
+        self._send_json(200, {"Data": page, "Total": len(matches)})
+
+    def _edit(self, delete):
+        """Edit or delete an item, then post `repeat` webhook events for it"""
+        url = urlparse(self.path)
+        item_id = url.path.rstrip("/").rsplit("/", 1)[-1]
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if not self.webhook_url or not self.webhook_secret:
+            self._send_json(400, {"error": "Start the stub with --webhook-url and --webhook-secret"})
+            return
+        item = self.items.get(item_id)
+        if item is None:
+            self._send_json(404, {"error": "Not Found", "message": f"Item {item_id} not found"})
+            return
+
+        if delete:
+            del self.items[item_id]
+            payload = {"event": "item.deleted", "item_id": item_id}
+        else:
+            length = int(self.headers.get("Content-Length") or 0)
+            changes = json.loads(self.rfile.read(length)) if length else {}
+            item.update(changes)
+            if params.get("payload") == "id":
+                payload = {"event": "item.updated", "item_id": item_id}
+            else:
+                payload = {"event": "item.updated", "item_id": item_id, "data": item}
+
+        statuses = [send_webhook(self.webhook_url, self.webhook_secret, payload)
+                    for _ in range(int(params.get("repeat", 1)))]
+        self._send_json(200, {"itemId": item_id, "event": payload["event"], "webhookStatuses": statuses})
+
+    def do_POST(self):
+        if self.path.startswith("/__edit/"):
+            self._edit(delete=False)
+        else:
+            self._send_json(404, {"error": "Not Found"})
+
+    def do_DELETE(self):
+        if self.path.startswith("/__edit/"):
+            self._edit(delete=True)
+        else:
+            self._send_json(404, {"error": "Not Found"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(items, host="127.0.0.1", port=9000, latency_ms=0.0, webhook_url=None, webhook_secret=None):
+    """Create a threaded stub server for `items` (not yet serving)"""
+    handler = type("Handler", (KissflowStubHandler,), {
+        "items": items, "latency": latency_ms / 1000, "webhook_url": webhook_url, "webhook_secret": webhook_secret
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve synthetic Kissflow items")
+    parser.add_argument("--dataset", help="Directory written by generate_data.py")
+    parser.add_argument("--features", type=int, default=100, help="Items to generate when --dataset is not given")
+    parser.add_argument("--seed", type=int, default=42, help="Seed when generating in-process")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial latency per request")
+    parser.add_argument("--webhook-url", help="Webhook receiver notified of edits, e.g. "
+                        "http://localhost:8000/api/v1/qsr/webhooks/kissflow")
+    parser.add_argument("--webhook-secret", help="Secret the events are signed with")
+    args = parser.parse_args()
+
+    from app.synthetic_data import generate_dataset, load_dataset
+
+    if args.dataset:
+        dataset = load_dataset(args.dataset)
+    else:
+        dataset = generate_dataset(seed=args.seed, features=args.features)
+
+    server = serve(dataset.kissflow_items, args.host, args.port, args.latency_ms,
+                   args.webhook_url, args.webhook_secret)
+    print(f"🚀 Kissflow stub serving {len(dataset.kissflow_items)} items on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
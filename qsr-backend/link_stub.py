@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the sites QSR artifact links point to.
+
+    python link_stub.py --port 9200 --latency-ms 50
+
+The response depends on the path, so test reports can mix link outcomes:
+
+    /ok/...           200
+    /pull/<n>         200 (a pull request page)
+    /missing/...      404
+    /gone/...         410
+    /private/...      403 for HEAD and GET
+    /error/...        500
+    /nohead/...       405 for HEAD, 200 for GET
+    /redirect/<path>  302 to /<path>
+    /login/...        200 (a sign-in page; redirect here to simulate one)
+    /slow/<ms>/...    200 after <ms> extra milliseconds
+
+Every request waits --latency-ms first. GET /__stats reports requests and
+the peak number of concurrent requests per Host header. Address it as both
+127.0.0.1 and localhost to get two hosts out of one stub.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LinkStubHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    protocol_version = "HTTP/1.1"
+    lock = threading.Lock()
+    active: Counter = Counter()
+    peak: Counter = Counter()
+    requests: Counter = Counter()
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _respond(self):
+        path = self.path.split("?", 1)[0]
+        parts = [part for part in path.split("/") if part]
+        kind = parts[0] if parts else "ok"
+
+        if kind == "redirect":
+            self._send(302, headers={"Location": "/" + "/".join(parts[1:])})
+        elif kind == "missing":
+            self._send(404, b"Not Found")
+        elif kind == "gone":
+            self._send(410, b"Gone")
+        elif kind == "private":
+            self._send(403, b"Forbidden")
+        elif kind == "error":
+            self._send(500, b"Internal Server Error")
+        elif kind == "nohead" and self.command == "HEAD":
+            self._send(405, headers={"Allow": "GET"})
+        else:
+            if kind == "slow" and len(parts) > 1 and parts[1].isdigit():
+                time.sleep(int(parts[1]) / 1000)
+            self._send(200, f"<html><body>{path}</body></html>".encode("utf-8"), {"Content-Type": "text/html"})
+
+    def _handle(self):
+        if self.path == "/__stats":
+            with self.lock:
+                body = json.dumps({"requests": dict(self.requests), "peakConcurrent": dict(self.peak)}).encode("utf-8")
+            self._send(200, body, {"Content-Type": "application/json"})
+            return
+
+        host = self.headers.get("Host", "")
+        with self.lock:
+            self.active[host] += 1
+            self.requests[host] += 1
+            self.peak[host] = max(self.peak[host], self.active[host])
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            self._respond()
+        finally:
+            with self.lock:
+                self.active[host] -= 1
+
+    do_GET = _handle
+    do_HEAD = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host="127.0.0.1", port=9200, latency_ms=0.0):
+    """Create a threaded stub server (not yet serving)"""
+    handler = type("Handler", (LinkStubHandler,), {
+        "latency": latency_ms / 1000, "active": Counter(), "peak": Counter(), "requests": Counter()
+    })
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stand-in pages for link health checks")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Artificial latency per request")
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, args.latency_ms)
+    print(f"🚀 Link stub serving on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,472 @@
+#!/usr/bin/env python3
+"""
+End-to-end load generator for the QSR backend.
+
+    # Against a running server
+    python loadtest.py --url http://localhost:8000 --concurrency 32 --duration 30
+
+    # Start the app in-process on a free port, skew item IDs, save the results
+    python loadtest.py --spawn --mix fetch=80,status=10,features=5,cycles=5 \\
+        --items 500 --distribution zipf --skew 1.2 --json results/$(git rev-parse --short HEAD).json
+
+    # Same run, compared with an earlier one
+    python loadtest.py --spawn --compare results/abc1234.json
+
+Each worker holds one keep-alive HTTP/1.1 connection (plain asyncio
+streams, no client library) and sends requests drawn from the mix.
+Without --rate workers send back to back (closed loop); with --rate,
+requests are scheduled at a fixed arrival rate and latency is measured from
+the scheduled time, so queueing behind a slow server is not hidden.
+
+Item IDs are KFF-<start>..KFF-<start+items-1> (the synthetic dataset's
+range), chosen uniformly, from a Zipf distribution (--skew is the exponent)
+or from a hot set (--hot-keys receive --hot-share of the traffic).
+
+The report gives throughput, p50/p95/p99 latency, error rate and status
+codes per endpoint, plus the fraction of fetch-data responses served from
+mock data (X-Data-Source: mock). --json writes it with the git commit for
+comparison across commits. --spawn runs the server in this process, so it
+shares a GIL with the generator; use --url against a separately started
+server for numbers to publish.
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ENDPOINTS = ("fetch", "stream", "status", "features", "cycles")
+DEFAULT_MIX = "fetch=80,status=10,features=5,cycles=5"
+
+Request = Tuple[str, str, Optional[bytes]]  # method, path, JSON body
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {name!r} in mix (known: {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError("The request mix has no weight")
+    return weights
+
+
+class KeyChooser:
+    """Picks item IDs uniformly, Zipf-distributed or from a hot set"""
+
+    def __init__(self, keys: List[str], distribution: str, rng: random.Random,
+                 skew: float = 1.2, hot_keys: int = 10, hot_share: float = 0.8):
+        self.keys = keys
+        self.distribution = distribution
+        self.rng = rng
+        self.hot_keys = min(hot_keys, len(keys))
+        self.hot_share = hot_share
+        if distribution == "zipf":
+            total = 0.0
+            self._cumulative = []
+            for rank in range(1, len(keys) + 1):
+                total += 1 / rank ** skew
+                self._cumulative.append(total)
+
+    def choose(self) -> str:
+        if self.distribution == "zipf":
+            return self.keys[bisect.bisect_left(self._cumulative, self.rng.random() * self._cumulative[-1])]
+        if self.distribution == "hotset" and self.hot_keys < len(self.keys):
+            if self.rng.random() < self.hot_share:
+                return self.keys[self.rng.randrange(self.hot_keys)]
+            return self.keys[self.rng.randrange(self.hot_keys, len(self.keys))]
+        return self.keys[self.rng.randrange(len(self.keys))]
+
+
+class HttpConnection:
+    """Minimal keep-alive HTTP/1.1 client connection"""
+
+    def __init__(self, host: str, port: int, timeout: float, headers: Optional[Dict[str, str]] = None):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.headers = headers or {}
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+        self._reader = self._writer = None
+
+    async def request(self, method: str, path: str, body: Optional[bytes] = None) -> Tuple[int, Dict[str, str], bytes]:
+        return await asyncio.wait_for(self._request(method, path, body), timeout=self.timeout)
+
+    async def _request(self, method: str, path: str, body: Optional[bytes]) -> Tuple[int, Dict[str, str], bytes]:
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in self.headers.items())
+        if body is not None:
+            head += f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+        payload = (head + "\r\n").encode("latin-1") + (body or b"")
+
+        # A kept-alive connection the server has closed fails on first use; retry once on a new one
+        for attempt in (0, 1):
+            reused = self._writer is not None
+            if not reused:
+                self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+            try:
+                self._writer.write(payload)
+                await self._writer.drain()
+                status_line = await self._reader.readline()
+                if not status_line:
+                    raise ConnectionResetError("Connection closed by server")
+                break
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if not reused or attempt:
+                    raise
+
+        status = int(status_line.split(b" ", 2)[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "content-length" in headers:
+            content = await self._reader.readexactly(int(headers["content-length"]))
+        elif headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            content = b"".join(chunks)
+        else:
+            content = await self._reader.read()
+            headers["connection"] = "close"
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, headers, content
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.statuses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self.sources: Counter = Counter()
+        self.bytes = 0
+
+    def record(self, latency: float, status: Optional[int], error: Optional[str] = None,
+               source: Optional[str] = None, size: int = 0):
+        self.latencies.append(latency)
+        if status is not None:
+            self.statuses[status] += 1
+        if error:
+            self.errors[error] += 1
+        if source:
+            self.sources[source] += 1
+        self.bytes += size
+
+    @property
+    def failures(self) -> int:
+        return sum(self.errors.values()) + sum(count for status, count in self.statuses.items() if status >= 400)
+
+    def summary(self, elapsed: float) -> Dict:
+        latencies = sorted(self.latencies)
+        requests = len(latencies)
+
+        def percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(requests - 1, int(fraction * requests))] * 1000, 3)
+
+        summary = {
+            "requests": requests,
+            "throughput": round(requests / elapsed, 2) if elapsed else 0.0,
+            "errorRate": round(self.failures / requests, 4) if requests else 0.0,
+            "latencyMs": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(latencies[-1] * 1000, 3) if latencies else None,
+                "mean": round(sum(latencies) / requests * 1000, 3) if latencies else None,
+            },
+            "statusCodes": {str(status): count for status, count in sorted(self.statuses.items())},
+            "errors": dict(self.errors),
+            "bytesReceived": self.bytes,
+        }
+        if self.sources:
+            total = sum(self.sources.values())
+            summary["sources"] = dict(self.sources)
+            summary["mockFallbackRate"] = round(self.sources.get("mock", 0) / total, 4)
+        return summary
+
+
+class LoadGenerator:
+    def __init__(self, args, host: str, port: int, features: List[str]):
+        self.args = args
+        self.host = host
+        self.port = port
+        self.rng = random.Random(args.seed)
+        self.items = KeyChooser(
+            [f"KFF-{args.item_start + index:04d}" for index in range(args.items)],
+            args.distribution, self.rng, args.skew, args.hot_keys, args.hot_share
+        )
+        self.features = features
+        weights = parse_mix(args.mix)
+        if "cycles" in weights and not features:
+            print("No features found, dropping 'cycles' from the mix", file=sys.stderr)
+            weights.pop("cycles")
+        self.endpoint_names = list(weights)
+        self.endpoint_weights = list(weights.values())
+        self.builders: Dict[str, Callable[[], Request]] = {
+            "fetch": lambda: ("POST", "/api/v1/qsr/fetch-data", json.dumps({"item_id": self.items.choose()}).encode()),
+            "stream": lambda: ("GET", f"/api/v1/qsr/fetch-data/stream?item_id={self.items.choose()}", None),
+            "status": lambda: ("GET", "/api/v1/qsr/status", None),
+            "features": lambda: ("GET", "/api/v1/test-execution/features", None),
+            "cycles": lambda: ("GET", f"/api/v1/test-execution/features/{self.rng.choice(self.features)}/cycles", None),
+        }
+        self.stats: Dict[str, EndpointStats] = {name: EndpointStats() for name in self.endpoint_names}
+        self._sent = 0
+
+    def _next_slot(self, started: float) -> Optional[float]:
+        """Scheduled send time of the next request, or None when the run is over"""
+        args = self.args
+        if args.requests and self._sent >= args.requests:
+            return None
+        if args.rate:
+            scheduled = started + self._sent / args.rate
+        else:
+            scheduled = time.perf_counter()
+        if not args.requests and scheduled >= started + args.warmup + args.duration:
+            return None
+        self._sent += 1
+        return scheduled
+
+    async def _worker(self, started: float):
+        headers = {"X-Tenant-ID": self.args.tenant} if self.args.tenant else None
+        connection = HttpConnection(self.host, self.port, self.args.timeout, headers)
+        measure_from = started + self.args.warmup
+        try:
+            while True:
+                scheduled = self._next_slot(started)
+                if scheduled is None:
+                    return
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+                name = self.rng.choices(self.endpoint_names, self.endpoint_weights)[0]
+                method, path, body = self.builders[name]()
+                status = error = source = None
+                size = 0
+                try:
+                    status, headers, content = await connection.request(method, path, body)
+                    source = headers.get("x-data-source")
+                    size = len(content)
+                except asyncio.TimeoutError:
+                    error = "timeout"
+                    await connection.close()
+                except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                    error = type(e).__name__
+                    await connection.close()
+                latency = time.perf_counter() - scheduled
+                if scheduled >= measure_from:
+                    self.stats[name].record(latency, status, error, source, size)
+        finally:
+            await connection.close()
+
+    async def run(self) -> float:
+        started = time.perf_counter()
+        await asyncio.gather(*(self._worker(started) for _ in range(self.args.concurrency)))
+        return time.perf_counter() - started - self.args.warmup
+
+    def report(self, elapsed: float, target: str) -> Dict:
+        overall = EndpointStats()
+        for stats in self.stats.values():
+            overall.latencies.extend(stats.latencies)
+            overall.statuses.update(stats.statuses)
+            overall.errors.update(stats.errors)
+            overall.sources.update(stats.sources)
+            overall.bytes += stats.bytes
+        config = {name: value for name, value in vars(self.args).items() if name not in ("json", "compare")}
+        return {
+            "tool": "loadtest",
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "target": target,
+            "config": config,
+            "durationSeconds": round(elapsed, 3),
+            "overall": overall.summary(elapsed),
+            "endpoints": {name: stats.summary(elapsed) for name, stats in self.stats.items()},
+        }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def spawn_server():
+    """Serve app.main:app with uvicorn on a free local port in a background thread"""
+    import uvicorn
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config("app.main:app", host="127.0.0.1", port=port,
+                                           log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, name="loadtest-server", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("Server failed to start")
+        time.sleep(0.05)
+    return server, thread, f"http://127.0.0.1:{port}"
+
+
+async def discover_features(host: str, port: int, timeout: float) -> List[str]:
+    connection = HttpConnection(host, port, timeout)
+    try:
+        status, _, content = await connection.request("GET", "/api/v1/test-execution/features")
+    finally:
+        await connection.close()
+    if status != 200:
+        return []
+    return [feature["id"] for feature in json.loads(content)["features"]]
+
+
+def print_report(report: Dict, baseline: Optional[Dict] = None):
+    print(f"{report['target']}  {report['durationSeconds']}s  commit {(report['commit'] or '?')[:10]}")
+    header = f"{'endpoint':<10} {'requests':>9} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'mock':>6}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["endpoints"].items()) + [("overall", report["overall"])]
+    for name, summary in rows:
+        latency = summary["latencyMs"]
+        mock = summary.get("mockFallbackRate")
+        print(f"{name:<10} {summary['requests']:>9} {summary['throughput']:>9.1f} "
+              f"{_ms(latency['p50']):>9} {_ms(latency['p95']):>9} {_ms(latency['p99']):>9} "
+              f"{summary['errorRate']:>7.2%} {'-' if mock is None else f'{mock:.0%}':>6}")
+        if baseline:
+            before = baseline["overall"] if name == "overall" else baseline["endpoints"].get(name)
+            if before:
+                print(f"{'  vs base':<10} {'':>9} {_delta(summary['throughput'], before['throughput']):>9} "
+                      + " ".join(f"{_delta(latency[key], before['latencyMs'][key]):>9}" for key in ("p50", "p95", "p99"))
+                      + f" {summary['errorRate'] - before['errorRate']:>+7.2%}")
+    for name, summary in rows[:-1]:
+        unexpected = {status: count for status, count in summary["statusCodes"].items() if int(status) >= 400}
+        if unexpected or summary["errors"]:
+            print(f"{name}: status {unexpected or {}} errors {summary['errors'] or {}}")
+
+
+def _ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def _delta(value: Optional[float], before: Optional[float]) -> str:
+    if value is None or not before:
+        return "-"
+    return f"{(value - before) / before:+.1%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the QSR backend over HTTP")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://localhost:8000", help="Base URL of a running server")
+    target.add_argument("--spawn", action="store_true", help="Start app.main:app in-process on a free port")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent connections")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds (after warmup)")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds before measuring starts")
+    parser.add_argument("--requests", type=int, default=0, help="Stop after this many requests instead of a duration")
+    parser.add_argument("--rate", type=float, default=0, help="Open-loop arrival rate in requests/s (0: closed loop)")
+    parser.add_argument("--timeout", type=float, default=30, help="Per-request timeout in seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Endpoint weights, from: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--items", type=int, default=100, help="Distinct item IDs")
+    parser.add_argument("--item-start", type=int, default=1000, help="First item number (KFF-<n>)")
+    parser.add_argument("--distribution", choices=("uniform", "zipf", "hotset"), default="uniform")
+    parser.add_argument("--skew", type=float, default=1.2, help="Zipf exponent")
+    parser.add_argument("--hot-keys", type=int, default=10, help="Size of the hot set")
+    parser.add_argument("--hot-share", type=float, default=0.8, help="Fraction of requests for the hot set")
+    parser.add_argument("--tenant", help="Kissflow tenant to send requests as (X-Tenant-ID)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the request sequence")
+    parser.add_argument("--json", help="Write the machine-readable report here ('-' for stdout)")
+    parser.add_argument("--compare", help="Earlier --json report to compare against")
+    args = parser.parse_args()
+
+    if args.concurrency < 1 or args.items < 1:
+        parser.error("--concurrency and --items must be at least 1")
+    if args.requests:
+        args.warmup = 0
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    server = None
+    if args.spawn:
+        server, thread, base_url = spawn_server()
+    else:
+        base_url = args.url.rstrip("/")
+    parts = urlsplit(base_url)
+    if parts.scheme != "http":
+        parser.error("Only plain http:// targets are supported")
+    host, port = parts.hostname, parts.port or 80
+
+    try:
+        features = asyncio.run(discover_features(host, port, args.timeout))
+        generator = LoadGenerator(args, host, port, features)
+        elapsed = asyncio.run(generator.run())
+    except OSError as e:
+        print(f"Cannot reach {base_url}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if server is not None:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+    report = generator.report(elapsed, base_url)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report, baseline)
+        if args.json:
+            os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
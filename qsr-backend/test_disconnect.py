@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Check that requests whose client disconnects mid-request give back what the
+middleware took for them: admission slots, memory accounting and profile
+sessions.
+
+    python test_disconnect.py
+
+Serves the app with uvicorn on a free local port. Each client sends a
+fetch-data request and hangs up before the mock upstream (about a second of
+simulated latency) has answered; whatever was taken must be given back
+within a few seconds.
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("KISSFLOW_ACCESS_KEY_ID", "")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# Admission is off by default; it only counts slots when a limit is set
+os.environ.setdefault("ADMISSION_MAX_IN_FLIGHT", "4")
+os.environ.setdefault("MEMORY_TRACING", "true")
+os.environ.setdefault("PROFILING_TOKEN", "test-profiling-token")
+_data_dir = tempfile.mkdtemp(prefix="qsr-disconnect-")
+os.environ.setdefault("PROFILE_DIR", os.path.join(_data_dir, "profiles"))
+os.environ.setdefault("QSR_ARCHIVE_PATH", os.path.join(_data_dir, "qsr_archive.bin"))
+os.environ.setdefault("QSR_TRENDS_PATH", os.path.join(_data_dir, "qsr_trends.json"))
+
+# When the client hangs up, and how long the abandoned handlers (about a
+# second of mock latency each) get to finish before a leftover counts as leaked
+DISCONNECT_AFTER = 0.05
+SETTLE_SECONDS = 5.0
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(app):
+    import uvicorn
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread, port
+
+
+def _disconnecting_request(port: int, path: str, body: dict, headers: str = ""):
+    payload = json.dumps(body).encode()
+    with socket.create_connection(("127.0.0.1", port)) as sock:
+        sock.sendall(
+            f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n{headers}"
+            f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+        )
+        time.sleep(DISCONNECT_AFTER)
+
+
+def _run_disconnecting(count: int, check, headers: str = ""):
+    """
+    Run `check` while the server is still up: shutting uvicorn down cancels
+    whatever is left over and would hide a leak
+    """
+    from app.main import app
+
+    server, thread, port = _serve(app)
+    try:
+        for _ in range(count):
+            _disconnecting_request(port, "/api/v1/qsr/fetch-data", {"item_id": "KFF-1000"}, headers)
+        # Let the abandoned handlers finish
+        deadline = time.monotonic() + SETTLE_SECONDS
+        while True:
+            try:
+                check()
+                return
+            except AssertionError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.1)
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+def test_disconnected_requests_release_admission_slots():
+    from app.admission import admission_controller
+
+    def check():
+        assert admission_controller.in_flight == 0, admission_controller.metrics()
+    _run_disconnecting(3, check)
+
+
+def test_disconnected_requests_end_memory_accounting():
+    from app.memory import memory_monitor
+
+    def check():
+        assert memory_monitor.tracing, "memory tracing is off"
+        assert memory_monitor.in_flight == 0, memory_monitor.in_flight
+    _run_disconnecting(3, check)
+
+
+def test_disconnected_requests_stop_profile_sessions():
+    def check():
+        samplers = [thread.name for thread in threading.enumerate() if thread.name.startswith("profiler-")]
+        assert not samplers, samplers
+    _run_disconnecting(3, check, f"X-Profile-Token: {os.environ['PROFILING_TOKEN']}\r\n")
+
+
+def main():
+    tests = [
+        test_disconnected_requests_release_admission_slots,
+        test_disconnected_requests_end_memory_accounting,
+        test_disconnected_requests_stop_profile_sessions,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {test.__name__}: {e}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
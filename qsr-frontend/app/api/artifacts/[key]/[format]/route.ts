@@ -0,0 +1,46 @@
+import { NextResponse } from 'next/server';
+
+// Server-side only: neither value is exposed to the browser bundle
+const backendUrl = process.env.BACKEND_URL || 'http://localhost:8000';
+const artifactUploadToken = process.env.ARTIFACT_UPLOAD_TOKEN;
+
+// Leading bytes of each client-rendered format (DOCX is a ZIP archive)
+const SIGNATURES: Record<string, number[]> = {
+  pdf: [0x25, 0x50, 0x44, 0x46, 0x2d], // %PDF-
+  docx: [0x50, 0x4b, 0x03, 0x04],      // PK\x03\x04
+};
+
+const KEY_PATTERN = /^[0-9a-f]{64}$/;
+
+/**
+ * Store a PDF or DOCX rendered in the browser in the backend's artifact
+ * cache. The upload token stays on this server; the browser only ever talks
+ * to this route.
+ */
+export async function PUT(
+  request: Request,
+  { params }: { params: Promise<{ key: string; format: string }> }
+) {
+  if (!artifactUploadToken) {
+    return NextResponse.json({ detail: 'Artifact uploads are disabled' }, { status: 404 });
+  }
+  const { key, format } = await params;
+  const signature = SIGNATURES[format];
+  if (!signature || !KEY_PATTERN.test(key)) {
+    return NextResponse.json({ detail: 'Invalid artifact key or format' }, { status: 400 });
+  }
+  const body = new Uint8Array(await request.arrayBuffer());
+  if (!signature.every((byte, i) => body[i] === byte)) {
+    return NextResponse.json({ detail: `Body is not a ${format.toUpperCase()} file` }, { status: 400 });
+  }
+
+  const response = await fetch(`${backendUrl}/api/v1/qsr/artifacts/${key}/${format}`, {
+    method: 'PUT',
+    headers: { 'X-Artifact-Token': artifactUploadToken },
+    body,
+  });
+  return new NextResponse(response.body, {
+    status: response.status,
+    headers: { 'Content-Type': response.headers.get('Content-Type') || 'application/json' },
+  });
+}
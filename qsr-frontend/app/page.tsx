@@ -7,9 +7,9 @@ import StepFetch from '@/app/components/StepFetch';
 import StepValidate from '@/app/components/StepValidate';
 import StepGenerate from '@/app/components/StepGenerate';
 import StepExport from '@/app/components/StepExport';
-import { QsrData, Step, StepStatus } from '@/app/types';
-import { fetchQsrData } from '@/app/services/kissflowService';
-import { generatePDF, generateDOCX } from '@/app/services/documentService';
+import { FetchProgressEvent, KissflowResponse, QsrData, Step, StepStatus } from '@/app/types';
+import { fetchQsrData, streamQsrData } from '@/app/services/kissflowService';
+import { archiveReport, generatePDF, generateDOCX } from '@/app/services/documentService';
 
 export default function Home() {
   const [currentStep, setCurrentStep] = useState<Step>('fetch');
@@ -19,7 +19,10 @@ export default function Home() {
     generate: 'pending',
     export: 'pending',
   });
+  const [itemId, setItemId] = useState('');
   const [reportData, setReportData] = useState<QsrData>({});
+  // Report data last archived, so exporting both formats archives it once
+  const [archivedData, setArchivedData] = useState<QsrData | null>(null);
   const [missingFields, setMissingFields] = useState<string[]>([]);
   
   // Specific loading states for each step
@@ -39,14 +42,35 @@ export default function Home() {
   });
 
   const handleFetchData = async (itemId: string) => {
+    setItemId(itemId);
     setIsFetching(true);
     setFetchStatus('loading');
     setErrorMessage('');
     setProgressText('Fetching data from Kissflow...');
     setStepStatus(prev => ({ ...prev, fetch: 'pending' }));
 
+    const stageText: Record<FetchProgressEvent['stage'], string> = {
+      upstream_fetched: 'Fetched from Kissflow, mapping fields...',
+      mapped: 'Core fields ready, loading test execution data...',
+      test_execution_enriched: 'Test execution data loaded, loading defects...',
+      defects_enriched: 'Defects loaded, checking for missing fields...',
+      missing_fields_computed: 'Finishing up...',
+    };
+
     try {
-      const response = await fetchQsrData(itemId);
+      let response: KissflowResponse;
+      try {
+        // Stream stage events so core fields render before enrichment completes
+        response = await streamQsrData(itemId, (event) => {
+          if (event.data) {
+            setReportData(event.data);
+          }
+          setProgressText(stageText[event.stage]);
+        });
+      } catch (streamError) {
+        console.warn('Progress stream failed, falling back to a single request:', streamError);
+        response = await fetchQsrData(itemId);
+      }
       
       if (response.success) {
         setReportData(response.data);
@@ -137,9 +161,17 @@ export default function Home() {
     });
   };
 
+  // Archive the finalized data once it has been exported
+  const archiveExported = async () => {
+    if (archivedData !== reportData && await archiveReport(itemId, reportData)) {
+      setArchivedData(reportData);
+    }
+  };
+
   const handleDownloadPDF = async () => {
     try {
       await generatePDF(reportData);
+      await archiveExported();
       // Mark export step as complete after successful download
       setStepStatus(prev => ({ ...prev, export: 'success' }));
       setProgressText('Report downloaded successfully!');
@@ -151,6 +183,7 @@ export default function Home() {
   const handleDownloadDOCX = async () => {
     try {
       await generateDOCX(reportData);
+      await archiveExported();
       // Mark export step as complete after successful download
       setStepStatus(prev => ({ ...prev, export: 'success' }));
       setProgressText('Report downloaded successfully!');
@@ -168,6 +201,7 @@ export default function Home() {
       export: 'pending',
     });
     setReportData({});
+    setArchivedData(null);
     setMissingFields([]);
     setFetchStatus('idle');
     setErrorMessage('');
@@ -1,4 +1,4 @@
-import { QsrData, TestBuild, DefectSummary } from '@/app/types';
+import { ArtifactKeyResponse, QsrData, TestBuild, DefectSummary } from '@/app/types';
 import { Document, Packer, Paragraph, Table, TableCell, TableRow, WidthType, AlignmentType, HeadingLevel, TextRun, BorderStyle } from 'docx';
 import { saveAs } from 'file-saver';
 
@@ -8,6 +8,105 @@ declare global {
   }
 }
 
+const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
+const artifactsUrl = `${backendUrl}/api/v1/qsr/artifacts`;
+// Uploads go through this app's own server route, which holds the upload
+// token (app/api/artifacts/[key]/[format]/route.ts)
+const artifactUploadUrl = '/api/artifacts';
+
+// Bump whenever the PDF or DOCX templates below change, so artifacts cached
+// from the old templates stop matching
+const REPORT_TEMPLATE_VERSION = '1';
+
+type ArtifactFormat = 'pdf' | 'docx';
+
+/**
+ * Content key of the report in the backend's artifact cache, or null if the
+ * backend is unavailable (rendering then proceeds uncached).
+ */
+async function getArtifactKey(data: QsrData): Promise<ArtifactKeyResponse | null> {
+  try {
+    const response = await fetch(`${artifactsUrl}/key`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ data, summaryDate: localDateISO(), clientTemplateVersion: REPORT_TEMPLATE_VERSION }),
+    });
+    return response.ok ? await response.json() : null;
+  } catch (error) {
+    console.warn('Artifact cache unavailable:', error);
+    return null;
+  }
+}
+
+async function getCachedArtifact(artifact: ArtifactKeyResponse | null, format: ArtifactFormat): Promise<Blob | null> {
+  if (!artifact || !artifact.cached.includes(format)) {
+    return null;
+  }
+  try {
+    const response = await fetch(`${artifactsUrl}/${artifact.key}/${format}`);
+    return response.ok ? await response.blob() : null;
+  } catch (error) {
+    console.warn('Failed to download cached artifact:', error);
+    return null;
+  }
+}
+
+function storeArtifact(artifact: ArtifactKeyResponse | null, format: ArtifactFormat, blob: Blob): void {
+  if (!artifact) {
+    return;
+  }
+  fetch(`${artifactUploadUrl}/${artifact.key}/${format}`, { method: 'PUT', body: blob })
+    .catch(error => console.warn('Failed to cache rendered artifact:', error));
+}
+
+/**
+ * Serve an identical re-export from the artifact cache; otherwise render it
+ * and store the result for next time.
+ */
+async function renderCached(data: QsrData, format: ArtifactFormat, render: () => Promise<Blob>): Promise<Blob> {
+  const artifact = await getArtifactKey(data);
+  const cached = await getCachedArtifact(artifact, format);
+  if (cached) {
+    console.log(`Serving cached ${format.toUpperCase()} (${cached.size} bytes)`);
+    return cached;
+  }
+  const blob = await render();
+  storeArtifact(artifact, format, blob);
+  return blob;
+}
+
+/**
+ * Archive the finalized data of an exported report, which feeds the backend's
+ * quality trends and quarterly exports. The archive holds default-tenant
+ * reports only, so nothing is archived when NEXT_PUBLIC_TENANT_ID is set.
+ * Failures are logged and never block the download.
+ */
+export async function archiveReport(itemId: string, data: QsrData): Promise<boolean> {
+  if (process.env.NEXT_PUBLIC_TENANT_ID) {
+    return false;
+  }
+  try {
+    const response = await fetch(`${backendUrl}/api/v1/qsr/archive`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ item_id: itemId, data }),
+    });
+    if (!response.ok) {
+      console.warn('Failed to archive report:', response.status);
+    }
+    return response.ok;
+  } catch (error) {
+    console.warn('Failed to archive report:', error);
+    return false;
+  }
+}
+
+function localDateISO(): string {
+  const now = new Date();
+  const pad = (value: number) => String(value).padStart(2, '0');
+  return `${now.getFullYear()}-${pad(now.getMonth() + 1)}-${pad(now.getDate())}`;
+}
+
 export const generateReportHTML = (data: QsrData): string => {
   console.log('generateReportHTML called with data:', data);
   
@@ -289,12 +388,15 @@ export async function generatePDF(data: QsrData): Promise<void> {
     console.log('=== PDF GENERATION START ===');
     console.log('Input data:', data);
     
-    // Generate HTML content
-    const htmlContent = generateReportHTML(data);
-    console.log('HTML generated, length:', htmlContent.length);
-    
-    // Directly generate PDF without preview
-    await generatePDFFromHTML(htmlContent, data);
+    const pdf = await renderCached(data, 'pdf', async () => {
+      // Generate HTML content
+      const htmlContent = generateReportHTML(data);
+      console.log('HTML generated, length:', htmlContent.length);
+      
+      // Directly generate PDF without preview
+      return generatePDFFromHTML(htmlContent, data);
+    });
+    saveAs(pdf, `QSR_Report_${new Date().toISOString().slice(0, 10)}.pdf`);
     
   } catch (error) {
     console.error('Error in generatePDF:', error);
@@ -302,7 +404,7 @@ export async function generatePDF(data: QsrData): Promise<void> {
   }
 }
 
-async function generatePDFFromHTML(htmlContent: string, data: QsrData): Promise<void> {
+async function generatePDFFromHTML(htmlContent: string, data: QsrData): Promise<Blob> {
   return new Promise((resolve, reject) => {
     try {
       console.log('=== STARTING PDF GENERATION FROM HTML ===');
@@ -370,10 +472,10 @@ async function generatePDFFromHTML(htmlContent: string, data: QsrData): Promise<
           window.html2pdf()
             .set(options)
             .from(element)
-            .save()
-            .then(() => {
-              console.log('✅ PDF generated and downloaded successfully!');
-              resolve();
+            .outputPdf('blob')
+            .then((pdf: Blob) => {
+              console.log('✅ PDF generated successfully!');
+              resolve(pdf);
             })
             .catch((error: any) => {
               console.error('❌ html2pdf conversion failed:', error);
@@ -396,6 +498,16 @@ async function generatePDFFromHTML(htmlContent: string, data: QsrData): Promise<
 export async function generateDOCX(data: QsrData): Promise<void> {
   console.log('Generating DOCX with data:', data);
   
+  const buffer = await renderCached(data, 'docx', () => renderDOCX(data));
+  
+  const filename = `QSR_${data.FeatureName?.replace(/[^a-z0-9]/gi, '_')}_${new Date().toISOString().split('T')[0]}.docx`;
+  console.log('DOCX filename:', filename);
+  
+  saveAs(buffer, filename);
+  console.log('DOCX saved successfully');
+}
+
+async function renderDOCX(data: QsrData): Promise<Blob> {
   const currentDate = new Date().toLocaleDateString('en-US', { year: 'numeric', month: 'long', day: 'numeric' });
   const defectSummary = calculateDefectSummary(data);
   
@@ -575,10 +687,5 @@ export async function generateDOCX(data: QsrData): Promise<void> {
 
   const buffer = await Packer.toBlob(doc);
   console.log('DOCX buffer size:', buffer.size);
-  
-  const filename = `QSR_${data.FeatureName?.replace(/[^a-z0-9]/gi, '_')}_${new Date().toISOString().split('T')[0]}.docx`;
-  console.log('DOCX filename:', filename);
-  
-  saveAs(buffer, filename);
-  console.log('DOCX saved successfully');
+  return buffer;
 }
\ No newline at end of file
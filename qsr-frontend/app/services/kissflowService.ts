@@ -1,4 +1,4 @@
-import { KissflowResponse, QsrData } from '@/app/types';
+import { FetchProgressEvent, FetchStage, KissflowResponse, QsrData } from '@/app/types';
 
 function mapKissflowToQsr(kissflowData: any): QsrData {
   const mappedData: QsrData = {};
@@ -102,6 +102,9 @@ function identifyMissingFields(data: QsrData): string[] {
   return missingFields;
 }
 
+// Kissflow tenant (account) of this deployment; unset uses the backend's default
+const tenantId = process.env.NEXT_PUBLIC_TENANT_ID;
+
 export async function fetchQsrData(itemId: string): Promise<KissflowResponse> {
   try {
     const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
@@ -114,6 +117,7 @@ export async function fetchQsrData(itemId: string): Promise<KissflowResponse> {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...(tenantId ? { 'X-Tenant-ID': tenantId } : {}),
       },
       body: JSON.stringify({
         item_id: itemId
@@ -146,6 +150,54 @@ export async function fetchQsrData(itemId: string): Promise<KissflowResponse> {
   }
 }
 
+const FETCH_STAGES: FetchStage[] = [
+  'upstream_fetched',
+  'mapped',
+  'test_execution_enriched',
+  'defects_enriched',
+  'missing_fields_computed',
+];
+
+/**
+ * Streamed variant of fetchQsrData. onProgress is called for every stage with
+ * the partial data available so far; the promise resolves with the final data.
+ */
+export function streamQsrData(
+  itemId: string,
+  onProgress: (event: FetchProgressEvent) => void
+): Promise<KissflowResponse> {
+  return new Promise((resolve, reject) => {
+    const backendUrl = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
+    // EventSource cannot send headers, so the tenant goes in the query string
+    const tenantParam = tenantId ? `&tenant_id=${encodeURIComponent(tenantId)}` : '';
+    const source = new EventSource(
+      `${backendUrl}/api/v1/qsr/fetch-data/stream?item_id=${encodeURIComponent(itemId)}${tenantParam}`
+    );
+
+    FETCH_STAGES.forEach(stage => {
+      source.addEventListener(stage, (e) => {
+        const event: FetchProgressEvent = JSON.parse((e as MessageEvent).data);
+        onProgress(event);
+        if (event.done) {
+          source.close();
+          resolve({
+            success: true,
+            data: event.data || {},
+            missingFields: event.missingFields || [],
+          });
+        }
+      });
+    });
+
+    source.addEventListener('error', (e) => {
+      source.close();
+      const data = (e as MessageEvent).data;
+      const message = data ? JSON.parse(data).message : 'Progress stream unavailable';
+      reject(new Error(message));
+    });
+  });
+}
+
 export function mockFetchQsrData(itemId: string): Promise<KissflowResponse> {
   return new Promise((resolve) => {
     setTimeout(() => {
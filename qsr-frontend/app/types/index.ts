@@ -47,6 +47,32 @@ export interface KissflowResponse {
   success: boolean;
   data: QsrData;
   missingFields: string[];
+  source?: 'kissflow' | 'cache' | 'mock';
+  degraded?: string[];
+}
+
+export type FetchStage =
+  | 'upstream_fetched'
+  | 'mapped'
+  | 'test_execution_enriched'
+  | 'defects_enriched'
+  | 'missing_fields_computed';
+
+export interface FetchProgressEvent {
+  stage: FetchStage;
+  source: 'kissflow' | 'cache' | 'mock';
+  done: boolean;
+  data?: QsrData;
+  missingFields?: string[];
+  degraded?: string[];
+}
+
+export interface ArtifactKeyResponse {
+  key: string;
+  templateVersion: string;
+  clientTemplateVersion?: string;
+  summaryDate: string;
+  cached: string[];
 }
 
 export interface DefectSummary {